@@ -1,10 +1,33 @@
 # Agents
 
-from .email_agent import EmailAgent
-from .calendar_agent import CalendarAgent
-from .rag_team import RAGTeam
-from .intern_agent import InternAgent
-from .exa_agent import ExaAgent
+# Names are resolved on first use (PEP 562), so importing a submodule such as agents.metrics or
+# agents.tool_memo doesn't build every agent and load the agno/OpenAI/Exa stack behind them
+import importlib
+
+import settings  # noqa: F401  (.env before any agent module reads its constants)
+
+_EXPORTS = {
+    "InternAgent": ".intern_agent",
+    "EmailAgent": ".email_agent",
+    "CalendarAgent": ".calendar_agent",
+    "ExaAgent": ".exa_agent",
+    "RAGTeam": ".rag_team",
+    "RAGTeamPool": ".rag_team",
+    "team_pool": ".rag_team",
+}
 
 # To be exported
-__all__ = ["InternAgent", "EmailAgent", "CalendarAgent", "ExaAgent","RAGTeam"]
+__all__ = ["InternAgent", "EmailAgent", "CalendarAgent", "ExaAgent","RAGTeam", "RAGTeamPool", "team_pool"]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
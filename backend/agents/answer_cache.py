@@ -0,0 +1,155 @@
+"""
+Answer cache in front of the team for questions that many sessions ask ("what's on my calendar
+this week", "latest emails"). Opt-in with ANSWER_CACHE_ENABLED=1.
+
+Only answers from the intent router's tool, member and fanout routes are kept: those run without
+the session's history, so the same question has the same answer in every session as long as the
+data hasn't changed. Each entry carries the write counters of the tables its domains read
+(table_versions, bumped by triggers) and is served only while they are unchanged, so
+add_calendar_event, an import or any other writer, in this process or another, retires it.
+
+Keys are the normalized question: the tool and its arguments for direct tool calls, otherwise the
+question's words minus filler ("please show me my ..."), plus the model and the day, since
+"this week" moves. Entries also expire after ANSWER_CACHE_TTL (web answers have no table to
+watch). The cache is an LRU bounded by entries and by bytes.
+"""
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from database import table_versions
+
+# Set to 1 to answer repeated questions from the cache
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "0") == "1"
+# Entries, and total size of the cached answers, kept in memory
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+# Seconds an answer is served even if its tables are unchanged
+ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "900"))
+
+# Routes whose answers don't depend on the session
+CACHEABLE_TARGETS = ("tool", "member", "fanout")
+# Tables each domain's answers are read from
+DOMAIN_TABLES = {"email": ("emails",), "calendar": ("calendar",), "web": ()}
+
+_WORD = re.compile(r"[a-z0-9@.+'-]+")
+# Words that don't change what is asked
+_FILLER = frozenset(
+    "a an the my me our i you please pls hey hi ok okay can could would will show list get give display fetch "
+    "check see view tell what what's whats is are do does any all on for in".split()
+)
+
+
+class CacheKey(NamedTuple):
+    text: str
+    stamp: Tuple[int, ...]
+
+
+def question_key(message: str) -> str:
+    words = []
+    for word in _WORD.findall(message.lower()):
+        word = word.strip(".'-")
+        if not word or word in _FILLER:
+            continue
+        # "email"/"emails" and "meeting"/"meetings" are the same question
+        words.append(word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word)
+    return " ".join(words)
+
+
+class AnswerCache:
+    """LRU of final answers, each valid while the write counters it was stamped with are unchanged."""
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_SIZE, max_bytes: int = ANSWER_CACHE_MAX_BYTES,
+                 ttl: int = ANSWER_CACHE_TTL, enabled: bool = ANSWER_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # key text -> (answer, stamp, stored at, size)
+        self._entries: "OrderedDict[str, Tuple[str, Tuple[int, ...], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "stores": 0, "evictions": 0}
+
+    def key(self, message: str, route, model: str) -> Optional[CacheKey]:
+        """
+        Key and data stamp for answering `message` on `route`, or None if its answer can't be
+        cached. Taken before the answer is computed, so a write while it runs retires it.
+        """
+        if not self.enabled or route.target not in CACHEABLE_TARGETS:
+            return None
+        domains = route.domains or [route.domain]
+        if any(domain not in DOMAIN_TABLES for domain in domains):
+            return None
+        if route.target == "tool":
+            question = f"{route.tool} {json.dumps(route.arguments, sort_keys=True)}"
+        else:
+            question = question_key(message)
+        tables = sorted({table for domain in domains for table in DOMAIN_TABLES[domain]})
+        stamp = table_versions(tables)
+        if not question or stamp is None:
+            return None
+        return CacheKey(f"{model}|{date.today().isoformat()}|{route.target}:{','.join(domains)}|{question}", stamp)
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key.text)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            answer, stamp, stored_at, size = entry
+            if stamp != key.stamp or time.time() - stored_at > self.ttl:
+                # The data changed (or the answer is too old): drop it, the caller recomputes
+                self._counters["stale" if stamp != key.stamp else "expired"] += 1
+                self._counters["misses"] += 1
+                del self._entries[key.text]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key.text)
+            self._counters["hits"] += 1
+            return answer
+
+    def put(self, key: Optional[CacheKey], answer: str) -> None:
+        if key is None or not answer:
+            return
+        size = len(key.text) + len(answer.encode())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key.text, None)
+            if previous is not None:
+                self._bytes -= previous[3]
+            self._entries[key.text] = (answer, key.stamp, time.time(), size)
+            self._bytes += size
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": self.enabled,
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared by /api/chat and /api/chat/batch (through run_routed)
+answer_cache = AnswerCache()
@@ -1,79 +1,246 @@
 import os
-import sqlite3
-from datetime import datetime, timedelta
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from agno.db.sqlite import SqliteDb
-
-DATABASE_PATH = os.getenv("DATABASE_PATH", "agno.db")
+from datetime import datetime, timedelta, timezone
+from database import get_connection, get_database, write_queue
+from .context_budget import BudgetedAgent
+from .models import build_model
+from .tool_memo import memoized
+from .tool_results import decode_cursor, render_page, render_row, snippet
+from .tracing import traced
 
 # -------------------
 # Tools and then Agent 
 # -------------------
 
-def get_upcoming_events(days: int = 7) -> str:
+# Attendees on at least this many events are looked up by scanning the calendar in start order
+ATTENDEE_SCAN_THRESHOLD = int(os.getenv("ATTENDEE_SCAN_THRESHOLD", "1000"))
+
+EVENT_HEADER = "id | start | end | title | attendees"
+EVENT_COLUMNS = "id, title, start_ts, end_ts, attendees, start_epoch"
+
+
+def _event_cells(row) -> tuple:
+    event_id, title, start_ts, end_ts, attendees = row[:5]
+    return event_id, start_ts, end_ts, title, snippet(attendees, 80)
+
+
+def _chronological_position(row) -> dict:
+    # Keyset cursor for lists ordered by (start_epoch, id)
+    return {"start": row[5], "id": row[0]}
+
+
+def _after(cursor: str) -> tuple:
+    # (start, start, id) bounds for "WHERE start_epoch > ? OR (start_epoch = ? AND id > ?)"
+    position = decode_cursor(cursor) or {"start": -(2 ** 62), "id": 0}
+    return position["start"], position["start"], position["id"]
+
+
+def _epoch(ts: str) -> int:
+    # ISO8601 -> unix seconds; timestamps without an offset are taken as UTC like the stored 'Z' ones
+    try:
+        parsed = datetime.fromisoformat(ts.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"'{ts}' is not an ISO8601 timestamp (e.g. '2025-11-03T14:00:00Z')")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _overlapping(conn, start: int, end: int) -> list:
+    """
+    Events overlapping [start, end), in start order.
+    An event can only overlap if it starts within the longest event's duration before `start`,
+    so the scan of idx_calendar_start_end stays bounded instead of reading all past events.
+    """
+    return conn.execute(f"""
+        SELECT {EVENT_COLUMNS}, end_epoch
+        FROM calendar
+        WHERE start_epoch < ?
+          AND start_epoch >= ? - (SELECT coalesce(max(end_epoch - start_epoch), 0) FROM calendar)
+          AND end_epoch > ?
+        ORDER BY start_epoch ASC, id ASC
+    """, (end, start, start)).fetchall()
+
+
+@traced()
+@memoized("calendar")
+def get_upcoming_events(days: int = 7, limit: int = 20, cursor: str = "") -> str:
     # Retrieves upcoming calendar events for the next N days.
     """
-    Args: days: Number of days to look ahead (default: 7)
-    Returns: Formatted string with upcoming events
+    Args:
+        days: Number of days to look ahead (default: 7)
+        limit: Maximum number of events to return (default: 20)
+        cursor: Cursor from a previous call to get the next page
+    Returns: One line per upcoming event, soonest first
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        conn = get_connection()
 
-        now = datetime.now()
+        now = datetime.now(timezone.utc)
         end_date = now + timedelta(days=days)
 
-        cursor.execute("""
-            SELECT id, title, start_ts, end_ts, attendees
+        rows = conn.execute(f"""
+            SELECT {EVENT_COLUMNS}
             FROM calendar
-            WHERE start_ts >= ? AND start_ts <= ?
-            ORDER BY start_ts ASC
-        """, (now.strftime("%Y-%m-%dT%H:%M:%SZ"), end_date.strftime("%Y-%m-%dT%H:%M:%SZ")))
+            WHERE start_epoch >= ? AND start_epoch <= ?
+              AND (start_epoch > ? OR (start_epoch = ? AND id > ?))
+            ORDER BY start_epoch ASC, id ASC
+            LIMIT ?
+        """, (int(now.timestamp()), int(end_date.timestamp()), *_after(cursor), limit + 1)).fetchall()
+
+        return render_page(
+            "get_upcoming_events", f"Events in the next {days} days. {EVENT_HEADER}", rows,
+            _event_cells, _chronological_position, limit,
+            empty_message=f"No events scheduled for the next {days} days.",
+        )
+
+    except Exception as e:
+        return f"Error retrieving upcoming events: {str(e)}"
 
-        # Basic fetch all
-        rows = cursor.fetchall()
-        conn.close()
 
-        if not rows:
-            return f"No events scheduled for the next {days} days."
+@traced()
+@memoized("calendar")
+def get_next_events(count: int = 5) -> str:
+    # Retrieves the next N events starting from now, however far ahead they are.
+    """
+    Args:
+        count: Number of events to return (default: 5)
+    Returns: One line per event, soonest first
+    """
+    try:
+        conn = get_connection()
 
-        result = []
-        for row in rows:
-            event_id, title, start_ts, end_ts, attendees = row
-            result.append(f"ID: {event_id}\nTitle: {title}\nStart: {start_ts}\nEnd: {end_ts}\nAttendees: {attendees}\n")
+        rows = conn.execute(f"""
+            SELECT {EVENT_COLUMNS}
+            FROM calendar
+            WHERE start_epoch >= ?
+            ORDER BY start_epoch ASC, id ASC
+            LIMIT ?
+        """, (int(datetime.now(timezone.utc).timestamp()), count)).fetchall()
 
-        return "\n---\n".join(result)
+        return render_page(
+            "get_next_events", f"Next {count} events. {EVENT_HEADER}", rows,
+            _event_cells, _chronological_position, count,
+            empty_message="No upcoming events in the calendar.",
+        )
 
     except Exception as e:
-        return f"Error retrieving upcoming events: {str(e)}"
+        return f"Error retrieving next events: {str(e)}"
+
+
+@traced()
+@memoized("calendar")
+def find_conflicts(start_ts: str, end_ts: str) -> str:
+    # Lists the events overlapping a time range, e.g. before proposing a meeting time.
+    """
+    Args:
+        start_ts: Start of the range in ISO8601 format (e.g., '2025-11-03T14:00:00Z')
+        end_ts: End of the range in ISO8601 format
+    Returns: One line per overlapping event, or a note that the range is free
+    """
+    try:
+        start, end = _epoch(start_ts), _epoch(end_ts)
+        if end <= start:
+            return "Error finding conflicts: end_ts must be after start_ts"
+
+        rows = _overlapping(get_connection(), start, end)
+
+        return render_page(
+            "find_conflicts", f"Events overlapping {_iso(start)} - {_iso(end)}. {EVENT_HEADER}", rows,
+            _event_cells, _chronological_position, len(rows),
+            empty_message=f"No conflicts: {_iso(start)} - {_iso(end)} is free.",
+        )
+
+    except Exception as e:
+        return f"Error finding conflicts: {str(e)}"
 
 
-def add_calendar_event(title: str, start_ts: str, end_ts: str, attendees: str = "") -> str:
+@traced()
+@memoized("calendar")
+def get_free_busy(start_ts: str, end_ts: str) -> str:
+    # Busy blocks (overlapping events merged) and the free slots between them for a time range.
+    """
+    Args:
+        start_ts: Start of the range in ISO8601 format (e.g., '2025-11-03T09:00:00Z')
+        end_ts: End of the range in ISO8601 format
+    Returns: A line per busy block and per free slot, in time order
+    """
+    try:
+        start, end = _epoch(start_ts), _epoch(end_ts)
+        if end <= start:
+            return "Error retrieving free/busy: end_ts must be after start_ts"
+
+        busy = []
+        for row in _overlapping(get_connection(), start, end):
+            block_start, block_end = max(row[5], start), min(row[6], end)
+            if busy and block_start <= busy[-1][1]:
+                busy[-1][1] = max(busy[-1][1], block_end)
+            else:
+                busy.append([block_start, block_end])
+
+        free = []
+        cursor = start
+        for block_start, block_end in busy:
+            if block_start > cursor:
+                free.append((cursor, block_start))
+            cursor = block_end
+        if cursor < end:
+            free.append((cursor, end))
+
+        blocks = sorted([(s, e, "busy") for s, e in busy] + [(s, e, "free") for s, e in free])
+        lines = [f"Free/busy for {_iso(start)} - {_iso(end)}. status | start | end"]
+        lines += [f"{status} | {_iso(s)} | {_iso(e)}" for s, e, status in blocks]
+        return "\n".join(lines)
+
+    except Exception as e:
+        return f"Error retrieving free/busy: {str(e)}"
+
+
+@traced()
+def add_calendar_event(title: str, start_ts: str, end_ts: str, attendees: str = "", allow_conflicts: bool = False) -> str:
     # Add a new event to the calendar and returns a confirmation of creation
     """
-    Adds a new event to the calendar.
+    Adds a new event to the calendar. Overlapping events are reported instead of double-booking
+    unless allow_conflicts is True.
     Args:
         title: Event title
         start_ts: Start timestamp in ISO8601 format (e.g., '2025-11-03T14:00:00Z')
         end_ts: End timestamp in ISO8601 format
         attendees: Comma-separated list of attendees (optional)
+        allow_conflicts: Add the event even if it overlaps existing events (default: False)
     """
 
 
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        # TEST excution into table
-        cursor.execute("""
-            INSERT INTO calendar (title, start_ts, end_ts, attendees)
-            VALUES (?, ?, ?, ?)
-        """, (title, start_ts, end_ts, attendees))
-
-        event_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        start, end = _epoch(start_ts), _epoch(end_ts)
+        if end <= start:
+            return "Error adding event: end_ts must be after start_ts"
+
+        def insert(conn):
+            # Runs in BEGIN IMMEDIATE, so no other thread or worker can book the slot between
+            # the conflict check and the insert
+            conflicts = _overlapping(conn, start, end)
+            if conflicts and not allow_conflicts:
+                return conflicts, None
+
+            # TEST excution into table; triggers fill start_epoch/end_epoch and calendar_attendees
+            row = conn.execute("""
+                INSERT INTO calendar (title, start_ts, end_ts, attendees)
+                VALUES (?, ?, ?, ?)
+                RETURNING id
+            """, (title, start_ts, end_ts, attendees)).fetchone()
+
+            return conflicts, row[0]
+
+        conflicts, event_id = write_queue.write(insert)
+        if event_id is None:
+            lines = [f"Event '{title}' was not added, it overlaps {len(conflicts)} event(s). {EVENT_HEADER}"]
+            lines += [render_row(_event_cells(row)) for row in conflicts]
+            lines.append("Pick another time, or call again with allow_conflicts=True to add it anyway.")
+            return "\n".join(lines)
 
         return f"Event '{title}' added successfully with ID: {event_id}"
 
@@ -81,83 +248,121 @@ def add_calendar_event(title: str, start_ts: str, end_ts: str, attendees: str =
         return f"Error adding event: {str(e)}"
 
 
-def get_events_by_attendee(attendee_name: str) -> str:
+@traced()
+@memoized("calendar")
+def get_events_by_attendee(attendee_name: str, limit: int = 20, cursor: str = "") -> str:
     # Retrieves events where a specific person is an attendee.
     """
-        Args: attendee_name: Name or email of the attendee
-        Returns: Formatted string with events for that attendee
+        Args:
+            attendee_name: Name or email of the attendee (start of the name is enough)
+            limit: Maximum number of events to return (default: 20)
+            cursor: Cursor from a previous call to get the next page
+        Returns: One line per event with that attendee, in date order
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT id, title, start_ts, end_ts, attendees
-            FROM calendar
-            WHERE attendees LIKE ?
-            ORDER BY start_ts ASC
-        """, (f"%{attendee_name}%",))
-
-        rows = cursor.fetchall()
-        conn.close()
-
-        if not rows:
-            return f"No events found with attendee '{attendee_name}'."
-
-        result = []
-        for row in rows:
-            event_id, title, start_ts, end_ts, attendees = row
-            result.append(f"ID: {event_id}\nTitle: {title}\nStart: {start_ts}\nEnd: {end_ts}\nAttendees: {attendees}\n")
-
-        return "\n---\n".join(result)
+        conn = get_connection()
+
+        # Prefix match on the attendee as written ('dana' -> 'Dana Smith') or on their address
+        low = attendee_name.strip().lower()
+        high = low + "\uffff"
+        matches = "((attendee_key >= ? AND attendee_key < ?) OR (email >= ? AND email < ?))"
+        start, _, event_id = _after(cursor)
+
+        # Few matching events: collect them from the attendee indexes and sort those.
+        # Many: walk the calendar in start order and stop after one page, probing each event's attendees.
+        common = conn.execute(f"""
+            SELECT count(*) FROM (SELECT 1 FROM calendar_attendees WHERE {matches} LIMIT ?) AS hits
+        """, (low, high, low, high, ATTENDEE_SCAN_THRESHOLD)).fetchone()[0] >= ATTENDEE_SCAN_THRESHOLD
+
+        if common:
+            # SQLite's planner would rather sort the EXISTS matches; PostgreSQL has no index hints
+            hint = "INDEXED BY idx_calendar_start_end" if conn.dialect == "sqlite" else ""
+            rows = conn.execute(f"""
+                SELECT {EVENT_COLUMNS}
+                FROM calendar {hint}
+                WHERE start_epoch >= ?
+                  AND (start_epoch > ? OR (start_epoch = ? AND id > ?))
+                  AND EXISTS (SELECT 1 FROM calendar_attendees WHERE event_id = calendar.id AND {matches})
+                ORDER BY start_epoch ASC, id ASC
+                LIMIT ?
+            """, (start, start, start, event_id, low, high, low, high, limit + 1)).fetchall()
+        else:
+            rows = conn.execute(f"""
+                SELECT {EVENT_COLUMNS}
+                FROM calendar
+                WHERE id IN (
+                    SELECT event_id FROM calendar_attendees WHERE attendee_key >= ? AND attendee_key < ?
+                    UNION
+                    SELECT event_id FROM calendar_attendees WHERE email >= ? AND email < ?
+                )
+                  AND (start_epoch > ? OR (start_epoch = ? AND id > ?))
+                ORDER BY start_epoch ASC, id ASC
+                LIMIT ?
+            """, (low, high, low, high, start, start, event_id, limit + 1)).fetchall()
+
+        return render_page(
+            "get_events_by_attendee", f"Events with '{attendee_name}'. {EVENT_HEADER}", rows,
+            _event_cells, _chronological_position, limit,
+            empty_message=f"No events found with attendee '{attendee_name}'.",
+        )
 
     except Exception as e:
         return f"Error retrieving events by attendee: {str(e)}"
 
 
-def get_all_events() -> str:
+@traced()
+@memoized("calendar")
+def get_all_events(limit: int = 20, cursor: str = "") -> str:
     """
-    Retrieves all calendar events from the database.
-    Returns: Formatted string with all events
+    Retrieves calendar events from the database, oldest first, one page at a time.
+    Args:
+        limit: Maximum number of events to return (default: 20)
+        cursor: Cursor from a previous call to get the next page
+    Returns: One line per event
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        conn = get_connection()
 
-        cursor.execute("""
-            SELECT id, title, start_ts, end_ts, attendees
+        rows = conn.execute(f"""
+            SELECT {EVENT_COLUMNS}
             FROM calendar
-            ORDER BY start_ts ASC
-                """)
-
-        rows = cursor.fetchall()
-        conn.close()
+            WHERE start_epoch > ? OR (start_epoch = ? AND id > ?)
+            ORDER BY start_epoch ASC, id ASC
+            LIMIT ?
+        """, (*_after(cursor), limit + 1)).fetchall()
 
-        if not rows:
-            return "No events found in the calendar."
-
-        result = []
-        for row in rows:
-            event_id, title, start_ts, end_ts, attendees = row
-            result.append(f"ID: {event_id}\nTitle: {title}\nStart: {start_ts}\nEnd: {end_ts}\nAttendees: {attendees}\n")
-
-        return "\n---\n".join(result)
+        return render_page(
+            "get_all_events", f"Calendar events. {EVENT_HEADER}", rows,
+            _event_cells, _chronological_position, limit,
+            empty_message="No events found in the calendar.",
+        )
 
     except Exception as e:
         return f"Error retrieving all events: {str(e)}"
 
 
-CalendarAgent = Agent(
+CalendarAgent = BudgetedAgent(
     name="Calendar Agent",
-    model=OpenAIChat(id="gpt-4o"),
+    model=build_model("gpt-4o"),
     role="Manage calendar events, add new events, and list upcoming schedule",
-    db=SqliteDb(db_file=DATABASE_PATH),
-    tools=[get_upcoming_events, add_calendar_event, get_events_by_attendee, get_all_events],
+    db=get_database(),
+    tools=[
+        get_upcoming_events,
+        get_next_events,
+        get_free_busy,
+        find_conflicts,
+        add_calendar_event,
+        get_events_by_attendee,
+        get_all_events,
+    ],
     instructions=[
         "Manage the calendar database including adding, retrieving, and organizing events.",
         "Help users find events by attendee, date range, or title.",
         "Provide clear summaries of upcoming schedules and commitments.",
         "When adding events, ensure timestamps are in ISO8601 format.",
+        "If add_calendar_event reports overlapping events, tell the user and only retry with allow_conflicts=True if they confirm.",
+        "Use get_free_busy to find open slots and get_next_events for 'what's next' questions.",
+        "If a result ends with a cursor, pass it back as `cursor` to get the next page.",
     ],
     add_history_to_context=True,
     markdown=True,
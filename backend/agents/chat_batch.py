@@ -0,0 +1,214 @@
+"""
+Runs many chat prompts through the team pool with bounded concurrency and per-model rate limits.
+
+Used by POST /api/chat/batch, or from scripts and nightly jobs:
+
+    python -m agents.chat_batch prompts.jsonl > results.ndjson
+
+where each input line is {"session_id": ..., "message": ..., "model": ...} (model is optional).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+from .executor import ExecutorBusy, agent_executor
+from .intent_router import run_routed
+from .metrics import CHAT_IN_FLIGHT, CHAT_LATENCY
+from .models import check_model
+from .rag_team import team_pool
+
+# Items of one batch running at once; keep below AGENT_MAX_WORKERS so interactive chats still get workers
+CHAT_BATCH_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", "4"))
+CHAT_BATCH_MAX_ITEMS = int(os.getenv("CHAT_BATCH_MAX_ITEMS", "1000"))
+# Team runs started per minute for each model across all batches, e.g. "gpt-4o=500,gpt-4o-mini=2000"
+CHAT_BATCH_DEFAULT_RPM = int(os.getenv("CHAT_BATCH_DEFAULT_RPM", "500"))
+CHAT_BATCH_MODEL_RPM = os.getenv("CHAT_BATCH_MODEL_RPM", "")
+# Worker processes serving the app (uvicorn/gunicorn read the same variable); the RPM above is
+# for the whole deployment, so each worker's limiter gets its share
+WEB_CONCURRENCY = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+# Runs per model that may start back to back before the rate applies
+CHAT_BATCH_BURST = int(os.getenv("CHAT_BATCH_BURST", "8"))
+# Seconds to wait before retrying when the shared executor is full
+CHAT_BATCH_BUSY_BACKOFF = float(os.getenv("CHAT_BATCH_BUSY_BACKOFF", "0.5"))
+
+
+class RateLimiter:
+    """
+    Thread-safe rate limiter (GCRA): `per_minute` calls per minute, with up to `burst` calls back to back.
+    `reserve()` books the next slot and returns how many seconds to wait for it.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1, clock=time.monotonic):
+        self.interval = 60.0 / per_minute
+        self.burst = burst
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = self.clock()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+            return max(0.0, slot - now - (self.burst - 1) * self.interval)
+
+
+def _parse_model_rpm(value: str) -> Dict[str, int]:
+    limits = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        model, _, rpm = entry.partition("=")
+        limits[model.strip()] = int(rpm)
+    return limits
+
+
+_model_rpm = _parse_model_rpm(CHAT_BATCH_MODEL_RPM)
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def model_limiter(model: str) -> RateLimiter:
+    """Rate limiter shared by every batch running `model` in this worker"""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = RateLimiter(_model_rpm.get(model, CHAT_BATCH_DEFAULT_RPM) / WEB_CONCURRENCY, CHAT_BATCH_BURST)
+        return limiter
+
+
+def validate_items(items: Any) -> List[Dict[str, str]]:
+    """Checks a batch payload and its models, filling in the default one. Raises ValueError."""
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list")
+    if len(items) > CHAT_BATCH_MAX_ITEMS:
+        raise ValueError(f"At most {CHAT_BATCH_MAX_ITEMS} items per batch")
+
+    validated = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get("message") or not item.get("session_id"):
+            raise ValueError(f"items[{index}]: message and session_id are required")
+        try:
+            model = check_model(item.get("model"))
+        except ValueError as e:
+            raise ValueError(f"items[{index}]: {e}")
+        validated.append({
+            "session_id": str(item["session_id"]),
+            "message": str(item["message"]),
+            "model": model,
+        })
+    return validated
+
+
+def _run(model: str, message: str, session_id: str):
+    # Blocking; runs on an agent_executor worker. Also returns the time spent in team.run
+    with team_pool.borrow(model) as team:
+        start = time.perf_counter()
+        response = run_routed(team, message, session_id)
+        return response, time.perf_counter() - start
+
+
+async def _submit(model: str, message: str, session_id: str):
+    while True:
+        try:
+            return await agent_executor.run(_run, model, message, session_id)
+        except ExecutorBusy:
+            # Batch items yield to interactive traffic instead of failing
+            await asyncio.sleep(CHAT_BATCH_BUSY_BACKOFF)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+async def _run_item(index: int, item: Dict[str, str], semaphore: asyncio.Semaphore, batch_start: float) -> Dict[str, Any]:
+    async with semaphore:
+        slot = time.perf_counter()
+        delay = model_limiter(item["model"]).reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+        started = time.perf_counter()
+        result: Dict[str, Any] = {"index": index, "session_id": item["session_id"], "model": item["model"]}
+        run_seconds = 0.0
+        CHAT_IN_FLIGHT.inc("batch")
+        try:
+            response, run_seconds = await _submit(item["model"], item["message"], item["session_id"])
+            status = getattr(response.status, "value", response.status)
+            if status in ("ERROR", "CANCELLED"):
+                result.update(status="error", error=response.content or status.lower())
+            else:
+                result.update(status="ok", response=response.content)
+            result["route"] = ((response.metadata or {}).get("route") or {}).get("target")
+            metrics = response.metrics
+            if metrics is not None:
+                result.update(input_tokens=metrics.input_tokens, output_tokens=metrics.output_tokens)
+        except Exception as e:
+            result.update(status="error", error=str(e))
+        finally:
+            CHAT_IN_FLIGHT.dec("batch")
+        finished = time.perf_counter()
+        CHAT_LATENCY.observe(finished - started, "batch", item["model"])
+
+        result.update(
+            queued_ms=_ms(slot - batch_start),          # waiting for a concurrency slot
+            rate_limited_ms=_ms(started - slot),        # waiting for the model's rate limit
+            run_ms=_ms(run_seconds),                    # inside the team run or fast path
+            elapsed_ms=_ms(finished - started),         # run plus executor queueing
+            finished_ms=_ms(finished - batch_start),    # since the batch started
+        )
+        return result
+
+
+async def stream_chat_batch(items: Iterable[Dict[str, str]], concurrency: int = CHAT_BATCH_CONCURRENCY) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs validated items and yields one result per item as it completes (not in input order; see `index`).
+    Closing the iterator cancels the items that haven't started.
+    """
+    batch_start = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [asyncio.ensure_future(_run_item(index, item, semaphore, batch_start)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def run_chat_batch(items: List[Dict[str, str]], concurrency: int = CHAT_BATCH_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Runs a batch from sync code and returns the results in input order"""
+    items = validate_items(items)
+
+    async def collect():
+        return [result async for result in stream_chat_batch(items, concurrency)]
+
+    return sorted(asyncio.run(collect()), key=lambda result: result["index"])
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    ok = sum(1 for result in results if result["status"] == "ok")
+    return {"done": True, "count": len(results), "ok": ok, "errors": len(results) - ok, "elapsed_ms": _ms(elapsed)}
+
+
+async def _main(path: str, concurrency: int) -> None:
+    with open(path) if path != "-" else sys.stdin as lines:
+        items = validate_items([json.loads(line) for line in lines if line.strip()])
+
+    start = time.perf_counter()
+    results = []
+    async for result in stream_chat_batch(items, concurrency):
+        results.append(result)
+        print(json.dumps(result, default=str), flush=True)
+    print(json.dumps(summarize(results, time.perf_counter() - start)), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="JSONL file of {session_id, message, model} items, or - for stdin")
+    parser.add_argument("--concurrency", type=int, default=CHAT_BATCH_CONCURRENCY)
+    args = parser.parse_args()
+    asyncio.run(_main(args.path, args.concurrency))
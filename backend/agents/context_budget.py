@@ -0,0 +1,282 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from agno.agent import Agent
+from agno.models.message import Message
+from agno.models.base import Model
+from agno.team.team import Team
+from agno.utils.log import log_warning
+
+from database import get_connection, write_queue
+from .models import build_model
+from .tool_memo import MemoScopeMixin
+from .tracing import TracedMixin
+from .tool_results import estimate_tokens, snippet
+
+# Estimated tokens of history sent with each run before older turns are compacted (0 disables)
+CONTEXT_HISTORY_TOKEN_BUDGET = int(os.getenv("CONTEXT_HISTORY_TOKEN_BUDGET", "3000"))
+# Tool results in history are cut to this many characters once the budget is exceeded
+CONTEXT_TOOL_RESULT_CHARS = int(os.getenv("CONTEXT_TOOL_RESULT_CHARS", "400"))
+# Most recent turns always sent verbatim, and the length the rolling summary is asked to stay under
+CONTEXT_KEEP_RECENT_RUNS = int(os.getenv("CONTEXT_KEEP_RECENT_RUNS", "1"))
+CONTEXT_SUMMARY_MAX_WORDS = int(os.getenv("CONTEXT_SUMMARY_MAX_WORDS", "200"))
+# Characters of each message passed to the summarizer
+CONTEXT_SUMMARY_INPUT_CHARS = int(os.getenv("CONTEXT_SUMMARY_INPUT_CHARS", "1000"))
+# Model that writes the summaries (model id on MODEL_BACKEND); empty uses the model of the team or agent itself
+CONTEXT_SUMMARY_MODEL = os.getenv("CONTEXT_SUMMARY_MODEL", "gpt-4o-mini")
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and their personal assistant "
+    "(email, calendar and web search). Merge the previous summary with the new messages into one summary "
+    "of at most {words} words. Keep names, email addresses, dates and times, email subjects, event titles, "
+    "URLs, decisions and open requests. Drop pleasantries and raw tool output. Reply with the summary only."
+)
+
+
+def message_tokens(message: Message) -> int:
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    tokens = estimate_tokens(content or "")
+    if message.tool_calls:
+        tokens += estimate_tokens(json.dumps(message.tool_calls, default=str))
+    return tokens + 4  # role and message framing
+
+
+def history_tokens(messages: List[Message]) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def split_turns(messages: List[Message]) -> List[List[Message]]:
+    # Every run starts with its user message; anything before the first one stays with it
+    turns: List[List[Message]] = []
+    for message in messages:
+        if message.role == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def trim_tool_results(messages: List[Message], limit: int = CONTEXT_TOOL_RESULT_CHARS) -> int:
+    """Cuts long tool results down to `limit` characters in place; returns the characters removed"""
+    removed = 0
+    for message in messages:
+        if message.role == "tool" and isinstance(message.content, str) and len(message.content) > limit:
+            dropped = len(message.content) - limit
+            message.content = snippet(message.content, limit) + f" [{dropped} chars of earlier tool output dropped]"
+            removed += dropped
+    return removed
+
+
+def transcript(messages: List[Message]) -> str:
+    lines = []
+    for message in messages:
+        if message.role == "tool":
+            lines.append(f"tool result: {snippet(str(message.content), 300)}")
+            continue
+        for call in message.tool_calls or []:
+            function = call.get("function") or {}
+            lines.append(f"{message.role} called {function.get('name')}({snippet(str(function.get('arguments')), 200)})")
+        if message.content:
+            lines.append(f"{message.role}: {snippet(str(message.content), CONTEXT_SUMMARY_INPUT_CHARS)}")
+    return "\n".join(lines)
+
+
+def load_summary(session_id: str, scope: str) -> Optional[Tuple[str, str]]:
+    """(through_message_id, summary) of the stored summary, or None"""
+    try:
+        return get_connection().execute(
+            "SELECT through_message_id, summary FROM context_summaries WHERE session_id = ? AND scope = ?",
+            (session_id, scope),
+        ).fetchone()
+    except Exception as e:
+        log_warning(f"Context summary read failed: {e}")
+        return None
+
+
+def save_summary(session_id: str, scope: str, through_message_id: str, summary: str) -> None:
+    try:
+        # Waits for the write: the session's next turn reads it back
+        write_queue.write(lambda conn: conn.execute(
+            "INSERT INTO context_summaries (session_id, scope, through_message_id, summary, updated_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (session_id, scope) DO UPDATE SET "
+            "through_message_id = excluded.through_message_id, summary = excluded.summary, updated_at = excluded.updated_at",
+            (session_id, scope, through_message_id, summary, time.time()),
+        ))
+    except Exception as e:
+        log_warning(f"Context summary write failed: {e}")
+
+
+@lru_cache(maxsize=None)
+def summary_model(model_id: str) -> Model:
+    return build_model(model_id)
+
+
+class ContextStats:
+    """Totals of the history compaction done across runs, for /health/context."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"runs": 0, "compacted_runs": 0, "history_tokens": 0, "sent_tokens": 0, "summaries_created": 0}
+
+    def record(self, context: Dict[str, Any]) -> None:
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["compacted_runs"] += bool(context["summarized_messages"] or context["trimmed_tool_chars"])
+            self._stats["history_tokens"] += context["history_tokens"]
+            self._stats["sent_tokens"] += context["sent_tokens"]
+            self._stats["summaries_created"] += context["summary_created"]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "saved_tokens": self._stats["history_tokens"] - self._stats["sent_tokens"]}
+
+
+context_stats = ContextStats()
+
+
+def context_metrics(run_response: Any) -> Dict[str, int]:
+    """Estimated history tokens of a team run and its member runs, before and after compaction"""
+    totals = {"history_tokens": 0, "sent_tokens": 0, "saved_tokens": 0, "summaries_created": 0}
+    pending = [run_response]
+    while pending:
+        run = pending.pop()
+        context = (getattr(run, "metadata", None) or {}).get("context")
+        if context:
+            totals["history_tokens"] += context["history_tokens"]
+            totals["sent_tokens"] += context["sent_tokens"]
+            totals["saved_tokens"] += context["saved_tokens"]
+            totals["summaries_created"] += context["summary_created"]
+        pending.extend(getattr(run, "member_responses", None) or [])
+    return totals
+
+
+class ContextBudgetMixin:
+    """
+    Keeps the chat history agno adds to a run under CONTEXT_HISTORY_TOKEN_BUDGET estimated tokens.
+
+    Over budget, tool results in the history are trimmed first. If that isn't enough, all but the
+    most recent turns that fit are replaced with a rolling summary of the session, stored in the
+    `context_summaries` table and only extended with the turns dropped since it was written.
+    What was sent is recorded in the run's metadata under "context".
+    """
+
+    context_token_budget: int = CONTEXT_HISTORY_TOKEN_BUDGET
+
+    def _get_run_messages(self, **kwargs):
+        run_messages = super()._get_run_messages(**kwargs)
+        self._apply_context_budget(run_messages, kwargs["session"], kwargs["run_response"])
+        return run_messages
+
+    async def _aget_run_messages(self, **kwargs):
+        run_messages = await super()._aget_run_messages(**kwargs)
+        await asyncio.to_thread(self._apply_context_budget, run_messages, kwargs["session"], kwargs["run_response"])
+        return run_messages
+
+    def _session_history(self, session) -> List[Message]:
+        # Same selection agno makes for the history, without the run limit
+        skip_role = self.system_message_role if self.system_message_role not in ["user", "assistant", "tool"] else None
+        if isinstance(self, Team):
+            scope = {"team_id": self.id if self.parent_team_id is not None else None}
+        else:
+            scope = {"agent_id": self.id if self.team_id is not None else None}
+        return session.get_messages_from_last_n_runs(skip_role=skip_role, **scope)
+
+    def _summary_model(self):
+        return summary_model(CONTEXT_SUMMARY_MODEL) if CONTEXT_SUMMARY_MODEL else self.model
+
+    def _summarize(self, previous: Optional[str], messages: List[Message]) -> str:
+        content = transcript(messages)
+        if previous:
+            content = f"Previous summary:\n{previous}\n\nNew messages:\n{content}"
+        response = self._summary_model().response(
+            messages=[
+                Message(role="system", content=SUMMARY_PROMPT.format(words=CONTEXT_SUMMARY_MAX_WORDS)),
+                Message(role="user", content=content),
+            ]
+        )
+        return (response.content or "").strip()
+
+    def _extend_summary(self, session, stored: Optional[Tuple[str, str]], first_kept: Message) -> Optional[str]:
+        """Extends the stored summary with the history messages before `first_kept` and saves it"""
+        history = self._session_history(session)
+        ids = [m.id for m in history]
+        if first_kept.id not in ids:
+            return None
+        end = ids.index(first_kept.id)
+        previous, start = None, 0
+        if stored and stored[0] in ids[:end]:
+            previous, start = stored[1], ids.index(stored[0]) + 1
+
+        summary = self._summarize(previous, history[start:end])
+        if summary:
+            save_summary(session.session_id, self.id or self.name, ids[end - 1], summary)
+        return summary or None
+
+    def _apply_context_budget(self, run_messages, session, run_response) -> None:
+        history = [m for m in run_messages.messages if m.from_history]
+        if not history or self.context_token_budget <= 0:
+            return
+
+        context = {
+            "history_tokens": history_tokens(history),
+            "trimmed_tool_chars": 0,
+            "summarized_messages": 0,
+            "summary_created": False,
+        }
+        # Turns the stored summary already covers are always replaced by it
+        stored = load_summary(session.session_id, self.id or self.name)
+        summary = stored[1] if stored else None
+        ids = [m.id for m in history]
+        recent = history[ids.index(stored[0]) + 1:] if stored and stored[0] in ids else history
+
+        if history_tokens(recent) > self.context_token_budget:
+            context["trimmed_tool_chars"] = trim_tool_results(recent)
+
+        if history_tokens(recent) > self.context_token_budget:
+            # Fold down to half the budget so the next few turns fit without another summary
+            turns = split_turns(recent)
+            kept: List[List[Message]] = []
+            tokens = 0
+            for turn in reversed(turns):
+                turn_tokens = history_tokens(turn)
+                if len(kept) >= CONTEXT_KEEP_RECENT_RUNS and tokens + turn_tokens > self.context_token_budget // 2:
+                    break
+                kept.insert(0, turn)
+                tokens += turn_tokens
+
+            if len(kept) < len(turns):
+                try:
+                    extended = self._extend_summary(session, stored, kept[0][0])
+                except Exception as e:
+                    log_warning(f"Context summary failed, sending the full history: {e}")
+                    extended = None
+                if extended:
+                    summary, context["summary_created"] = extended, True
+                    recent = [m for turn in kept for m in turn]
+
+        sent = recent
+        if summary:
+            sent = [
+                Message(
+                    role="system",
+                    content=f"Summary of the earlier conversation:\n<summary_of_previous_interactions>\n{summary}\n</summary_of_previous_interactions>",
+                    from_history=True,
+                )
+            ] + recent
+            context["summarized_messages"] = len(history) - len(recent)
+        if sent is not history:
+            start = next(i for i, m in enumerate(run_messages.messages) if m is history[0])
+            run_messages.messages[start:start + len(history)] = sent
+
+        context["sent_tokens"] = history_tokens(sent)
+        context["saved_tokens"] = context["history_tokens"] - context["sent_tokens"]
+        run_response.metadata = {**(run_response.metadata or {}), "context": context}
+        context_stats.record(context)
+
+
+class BudgetedAgent(TracedMixin, MemoScopeMixin, ContextBudgetMixin, Agent):
+    """Agent whose chat history is kept under the context token budget"""
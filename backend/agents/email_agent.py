@@ -1,127 +1,271 @@
-import os
-import sqlite3
-from agno.agent import Agent
-from agno.models.openai import OpenAIChat
-from agno.db.sqlite import SqliteDb
+import re
+from database import get_connection, get_database
+from .context_budget import BudgetedAgent
+from .email_index import email_index
+from .models import build_model
+from .tool_memo import memoized
+from .tool_results import decode_cursor, record_result, render_page, snippet
+from .tracing import traced
 
-DATABASE_PATH = os.getenv("DATABASE_PATH", "agno.db")
 
+def _fts_query(text: str, dialect: str = "sqlite") -> str:
+    # Turns free text into a safe FTS5 query (or tsquery on PostgreSQL): every word quoted and
+    # prefix-matched so "Dana meet" matches "Dana" and "meeting" without FTS syntax errors
+    words = re.findall(r"\w+", text)
+    if dialect == "postgres":
+        return " & ".join(f"'{word}':*" for word in words)
+    return " ".join(f'"{word}"*' for word in words)
 
-def get_recent_emails(limit: int = 10) -> str:
-    # Returns a String based list of emails
-    # such that it can be parsed easily from the frontend
+
+EMAIL_HEADER = "id | received | from | subject | preview"
+
+
+def _email_cells(row) -> tuple:
+    email_id, sender, received_at, subject, preview = row[:5]
+    return email_id, received_at, sender, subject, snippet(preview)
+
+
+def _newest_first_position(row) -> dict:
+    # Keyset cursor for lists ordered by (received_at DESC, id DESC)
+    return {"received_at": row[2], "id": row[0]}
+
+
+@traced()
+@memoized("emails")
+def get_recent_emails(limit: int = 10, cursor: str = "") -> str:
+    # Returns a compact, line based list of emails (one per line, content previewed)
+    # to keep the prompt small; use get_email_body for the full text
     """
     Retrieves the most recent emails from the database.
-    Args: limit: Maximum number of emails to retrieve (default: 10)
-
+    Args:
+        limit: Maximum number of emails to retrieve (default: 10)
+        cursor: Cursor from a previous call to get the next (older) page
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        position = decode_cursor(cursor)
+        conn = get_connection()
 
-        cursor.execute("""
-            SELECT id, sender, received_at, subject, content
-            FROM emails
-            ORDER BY received_at DESC
-            LIMIT ?
-        """, (limit,))
+        if position:
+            rows = conn.execute("""
+                SELECT id, sender, received_at, subject, content
+                FROM emails
+                WHERE received_at < ? OR (received_at = ? AND id < ?)
+                ORDER BY received_at DESC, id DESC
+                LIMIT ?
+            """, (position["received_at"], position["received_at"], position["id"], limit + 1)).fetchall()
+        else:
+            rows = conn.execute("""
+                SELECT id, sender, received_at, subject, content
+                FROM emails
+                ORDER BY received_at DESC, id DESC
+                LIMIT ?
+            """, (limit + 1,)).fetchall()
+
+        return render_page(
+            "get_recent_emails", f"Emails, newest first. {EMAIL_HEADER}", rows,
+            _email_cells, _newest_first_position, limit,
+            empty_message="No emails found in the database.",
+        )
+
+    except Exception as e:
+        return f"Error retrieving emails: {str(e)}"
 
-        rows = cursor.fetchall()
-        conn.close()
 
-        if not rows:
-            return "No emails found in the database."
+@traced()
+@memoized("emails")
+def search_emails(keyword: str, limit: int = 10, cursor: str = "") -> str:
+    # Full-text search over subject and content, best matches first (bm25).
+    """
+    Args:
+        keyword: Keyword(s) to search for
+        limit: Maximum number of emails to return (default: 10)
+        cursor: Cursor from a previous call to get the next page
+    Returns: One line per matching email, the preview highlights the match
+    """
+    try:
+        conn = get_connection()
+        query = _fts_query(keyword, conn.dialect)
+        if not query:
+            return record_result("search_emails", f"No emails found containing '{keyword}'.", rows=0)
+
+        offset = (decode_cursor(cursor) or {}).get("offset", 0)
 
-        result = []
-        for row in rows:
-            email_id, sender, received_at, subject, content = row
-            result.append(f"ID: {email_id}\nFrom: {sender}\nReceived: {received_at}\nSubject: {subject}\nContent: {content}\n")
+        # Subject hits weigh more than body hits; sender is not searched here
+        if conn.dialect == "postgres":
+            # Subject words carry weight A, content B (000_schema.sql), rank divided by 1 + log(length)
+            # as bm25 favours short emails; highlights only for the page
+            rows = conn.execute("""
+                SELECT id, sender, received_at, subject,
+                       ts_headline('simple', content, q, 'StartSel=**, StopSel=**, MaxWords=24, MinWords=12')
+                FROM (
+                    SELECT e.id, e.sender, e.received_at, e.subject, e.content, q
+                    FROM emails e, to_tsquery('simple', ?) AS q
+                    WHERE e.search @@ q
+                    ORDER BY ts_rank('{0, 0, 0.33, 1.0}', e.search, q, 1) DESC, e.id
+                    LIMIT ? OFFSET ?
+                ) AS matches
+            """, (query, limit + 1, offset)).fetchall()
+        else:
+            rows = conn.execute("""
+                SELECT e.id, e.sender, e.received_at, e.subject,
+                       snippet(emails_fts, -1, '**', '**', '...', 24)
+                FROM emails_fts
+                JOIN emails e ON e.id = emails_fts.rowid
+                WHERE emails_fts MATCH ?
+                ORDER BY bm25(emails_fts, 3.0, 1.0, 0.0)
+                LIMIT ? OFFSET ?
+            """, (f"{{subject content}}: ({query})", limit + 1, offset)).fetchall()
 
-        return "\n---\n".join(result)
+        # Ranked results page by offset; row i of this page is overall match offset + i
+        ranks = {row[0]: offset + i + 1 for i, row in enumerate(rows)}
+        return render_page(
+            "search_emails", f"Emails matching '{keyword}', best first. {EMAIL_HEADER}", rows,
+            _email_cells, lambda row: {"offset": ranks[row[0]]}, limit,
+            empty_message=f"No emails found containing '{keyword}'.",
+        )
 
     except Exception as e:
-        return f"Error retrieving emails: {str(e)}"
+        return f"Error searching emails: {str(e)}"
 
 
-def search_emails(keyword: str) -> str:
-    # Searches emails by keyword in subject or content.
+@traced()
+@memoized("emails")
+def semantic_search_emails(query: str, k: int = 10, cursor: str = "") -> str:
+    # Nearest emails by meaning in the local vector index; finds related wording that keyword search misses
     """
-    Args: keyword: Keyword to search for
-    Returns: Formatted string with matching emails
+    Args:
+        query: What the emails are about, in plain words
+        k: Number of emails to return (default: 10)
+        cursor: Cursor from a previous call to get the next page
+    Returns: One line per email, most similar first
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
+        email_index.refresh()
+        if not email_index.size:
+            return record_result(
+                "semantic_search_emails",
+                "The semantic index is still being built; use search_emails for now.", rows=0,
+            )
 
-        cursor.execute("""
+        offset = (decode_cursor(cursor) or {}).get("offset", 0)
+        # A few extra ids in case some emails were deleted since they were indexed
+        ids = [email_id for email_id, _ in email_index.search(query, offset + k + 6)]
+        rows = get_connection().execute(f"""
             SELECT id, sender, received_at, subject, content
             FROM emails
-            WHERE subject LIKE ? OR content LIKE ?
-            ORDER BY received_at DESC
-        """, (f"%{keyword}%", f"%{keyword}%"))
+            WHERE id IN ({",".join("?" * len(ids))})
+        """, ids).fetchall() if ids else []
+
+        rank = {email_id: i for i, email_id in enumerate(ids)}
+        rows = sorted(rows, key=lambda row: rank[row[0]])[offset:offset + k + 1]
+        ranks = {row[0]: offset + i + 1 for i, row in enumerate(rows)}
+        return render_page(
+            "semantic_search_emails", f"Emails about '{query}', most similar first. {EMAIL_HEADER}", rows,
+            _email_cells, lambda row: {"offset": ranks[row[0]]}, k,
+            empty_message=f"No emails found about '{query}'.",
+        )
+
+    except Exception as e:
+        return f"Error searching emails semantically: {str(e)}"
 
-        rows = cursor.fetchall()
-        conn.close()
 
-        if not rows:
-            return f"No emails found containing '{keyword}'."
+@traced()
+@memoized("emails")
+def get_emails_by_sender(sender_name: str, limit: int = 10, cursor: str = "") -> str:
+    # Retrieves emails from a specific sender.
+    """
+    Args:
+        sender_name: Name or email of the sender
+        limit: Maximum number of emails to return (default: 10)
+        cursor: Cursor from a previous call to get the next (older) page
+    Returns: One line per email from that sender, newest first
+    """
+    try:
+        conn = get_connection()
+        query = _fts_query(sender_name, conn.dialect)
+        if not query:
+            return record_result("get_emails_by_sender", f"No emails found from '{sender_name}'.", rows=0)
 
-        result = []
-        for row in rows:
-            email_id, sender, received_at, subject, content = row
-            result.append(f"ID: {email_id}\nFrom: {sender}\nReceived: {received_at}\nSubject: {subject}\nContent: {content}\n")
+        position = decode_cursor(cursor) or {"received_at": "\uffff", "id": 0}
 
-        return "\n---\n".join(result)
+        # Walk emails newest-first and stop after `limit` hits instead of sorting every match
+        if conn.dialect == "postgres":
+            sql = """
+                SELECT id, sender, received_at, subject, content
+                FROM emails
+                WHERE sender_search @@ to_tsquery('simple', ?)
+                  AND (received_at < ? OR (received_at = ? AND id < ?))
+                ORDER BY received_at DESC, id DESC
+                LIMIT ?
+            """
+        else:
+            sql = """
+                SELECT id, sender, received_at, subject, content
+                FROM emails INDEXED BY idx_emails_received_at
+                WHERE id IN (SELECT rowid FROM emails_fts WHERE emails_fts MATCH ?)
+                  AND (received_at < ? OR (received_at = ? AND id < ?))
+                ORDER BY received_at DESC, id DESC
+                LIMIT ?
+            """
+            query = f"sender: ({query})"
+        rows = conn.execute(sql, (
+            query,
+            position["received_at"], position["received_at"], position["id"],
+            limit + 1,
+        )).fetchall()
+
+        return render_page(
+            "get_emails_by_sender", f"Emails from '{sender_name}', newest first. {EMAIL_HEADER}", rows,
+            _email_cells, _newest_first_position, limit,
+            empty_message=f"No emails found from '{sender_name}'.",
+        )
 
     except Exception as e:
-        return f"Error searching emails: {str(e)}"
+        return f"Error retrieving emails by sender: {str(e)}"
 
 
-def get_emails_by_sender(sender_name: str) -> str:
-    # Retrieves emails from a specific sender.
+@traced()
+@memoized("emails")
+def get_email_body(email_id: int) -> str:
+    # Full text of one email; list tools only return previews
     """
-    Args: sender_name: Name or email of the sender
-    Returns: Formatted string with emails from that sender
+    Args: email_id: ID of the email (from get_recent_emails, search_emails, semantic_search_emails or get_emails_by_sender)
+    Returns: Sender, date, subject and full content of the email
     """
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        row = get_connection().execute("""
             SELECT id, sender, received_at, subject, content
             FROM emails
-            WHERE sender LIKE ?
-            ORDER BY received_at DESC
-        """, (f"%{sender_name}%",))
-
-        rows = cursor.fetchall()
-        conn.close()
+            WHERE id = ?
+        """, (email_id,)).fetchone()
 
-        if not rows:
-            return f"No emails found from '{sender_name}'."
+        if not row:
+            return record_result("get_email_body", f"No email found with ID {email_id}.", rows=0)
 
-        result = []
-        for row in rows:
-            email_id, sender, received_at, subject, content = row
-            result.append(f"ID: {email_id}\nFrom: {sender}\nReceived: {received_at}\nSubject: {subject}\nContent: {content}\n")
-
-        return "\n---\n".join(result)
+        email_id, sender, received_at, subject, content = row
+        return record_result(
+            "get_email_body",
+            f"ID: {email_id}\nFrom: {sender}\nReceived: {received_at}\nSubject: {subject}\nContent: {content}\n",
+        )
 
     except Exception as e:
-        return f"Error retrieving emails by sender: {str(e)}"
+        return f"Error retrieving email: {str(e)}"
 
 
-EmailAgent = Agent(
+EmailAgent = BudgetedAgent(
     name="Email Agent",
-    model=OpenAIChat(id="gpt-4o"),
+    model=build_model("gpt-4o"),
     role="Read and summarize emails from the database, extract names and relevant information",
-    db=SqliteDb(db_file=DATABASE_PATH),
-    tools=[get_recent_emails, search_emails, get_emails_by_sender],
+    db=get_database(),
+    tools=[get_recent_emails, search_emails, semantic_search_emails, get_emails_by_sender, get_email_body],
     instructions=[
-        "Search and retrieve emails from the SQLite database.",
+        "Search and retrieve emails from the database.",
         "Summarize email content and extract key information like names, dates, and topics.",
         "Help users find specific emails based on sender, subject, or keywords.",
+        "Use search_emails for exact words or names, and semantic_search_emails for topics or questions phrased in other words than the emails use.",
         "Provide clear, concise summaries of email threads and conversations.",
+        "List tools return one line per email with a short preview; call get_email_body(id) when the full text is needed.",
+        "If a result ends with a cursor, pass it back as `cursor` to get the next page.",
     ],
     add_history_to_context=True,
     markdown=True,
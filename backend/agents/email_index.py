@@ -0,0 +1,495 @@
+"""
+Vector index over the emails table for semantic_search_emails.
+
+Emails are embedded on the CPU with a hashing vectorizer (stemmed words and word pairs
+hashed into EMAIL_INDEX_DIM signed buckets), so there is no model to download and the same
+text always maps to the same vector. Vectors are stored int8-quantized in memory-mapped
+files next to the database:
+
+    <DATABASE_PATH>.email_index/
+        meta.json       dimensions, row counts, last indexed email id
+        vectors.i8      (count, dim) int8, one row per email
+        scales.f32      (count,) dequantization scale per row
+        ids.i64         (count,) email id per row
+        centroids.npy   (lists, dim) float32 k-means centroids
+        offsets.npy     (lists + 1,) first row of each list
+
+Search is approximate (IVF): rows are stored grouped by their nearest centroid, and a query
+only scores the rows of its EMAIL_INDEX_PROBES nearest lists. Emails added since the last
+rebuild are appended to an unclustered tail that every query scans exactly; the tail is
+merged into the lists once it grows past EMAIL_INDEX_MERGE_ROWS. Built on startup, or by hand:
+
+    python -m agents.email_index [--rebuild]
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from database import file_lock, get_connection
+from database.db import DATABASE_PATH
+
+# Where the index lives (a directory next to agno.db by default)
+EMAIL_INDEX_PATH = os.getenv("EMAIL_INDEX_PATH", f"{DATABASE_PATH}.email_index")
+# Embedding size; changing it rebuilds the index
+EMAIL_INDEX_DIM = int(os.getenv("EMAIL_INDEX_DIM", "256"))
+# IVF lists (0 = about sqrt(rows)) and how many of them each query scans
+EMAIL_INDEX_LISTS = int(os.getenv("EMAIL_INDEX_LISTS", "0"))
+EMAIL_INDEX_PROBES = int(os.getenv("EMAIL_INDEX_PROBES", "64"))
+# Lowest cosine score returned; below it matches are mostly hash collisions
+EMAIL_INDEX_MIN_SCORE = float(os.getenv("EMAIL_INDEX_MIN_SCORE", "0.08"))
+# Below this many emails every query is an exact scan and no clustering is trained
+EMAIL_INDEX_MIN_TRAIN_ROWS = int(os.getenv("EMAIL_INDEX_MIN_TRAIN_ROWS", "20000"))
+# Unclustered rows tolerated before they are merged into the lists
+EMAIL_INDEX_MERGE_ROWS = int(os.getenv("EMAIL_INDEX_MERGE_ROWS", "50000"))
+# New emails a search indexes inline; bigger backlogs are indexed on a background thread
+EMAIL_INDEX_SYNC_ROWS = int(os.getenv("EMAIL_INDEX_SYNC_ROWS", "2000"))
+# Characters of each email body that are embedded
+EMAIL_INDEX_MAX_CHARS = int(os.getenv("EMAIL_INDEX_MAX_CHARS", "2000"))
+
+_BATCH_ROWS = 20_000
+_SCAN_ROWS = 262_144  # rows dequantized per matrix product in exact scans
+_KMEANS_SAMPLE_PER_LIST = 64
+_KMEANS_ITERATIONS = 10
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+_SUFFIXES = ("ings", "ing", "ies", "ied", "ers", "er", "es", "ed", "ly", "s")
+_STOPWORDS = frozenset(
+    "the and for are but not you your with this that have from they will would there their what "
+    "about which when make can like just him her his she our out was were has had been its who "
+    "all any get got re fw fwd cc hi hello thanks regards best dear".split()
+)
+
+
+def _stem(word: str) -> str:
+    # Crude suffix stripping so "meetings", "meeting" and "meet" share a feature
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)]
+    return word
+
+
+def _mix(h: np.ndarray) -> np.ndarray:
+    # murmur3 finalizer on uint64 holding 32-bit values
+    h = h ^ (h >> np.uint64(16))
+    h = (h * np.uint64(0x85EBCA6B)) & np.uint64(0xFFFFFFFF)
+    h = h ^ (h >> np.uint64(13))
+    h = (h * np.uint64(0xC2B2AE35)) & np.uint64(0xFFFFFFFF)
+    return h ^ (h >> np.uint64(16))
+
+
+class HashingEmbedder:
+    """
+    Stateless text embedder: signed feature hashing of stemmed words and adjacent word pairs,
+    sublinear term frequency, L2-normalized float32 rows.
+    """
+
+    def __init__(self, dim: int = EMAIL_INDEX_DIM, cache_size: int = 500_000):
+        self.dim = dim
+        self.cache_size = cache_size
+        self._hashes: Dict[str, int] = {}
+
+    def _token_hash(self, token: str) -> int:
+        h = self._hashes.get(token)
+        if h is None:
+            if token in _STOPWORDS:
+                h = 0
+            else:
+                h = zlib.crc32(_stem(token).encode()) or 1
+            if len(self._hashes) >= self.cache_size:
+                self._hashes.clear()
+            self._hashes[token] = h
+        return h
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        n = len(texts)
+        tokens = [_TOKEN.findall(text.lower()) for text in texts]
+        lengths = np.fromiter((len(t) for t in tokens), dtype=np.int64, count=n)
+        total = int(lengths.sum())
+        token_hash = self._token_hash
+        hashes = np.fromiter((token_hash(t) for doc in tokens for t in doc), dtype=np.uint64, count=total)
+        doc = np.repeat(np.arange(n, dtype=np.int64), lengths)
+
+        # Word pairs within the same email and without a stopword on either side
+        pair = (doc[1:] == doc[:-1]) & (hashes[1:] != 0) & (hashes[:-1] != 0)
+        pair_hashes = _mix((hashes[:-1][pair] * np.uint64(0x9E3779B1) + hashes[1:][pair]) & np.uint64(0xFFFFFFFF))
+
+        words = hashes != 0
+        features = np.concatenate([_mix(hashes[words]), pair_hashes])
+        feature_doc = np.concatenate([doc[words], doc[:-1][pair]])
+        weights = np.concatenate([np.ones(int(words.sum()), np.float32), np.full(len(pair_hashes), 0.5, np.float32)])
+        signs = np.where(features & np.uint64(0x80000000), -1.0, 1.0).astype(np.float32)
+        buckets = (features % np.uint64(self.dim)).astype(np.int64)
+
+        counts = np.bincount(feature_doc * self.dim + buckets, weights=signs * weights, minlength=n * self.dim)
+        vectors = counts.reshape(n, self.dim).astype(np.float32)
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 quantization; vectors ≈ q * scale[:, None]"""
+    peak = np.abs(vectors).max(axis=1)
+    scales = (peak / 127.0).astype(np.float32)
+    q = np.rint(vectors / np.maximum(scales, 1e-12)[:, None]).astype(np.int8)
+    return q, scales
+
+
+def kmeans(vectors: np.ndarray, lists: int, iterations: int = _KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on unit rows; returns (lists, dim) unit centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), lists, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        sizes = np.bincount(assign, minlength=lists)
+        # Re-seed empty lists from random rows
+        empty = np.flatnonzero(sizes == 0)
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class _Snapshot(NamedTuple):
+    vectors: np.ndarray     # (count, dim) int8 memmap
+    scales: np.ndarray      # (count,) float32 memmap
+    ids: np.ndarray         # (count,) int64 memmap
+    centroids: Optional[np.ndarray]
+    offsets: Optional[np.ndarray]
+    clustered: int          # rows [0, clustered) are grouped by list, the rest is the tail
+    count: int
+
+
+class EmailVectorIndex:
+    """
+    Memory-mapped IVF index over emails. `search` is safe from any thread; writes (sync, merge,
+    rebuild) are serialized by a lock and publish a new snapshot when done, so searches never wait
+    on them and never see a half-written state. Worker processes sharing the index also take a
+    file lock around writes and start each one from the meta.json on disk.
+    """
+
+    def __init__(self, path: str = EMAIL_INDEX_PATH, database_path: Optional[str] = None, dim: int = EMAIL_INDEX_DIM):
+        self.path = Path(path)
+        self.database_path = database_path
+        self.embedder = HashingEmbedder(dim)
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._meta: Dict = {}
+        self._loaded = False
+        self._background: Optional[threading.Thread] = None
+        self._searches = 0
+        self._search_ms = 0.0
+        self._indexed_rows = 0
+        self._last_error: Optional[str] = None
+
+    # ---------- storage ----------
+
+    def _lock_file(self) -> str:
+        # Next to the directory, which _cluster replaces
+        return str(self.path.with_name(self.path.name + ".lock"))
+
+    def _file(self, name: str, base: Optional[Path] = None) -> Path:
+        return (base or self.path) / name
+
+    def _load(self) -> None:
+        meta_path = self._file("meta.json")
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+        if meta.get("dim") != self.embedder.dim:
+            # Missing index or built with another embedding size: start over
+            meta = {"dim": self.embedder.dim, "count": 0, "clustered": 0, "last_email_id": 0, "lists": 0}
+        self._meta = meta
+        self._publish()
+        self._loaded = True
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            with self._write_lock:
+                if not self._loaded:
+                    self._load()
+
+    def _memmap(self, name: str, dtype, shape) -> np.ndarray:
+        if not shape[0]:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    def _publish(self) -> None:
+        meta, dim = self._meta, self._meta["dim"]
+        count = meta["count"]
+        centroids = offsets = None
+        if meta["lists"]:
+            centroids = np.load(self._file("centroids.npy"))
+            offsets = np.load(self._file("offsets.npy"))
+        self._snapshot = _Snapshot(
+            vectors=self._memmap("vectors.i8", np.int8, (count, dim)),
+            scales=self._memmap("scales.f32", np.float32, (count,)),
+            ids=self._memmap("ids.i64", np.int64, (count,)),
+            centroids=centroids,
+            offsets=offsets,
+            clustered=meta["clustered"],
+            count=count,
+        )
+
+    def _write_meta(self, meta: Dict, base: Optional[Path] = None) -> None:
+        tmp = self._file("meta.json.tmp", base)
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self._file("meta.json", base))
+
+    def _append(self, vectors: np.ndarray, scales: np.ndarray, ids: np.ndarray) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        count = self._meta["count"]
+        for name, array in (("vectors.i8", vectors), ("scales.f32", scales), ("ids.i64", ids)):
+            with open(self._file(name), "ab") as f:
+                # Drop anything past `count` left by an interrupted append
+                f.truncate(count * array.itemsize * (array.shape[1] if array.ndim == 2 else 1))
+                f.write(np.ascontiguousarray(array).tobytes())
+        self._meta = {**self._meta, "count": count + len(ids), "last_email_id": int(ids[-1])}
+        self._write_meta(self._meta)
+
+    # ---------- writes ----------
+
+    def _pending_rows(self) -> int:
+        row = get_connection(self.database_path).execute(
+            "SELECT COUNT(*) FROM emails WHERE id > ?", (self._meta["last_email_id"],)
+        ).fetchone()
+        return row[0]
+
+    def sync(self, max_rows: Optional[int] = None) -> int:
+        """Embeds emails added since the last sync (up to max_rows) and returns how many were indexed"""
+        self._ensure_loaded()
+        with self._write_lock, file_lock(self._lock_file()):
+            # Another worker may have appended or merged since this one last looked
+            self._load()
+            conn = get_connection(self.database_path)
+            indexed = 0
+            while max_rows is None or indexed < max_rows:
+                batch = _BATCH_ROWS if max_rows is None else min(_BATCH_ROWS, max_rows - indexed)
+                rows = conn.execute("""
+                    SELECT id, subject, substr(content, 1, ?)
+                    FROM emails
+                    WHERE id > ?
+                    ORDER BY id
+                    LIMIT ?
+                """, (EMAIL_INDEX_MAX_CHARS, self._meta["last_email_id"], batch)).fetchall()
+                if not rows:
+                    break
+                # Subject counted twice: it is the best short summary of an email
+                vectors = self.embedder.embed([f"{subject} {subject} {content}" for _, subject, content in rows])
+                q, scales = quantize(vectors)
+                self._append(q, scales, np.array([row[0] for row in rows], dtype=np.int64))
+                indexed += len(rows)
+
+            tail = self._meta["count"] - self._meta["clustered"]
+            if self._meta["count"] >= EMAIL_INDEX_MIN_TRAIN_ROWS and (not self._meta["lists"] or tail >= EMAIL_INDEX_MERGE_ROWS):
+                self._cluster(retrain=not self._meta["lists"])
+            self._publish()
+
+        with self._stats_lock:
+            self._indexed_rows += indexed
+        return indexed
+
+    def rebuild(self) -> int:
+        """Drops the index and embeds every email again"""
+        with self._write_lock, file_lock(self._lock_file()):
+            shutil.rmtree(self.path, ignore_errors=True)
+            self._load()
+        return self.sync()
+
+    def _cluster(self, retrain: bool) -> None:
+        # Groups every row by nearest centroid into a fresh directory, then swaps it in.
+        # retrain=False keeps the centroids and only assigns the tail (a merge).
+        meta, dim = self._meta, self._meta["dim"]
+        count, clustered = meta["count"], meta["clustered"]
+        snapshot = _Snapshot(
+            vectors=np.memmap(self._file("vectors.i8"), dtype=np.int8, mode="r", shape=(count, dim)),
+            scales=np.memmap(self._file("scales.f32"), dtype=np.float32, mode="r", shape=(count,)),
+            ids=np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r", shape=(count,)),
+            centroids=None, offsets=None, clustered=clustered, count=count,
+        )
+
+        if retrain:
+            lists = EMAIL_INDEX_LISTS or int(np.clip(np.sqrt(count), 16, 4096))
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(count, min(count, lists * _KMEANS_SAMPLE_PER_LIST), replace=False))
+            centroids = kmeans(self._dequantize(snapshot, sample), lists)
+            assign = self._assign(snapshot, centroids, 0)
+        else:
+            centroids = np.load(self._file("centroids.npy"))
+            lists = len(centroids)
+            sizes = np.diff(np.load(self._file("offsets.npy")))
+            assign = np.concatenate([np.repeat(np.arange(lists), sizes), self._assign(snapshot, centroids, clustered)])
+
+        order = np.argsort(assign, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=lists))]).astype(np.int64)
+
+        staging = self.path.with_name(self.path.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name, array in (("vectors.i8", snapshot.vectors), ("scales.f32", snapshot.scales), ("ids.i64", snapshot.ids)):
+            with open(self._file(name, staging), "wb") as f:
+                for start in range(0, count, _SCAN_ROWS):
+                    f.write(np.ascontiguousarray(array[order[start:start + _SCAN_ROWS]]).tobytes())
+        np.save(self._file("centroids.npy", staging), centroids)
+        np.save(self._file("offsets.npy", staging), offsets)
+        meta = {**meta, "clustered": count, "lists": lists}
+        self._write_meta(meta, staging)
+
+        # Open memmaps of the old files stay valid after the swap (the inodes live on until unmapped)
+        retired = self.path.with_name(self.path.name + ".old")
+        shutil.rmtree(retired, ignore_errors=True)
+        os.replace(self.path, retired)
+        os.replace(staging, self.path)
+        shutil.rmtree(retired, ignore_errors=True)
+        self._meta = meta
+
+    @staticmethod
+    def _dequantize(snapshot: _Snapshot, rows) -> np.ndarray:
+        return snapshot.vectors[rows].astype(np.float32) * snapshot.scales[rows][:, None]
+
+    def _assign(self, snapshot: _Snapshot, centroids: np.ndarray, start: int) -> np.ndarray:
+        parts = []
+        for offset in range(start, snapshot.count, _SCAN_ROWS):
+            block = slice(offset, min(offset + _SCAN_ROWS, snapshot.count))
+            # Scales are positive, so the nearest centroid of q equals that of q * scale
+            parts.append(np.argmax(snapshot.vectors[block].astype(np.float32) @ centroids.T, axis=1))
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def start_sync(self) -> bool:
+        """Runs sync() on a background thread unless one is already running"""
+        if self._background and self._background.is_alive():
+            return False
+
+        def run():
+            try:
+                self.sync()
+            except Exception as e:
+                self._last_error = str(e)
+
+        self._background = threading.Thread(target=run, name="email-index-sync", daemon=True)
+        self._background.start()
+        return True
+
+    def refresh(self) -> None:
+        """Indexes a small backlog of new emails inline; a large one is left to a background sync"""
+        self._ensure_loaded()
+        if self._background and self._background.is_alive():
+            return
+        pending = self._pending_rows()
+        if not pending:
+            return
+        if pending <= EMAIL_INDEX_SYNC_ROWS:
+            # Another search already indexing the same rows is fine: skip instead of waiting
+            if self._write_lock.acquire(blocking=False):
+                self._write_lock.release()
+                self.sync(max_rows=EMAIL_INDEX_SYNC_ROWS)
+        else:
+            self.start_sync()
+
+    # ---------- search ----------
+
+    @property
+    def size(self) -> int:
+        self._ensure_loaded()
+        return self._snapshot.count
+
+    def search_batch(
+        self, queries: Sequence[str], k: int = 10, probes: int = EMAIL_INDEX_PROBES, min_score: float = EMAIL_INDEX_MIN_SCORE,
+    ) -> List[List[Tuple[int, float]]]:
+        """(email id, cosine score) pairs for each query, best first"""
+        self._ensure_loaded()
+        start = time.perf_counter()
+        s = self._snapshot
+        q = self.embedder.embed(list(queries))
+        m = len(queries)
+        candidates: List[List[Tuple[np.ndarray, np.ndarray]]] = [[] for _ in range(m)]
+
+        # Tail rows (all rows when there are no lists) are shared by every query: one product per block
+        for offset in range(s.clustered, s.count, _SCAN_ROWS):
+            block = slice(offset, min(offset + _SCAN_ROWS, s.count))
+            scores = (s.vectors[block].astype(np.float32) @ q.T) * s.scales[block][:, None]
+            for i in range(m):
+                candidates[i].append(self._top(scores[:, i], np.arange(block.start, block.stop), k))
+
+        if s.centroids is not None and s.clustered:
+            probes = min(probes, len(s.centroids))
+            nearest = np.argpartition(-(q @ s.centroids.T), probes - 1, axis=1)[:, :probes]
+            # Each probed list is dequantized once and scored for all the queries probing it
+            probing: Dict[int, List[int]] = {}
+            for i, lists in enumerate(nearest.tolist()):
+                for c in lists:
+                    probing.setdefault(c, []).append(i)
+            for c, who in sorted(probing.items()):
+                a, b = int(s.offsets[c]), int(s.offsets[c + 1])
+                if b <= a:
+                    continue
+                scores = (s.vectors[a:b].astype(np.float32) @ q[who].T) * s.scales[a:b][:, None]
+                rows = np.arange(a, b)
+                for j, i in enumerate(who):
+                    candidates[i].append(self._top(scores[:, j], rows, k))
+
+        results = []
+        for parts in candidates:
+            if not parts:
+                results.append([])
+                continue
+            scores = np.concatenate([p[0] for p in parts])
+            rows = np.concatenate([p[1] for p in parts])
+            best, best_rows = self._top(scores, rows, k)
+            order = np.argsort(-best, kind="stable")
+            results.append([(int(s.ids[r]), round(float(v), 4)) for v, r in zip(best[order], best_rows[order]) if v >= min_score])
+
+        with self._stats_lock:
+            self._searches += m
+            self._search_ms += (time.perf_counter() - start) * 1000
+        return results
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        return self.search_batch([query], k)[0]
+
+    @staticmethod
+    def _top(scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            return scores[keep], rows[keep]
+        return scores, rows
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        with self._stats_lock:
+            return {
+                "path": str(self.path),
+                "dim": self.embedder.dim,
+                "rows": snapshot.count if snapshot else 0,
+                "clustered_rows": snapshot.clustered if snapshot else 0,
+                "lists": len(snapshot.centroids) if snapshot and snapshot.centroids is not None else 0,
+                "probes": EMAIL_INDEX_PROBES,
+                "last_email_id": self._meta.get("last_email_id", 0),
+                "syncing": bool(self._background and self._background.is_alive()),
+                "indexed_since_start": self._indexed_rows,
+                "searches": self._searches,
+                "avg_search_ms": round(self._search_ms / self._searches, 2) if self._searches else 0.0,
+                "last_error": self._last_error,
+            }
+
+
+# Shared index used by semantic_search_emails
+email_index = EmailVectorIndex()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="drop the index and embed every email again")
+    args = parser.parse_args()
+    started = time.perf_counter()
+    indexed = email_index.rebuild() if args.rebuild else email_index.sync()
+    print(f"Indexed {indexed} email(s) in {time.perf_counter() - started:.1f}s: {json.dumps(email_index.stats())}")
@@ -1,23 +1,16 @@
-import os
-from dotenv import load_dotenv
-from agno.agent import Agent
-from agno.tools.exa import ExaTools
-
-load_dotenv()
-EXA_API_KEY = os.getenv("EXA_API_KEY")
 # agents/exa_agent.py
 import os
-from dotenv import load_dotenv
-from agno.agent import Agent
-from agno.tools.exa import ExaTools
 
-load_dotenv()
+from .exa_cache import CachedExaTools
+from .tracing import TracedAgent
+
 EXA_API_KEY = os.getenv("EXA_API_KEY")
 
-ExaAgent = Agent(
+ExaAgent = TracedAgent(
     name="Exa Search Agent",
     tools=[
-        ExaTools(
+        # Same ExaTools options; repeated searches and fetches are served from agents/exa_cache.py
+        CachedExaTools(
             api_key=EXA_API_KEY,
             # Keep the surface area small to avoid extra round-trips
             enable_search=True,
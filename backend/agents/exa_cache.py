@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+from agno.tools import Toolkit
+from agno.utils.log import log_warning
+
+from database import DatabaseError, get_connection, write_queue
+from .tracing import traced
+
+if TYPE_CHECKING:
+    from agno.tools.exa import ExaTools
+
+# In-memory entries kept in front of the exa_cache table
+EXA_CACHE_SIZE = int(os.getenv("EXA_CACHE_SIZE", "512"))
+# Seconds a result is served as fresh, per tool
+EXA_CACHE_TTL_SEARCH = int(os.getenv("EXA_CACHE_TTL_SEARCH", "3600"))
+EXA_CACHE_TTL_CONTENTS = int(os.getenv("EXA_CACHE_TTL_CONTENTS", "86400"))
+# Seconds past the TTL a result is still served while it is refreshed in the background (0 disables)
+EXA_CACHE_STALE_SECONDS = int(os.getenv("EXA_CACHE_STALE_SECONDS", "86400"))
+
+# Rows older than TTL + stale window are deleted every this many writes
+_PRUNE_EVERY = 100
+
+
+def normalize_query(query: str) -> str:
+    # 'Latest  AI news ' and 'latest ai news' are the same search
+    return " ".join(str(query).split()).casefold()
+
+
+def cache_key(tool: str, params: Dict[str, Any]) -> str:
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    return f"{tool}:{digest}"
+
+
+def is_cacheable(value: Any) -> bool:
+    # ExaTools reports failures as "Error: ..." strings; never keep those
+    return isinstance(value, str) and not value.startswith("Error")
+
+
+class ResponseCache:
+    """
+    Two-tier cache for tool responses: an in-memory LRU in front of the exa_cache table.
+
+    `get_or_fetch` serves entries younger than the tool's TTL. Entries up to `stale_seconds`
+    past the TTL are still served, and refreshed on a background thread (stale-while-revalidate).
+    Older or missing entries are fetched inline; concurrent misses for the same key share one fetch.
+    If the table is missing or the disk is unavailable the cache keeps working in memory only.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, int]] = None,
+        max_entries: int = EXA_CACHE_SIZE,
+        stale_seconds: int = EXA_CACHE_STALE_SECONDS,
+        default_ttl: int = EXA_CACHE_TTL_SEARCH,
+        persist: bool = True,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttls = dict(ttls or {})
+        self.max_entries = max_entries
+        self.stale_seconds = stale_seconds
+        self.default_ttl = default_ttl
+        self.persist = persist
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="exa-refresh")
+        self._writes = 0
+        self._counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "errors": 0,
+        }
+
+    def __deepcopy__(self, memo):
+        # Agents are deep-copied per team; every copy must keep using the shared cache
+        return self
+
+    def ttl(self, tool: str) -> int:
+        return self.ttls.get(tool, self.default_ttl)
+
+    def get_or_fetch(self, tool: str, params: Dict[str, Any], fetch: Callable[[], str]) -> str:
+        key = cache_key(tool, params)
+        entry = self._lookup(key)
+        if entry is not None:
+            value, created_at = entry
+            age = self.clock() - created_at
+            if age <= self.ttl(tool):
+                self._count("hits")
+                return value
+            if age <= self.ttl(tool) + self.stale_seconds:
+                self._count("stale_hits")
+                self._refresh_in_background(tool, key, fetch)
+                return value
+
+        self._count("misses")
+        return self._fetch(tool, key, fetch)
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if not self.persist:
+            return None
+        try:
+            row = get_connection().execute(
+                "SELECT value, created_at FROM exa_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except DatabaseError as e:
+            log_warning(f"Exa cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+
+        self._count("disk_hits")
+        self._remember(key, row[0], row[1])
+        return row[0], row[1]
+
+    def _fetch(self, tool: str, key: str, fetch: Callable[[], str]) -> str:
+        # Single flight: the first caller fetches, concurrent callers for the same key wait for it
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+            if is_cacheable(value):
+                self._store(tool, key, value)
+            else:
+                self._count("errors")
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            self._count("errors")
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh_in_background(self, tool: str, key: str, fetch: Callable[[], str]) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+        self._count("refreshes")
+        self._refresher.submit(self._refresh, tool, key, fetch)
+
+    def _refresh(self, tool: str, key: str, fetch: Callable[[], str]) -> None:
+        try:
+            self._fetch(tool, key, fetch)
+        except Exception as e:
+            # The stale value keeps being served until the next refresh succeeds
+            log_warning(f"Exa cache refresh failed for {tool}: {e}")
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, created_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _store(self, tool: str, key: str, value: str) -> None:
+        created_at = self.clock()
+        self._remember(key, value, created_at)
+        if not self.persist:
+            return
+        def write(conn):
+            conn.execute(
+                "INSERT INTO exa_cache(key, tool, value, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET tool = excluded.tool, value = excluded.value, created_at = excluded.created_at",
+                (key, tool, value, created_at),
+            )
+            self._writes += 1
+            if self._writes % _PRUNE_EVERY == 0:
+                oldest = created_at - max([self.default_ttl, *self.ttls.values()]) - self.stale_seconds
+                conn.execute("DELETE FROM exa_cache WHERE created_at < ?", (oldest,))
+
+        # The response is already in memory; the request doesn't wait for the disk copy
+        write_queue.write_later(write, label="Exa cache write")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def clear(self) -> None:
+        """Drops every entry from memory and disk (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+        if self.persist:
+            try:
+                write_queue.write(lambda conn: conn.execute("DELETE FROM exa_cache"))
+            except DatabaseError as e:
+                log_warning(f"Exa cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round((lookups - self._counters["misses"]) / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Shared by every ExaTools instance (agents, team copies, /api/search)
+exa_cache = ResponseCache(
+    ttls={"search_exa": EXA_CACHE_TTL_SEARCH, "get_contents": EXA_CACHE_TTL_CONTENTS},
+)
+
+
+# ExaTools defaults of the options that are part of every cache key
+_SETTING_DEFAULTS = {
+    "text": True,
+    "text_length_limit": 1000,
+    "highlights": True,
+    "summary": False,
+    "type": None,
+    "include_domains": None,
+    "exclude_domains": None,
+    "start_published_date": None,
+    "end_published_date": None,
+    "start_crawl_date": None,
+    "end_crawl_date": None,
+}
+_build_lock = threading.Lock()
+
+
+class CachedExaTools(Toolkit):
+    """
+    Exa search and get_contents with the ExaTools options, going through a ResponseCache.
+
+    The agno ExaTools that makes the requests, and the exa_py client it imports (~350 ms), are
+    only built on the first call that misses the cache, so startup doesn't pay for them and a
+    missing EXA_API_KEY only fails the Exa calls.
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, enable_search: bool = True,
+                 enable_get_contents: bool = True, **options):
+        self.cache = cache or exa_cache
+        self.options = {**options, "enable_search": enable_search, "enable_get_contents": enable_get_contents}
+        self._toolkit: Optional["ExaTools"] = None
+        tools = []
+        if enable_search:
+            tools.append(self.search_exa)
+        if enable_get_contents:
+            tools.append(self.get_contents)
+        super().__init__(name="exa", tools=tools)
+
+    @property
+    def toolkit(self) -> "ExaTools":
+        """The ExaTools doing the requests, built on first use"""
+        if self._toolkit is None:
+            with _build_lock:
+                if self._toolkit is None:
+                    from agno.tools.exa import ExaTools
+
+                    self._toolkit = ExaTools(**self.options)
+        return self._toolkit
+
+    @property
+    def exa(self):
+        # The exa_py client; benchmarks swap it for benchmarks/fake_exa.py
+        return self.toolkit.exa
+
+    @exa.setter
+    def exa(self, client) -> None:
+        self.toolkit.exa = client
+
+    def _settings(self) -> Dict[str, Any]:
+        # Toolkit options that change what Exa returns are part of every key
+        return {name: self.options.get(name, default) for name, default in _SETTING_DEFAULTS.items()}
+
+    def _request(self, tool: str, *args) -> str:
+        try:
+            toolkit = self.toolkit
+        except Exception as e:
+            return f"Error: {str(e)}"
+        return getattr(toolkit, tool)(*args)
+
+    @traced()
+    def search_exa(self, query: str, num_results: int = 5, category: Optional[str] = None) -> str:
+        """Use this function to search Exa (a web search engine) for a query.
+
+        Args:
+            query (str): The query to search for.
+            num_results (int): Number of results to return. Defaults to 5.
+            category (Optional[str]): The category to filter search results.
+                Options are "company", "research paper", "news", "pdf", "github",
+                "tweet", "personal site", "linkedin profile", "financial report".
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        params = {
+            **self._settings(),
+            "query": normalize_query(query),
+            "num_results": self.options.get("num_results") or num_results,
+            "category": self.options.get("category") or category,
+        }
+        return self.cache.get_or_fetch(
+            "search_exa", params, traced("exa.request")(lambda: self._request("search_exa", query, num_results, category))
+        )
+
+    @traced()
+    def get_contents(self, urls: list[str]) -> str:
+        """
+        Retrieve detailed content from specific URLs using the Exa API.
+
+        Args:
+            urls (list(str)): A list of URLs from which to fetch content.
+
+        Returns:
+            str: The search results in JSON format.
+        """
+        params = {**self._settings(), "urls": [url.strip() for url in urls]}
+        return self.cache.get_or_fetch("get_contents", params, traced("exa.request")(lambda: self._request("get_contents", urls)))
@@ -0,0 +1,56 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from .exa_agent import EXA_API_KEY
+from .exa_cache import CachedExaTools
+
+# Exa search types accepted by /api/search
+SEARCH_TYPES = ("auto", "neural", "keyword", "fast")
+# Queries per /api/search request, results per query, and page text kept per result with include_content
+SEARCH_MAX_BATCH = int(os.getenv("SEARCH_MAX_BATCH", "10"))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "25"))
+SEARCH_CONTENT_CHARS = int(os.getenv("SEARCH_CONTENT_CHARS", "2000"))
+
+_lock = threading.Lock()
+_toolkits: Dict[Tuple[str, bool], CachedExaTools] = {}
+
+
+def search_tools(search_type: str = "auto", include_content: bool = False) -> CachedExaTools:
+    """Toolkit for direct searches, one per (search_type, include_content), sharing the Exa cache"""
+    key = (search_type, include_content)
+    with _lock:
+        tools = _toolkits.get(key)
+        if tools is None:
+            tools = _toolkits[key] = CachedExaTools(
+                api_key=EXA_API_KEY,
+                enable_search=True,
+                enable_get_contents=False,
+                enable_answer=False,
+                enable_find_similar=False,
+                type=search_type,
+                # Page text only when asked for; highlights are short enough to always include
+                text=include_content,
+                text_length_limit=SEARCH_CONTENT_CHARS,
+                highlights=True,
+            )
+        return tools
+
+
+def direct_search(query: str, num_results: int = 5, search_type: str = "auto", include_content: bool = False) -> Dict[str, Any]:
+    """
+    Runs one Exa search without an agent and returns {query, results, took_ms},
+    or {query, error, took_ms} if Exa failed. Blocking; call it from a worker thread.
+    """
+    start = time.perf_counter()
+    raw = search_tools(search_type, include_content).search_exa(query, num_results=num_results)
+
+    result: Dict[str, Any] = {"query": query}
+    if raw.startswith("Error"):
+        result["error"] = raw.removeprefix("Error: ")
+    else:
+        result["results"] = json.loads(raw)
+    result["took_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Sequence, TypeVar
+
+from .tracing import record_span
+
+T = TypeVar("T")
+
+# Concurrent agent runs per process, and how many more may wait for a free worker
+AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", "8"))
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", "32"))
+
+
+class ExecutorBusy(Exception):
+    """Raised when the executor already has `max_workers + max_queue` calls pending."""
+
+
+class AgentExecutor:
+    """
+    Bounded thread pool for the blocking agno calls (team.run, session reads, sync tools).
+
+    Routers await `run(...)` so the event loop stays free while the LLM round trip
+    happens on a worker thread. Once every worker is busy and the queue is full,
+    new calls are rejected with ExecutorBusy instead of piling up.
+    """
+
+    def __init__(self, max_workers: int = AGENT_MAX_WORKERS, max_queue: int = AGENT_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.completed = 0
+
+    @property
+    def in_flight(self) -> int:
+        return min(self._pending, self.max_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self.max_workers, 0)
+
+    def _reserve(self, count: int) -> None:
+        with self._lock:
+            if self._pending + count > self.max_workers + self.max_queue:
+                self.rejected += count
+                raise ExecutorBusy(f"{self._pending} agent calls pending, try again later")
+            self._pending += count
+
+    def _start(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "asyncio.Future[T]":
+        # The worker runs in a copy of the caller's context so its spans join the request's trace
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, partial(self._call, time.time_ns(), fn, *args, **kwargs))
+        # Count the call as pending until the worker thread is done, even if the awaiting request is cancelled
+        future.add_done_callback(self._on_done)
+        return asyncio.wrap_future(future)
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "asyncio.Future[T]":
+        """Schedules fn on a worker thread. Raises ExecutorBusy right away if the queue is full."""
+        self._reserve(1)
+        return self._start(fn, *args, **kwargs)
+
+    def submit_all(self, fn: Callable[..., T], calls: Sequence[Sequence[Any]]) -> "List[asyncio.Future[T]]":
+        """
+        Schedules fn(*args) for every args in `calls`, all or none: raises ExecutorBusy without
+        starting any of them if the queue has no room for the whole batch.
+        """
+        self._reserve(len(calls))
+        return [self._start(fn, *args) for args in calls]
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.submit(fn, *args, **kwargs)
+
+    def stream(self, fn: Callable[..., Iterator[T]], *args: Any, **kwargs: Any) -> AsyncIterator[T]:
+        """
+        Iterates the sync generator returned by fn on a worker thread and yields its items on the event loop.
+        Closing the returned iterator (e.g. the client went away) stops the worker after its current item
+        and closes the generator. Raises ExecutorBusy right away if the queue is full.
+        """
+        loop = asyncio.get_running_loop()
+        queue: "asyncio.Queue" = asyncio.Queue()
+        stop = threading.Event()
+
+        def pump() -> None:
+            iterator = fn(*args, **kwargs)
+            try:
+                for item in iterator:
+                    loop.call_soon_threadsafe(queue.put_nowait, (False, item))
+                    if stop.is_set():
+                        break
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+
+        done = self.submit(pump)
+        done.add_done_callback(lambda _: queue.put_nowait((True, None)))
+
+        async def items() -> AsyncIterator[T]:
+            try:
+                while True:
+                    finished, item = await queue.get()
+                    if finished:
+                        # Re-raise anything the worker failed with
+                        await done
+                        return
+                    yield item
+            finally:
+                stop.set()
+
+        return items()
+
+    @staticmethod
+    def _call(submitted_ns: int, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        record_span("executor.queue", submitted_ns)
+        return fn(*args, **kwargs)
+
+    def _on_done(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared executor used by the routers
+agent_executor = AgentExecutor()
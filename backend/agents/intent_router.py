@@ -0,0 +1,578 @@
+"""
+Fast path in front of RAGTeam for requests whose intent is obvious.
+
+Every team run costs at least two sequential LLM round trips: the leader picks a member, the
+member calls its tools and answers, and the leader writes the final reply. A local classifier
+(regex rules plus a small TF-IDF model, CPU only) routes each message to one of:
+
+- tool:   a single read-only tool call with arguments taken from the message ("show my last
+          5 emails"); no LLM at all, the result is returned as a markdown table
+- member: the email, calendar or web agent straight away; one LLM round trip
+- fanout: independent parts for several members ("emails from Dana and my next meeting with
+          her"); the members run at the same time and their answers are merged, so the wait is
+          the slowest member's instead of the sum (see fan_out in rag_team.py)
+- team:   everything else, including anything that refers back to the conversation or whose
+          parts depend on each other
+
+Fast-path exchanges are written to the team session like any other run, so the history and
+later team runs see them. With ANSWER_CACHE_ENABLED=1 their answers are also reused for the same
+question from any session until the tables they read change (agents/answer_cache.py).
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from agno.models.message import Message
+from agno.run.base import RunStatus
+from agno.run.team import TeamRunOutput
+from agno.session.team import TeamSession
+
+from .answer_cache import answer_cache
+from .calendar_agent import CalendarAgent, get_events_by_attendee, get_next_events, get_upcoming_events
+from .email_agent import EmailAgent, get_emails_by_sender, get_recent_emails, search_emails
+from .exa_agent import ExaAgent
+from .rag_team import fan_out, merge_answers
+from .tool_results import page_to_markdown
+from .tracing import span
+
+# Set to 0 to send every request to the team
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+# Set to 0 to stop at member agents instead of answering with a bare tool call
+ROUTER_DIRECT_TOOLS = os.getenv("ROUTER_DIRECT_TOOLS", "1") == "1"
+# Similarity to the best domain, and lead over the runner-up, needed to skip the team leader
+ROUTER_MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "0.3"))
+ROUTER_MIN_MARGIN = float(os.getenv("ROUTER_MIN_MARGIN", "0.1"))
+# Similarity a request needs when one of its domain's keywords backs the classifier (still with
+# ROUTER_MIN_MARGIN over the runner-up)
+ROUTER_KEYWORD_MIN_SCORE = float(os.getenv("ROUTER_KEYWORD_MIN_SCORE", "0.1"))
+# Longer messages are assumed to need the team
+ROUTER_MAX_WORDS = int(os.getenv("ROUTER_MAX_WORDS", "25"))
+# Set to 0 to send multi-domain requests to the team leader instead of running the members in parallel
+ROUTER_FANOUT = os.getenv("ROUTER_FANOUT", "1") == "1"
+# Similarity each part of a multi-domain request needs to its domain (with ROUTER_MIN_MARGIN over
+# the runner-up) to be fanned out; parts are shorter than whole requests, so this is below ROUTER_MIN_SCORE
+ROUTER_FANOUT_MIN_SCORE = float(os.getenv("ROUTER_FANOUT_MIN_SCORE", "0.2"))
+
+# Team member handling each domain
+DOMAIN_AGENTS = {"email": EmailAgent, "calendar": CalendarAgent, "web": ExaAgent}
+# Section titles of a merged fan-out answer, and what each member is told to stick to
+DOMAIN_TITLES = {"email": "Email", "calendar": "Calendar", "web": "Web"}
+DOMAIN_SCOPES = {"email": "the user's emails", "calendar": "the user's calendar", "web": "information from the web"}
+
+DOMAIN_EXAMPLES = {
+    "email": [
+        "show my recent emails",
+        "list my latest messages",
+        "check my inbox",
+        "find emails from dana",
+        "emails sent by chris last week",
+        "search my emails for the invoice",
+        "did anyone email me about the budget",
+        "summarize the emails about the offsite",
+        "what did alex write in his last email",
+        "any unread mail today",
+        "who sent me messages about the contract",
+        "find the email with the project proposal",
+        "read the email about the quarterly report",
+        "summarize my inbox",
+        "emails mentioning the deadline",
+        "extract the names from the emails about hiring",
+    ],
+    "calendar": [
+        "what's on my calendar this week",
+        "show my upcoming meetings",
+        "what is my next meeting",
+        "add a meeting tomorrow at 2pm with the team",
+        "schedule a call with dana on friday at 10am",
+        "am i free on thursday afternoon",
+        "when am i busy tomorrow",
+        "show events with chris",
+        "list all my calendar events",
+        "do i have any appointments next monday",
+        "book a 30 minute sync with the design team",
+        "find a free slot next week for a one hour meeting",
+        "what meetings do i have today",
+        "does the new event conflict with anything",
+        "put lunch with sam on my calendar at noon",
+        "my schedule for the next few days",
+    ],
+    "web": [
+        "search the web for agno agent framework",
+        "latest news about openai",
+        "find articles about rust async runtimes",
+        "look up the documentation for fastapi dependencies",
+        "what is retrieval augmented generation",
+        "who is the ceo of nvidia",
+        "research the best vector databases",
+        "get the content of https://example.com/post",
+        "what happened in the stock market today",
+        "google the weather in paris",
+        "find recent papers on llm quantization",
+        "what are the reviews of the new macbook",
+        "search online for python 3.13 release notes",
+        "news about the company anthropic",
+        "explain how transformers work with sources",
+        "compare postgres and mysql performance online",
+    ],
+}
+
+# Words that tie a domain in; two domains in one message go to the team
+DOMAIN_KEYWORDS = {
+    "email": {"email", "emails", "emailed", "e-mail", "e-mails", "mail", "mails", "inbox", "unread", "sender",
+              "attachment", "attachments"},
+    "calendar": {"calendar", "meeting", "meetings", "event", "events", "schedule", "appointment", "appointments",
+                 "agenda", "free", "busy", "book", "reschedule", "slot", "slots", "standup", "availability"},
+    "web": {"web", "online", "internet", "google", "news", "article", "articles", "website", "http", "https",
+            "research", "documentation", "docs", "papers", "wikipedia", "weather"},
+}
+
+# Where a multi-domain request splits into its parts ("emails from Dana and my next meeting")
+PART_BREAK = re.compile(r"\s*(?:[,;]|\b(?:and|also|plus|as well as)\b)\s*")
+
+# Messages that lean on earlier turns need the team, which has the history
+REFERENCE = re.compile(
+    r"\b(it|that|those|these|them|him|her|his|their|they|above|previous|earlier|again|same|"
+    r"this one|the (?:first|second|third|other|last) one|more|instead)\b"
+)
+
+# Short replies that continue the previous turn ("and tomorrow?", "what about Chris", "yes, do it")
+FOLLOW_UP = re.compile(
+    r"^(?:and|also|so|then|what about|how about|ok|okay|yes|yeah|yep|sure|go ahead|do it)\b"
+    r"|\b(?:as well|too|go ahead|do it)$"
+)
+
+# Pronouns that may point at a name earlier in the same message ("emails from Dana and meetings with her")
+PERSONAL = {"him", "her", "his", "they", "them", "their"}
+NAMED = re.compile(r"(?<!^)(?<![.?!] )\b(?!I\b|I')[A-Z][\w'-]+|[\w.+-]+@[\w-]+\.\w+")
+
+# One part of a multi-domain request needing the result of another: actions on what was found
+# ("find the invite and add it"), conditions ("email Chris if I'm free") and cross-references
+# ("companies mentioned in my emails", "the people I'm meeting")
+DEPENDENT = re.compile(
+    r"\b(add|create|book|reschedule|move|cancel|invite|reply|forward|draft|then|based on|using|if|whether|unless)\b"
+    r"|\b(?:schedule|send|email) (?:a|an|the|it|them|him|her|time)\b"
+    r"|\b(?:mentioned|listed|named|referenced|attending|sent|in|from) (?:in |by )?my (?:e-?mails?|inbox|calendar|meetings?|events?)\b"
+    r"|\b(?:people|person|companies|company|attendees|senders|participants) (?:i|i'm|i am|who|that)\b"
+)
+
+# Requests to change something: the team has the conversation (which meeting, which email) and the
+# member copies on the fast path don't
+ACTION = re.compile(
+    r"(?:(?:please|pls|hey|hi|ok|okay|now|can you|could you|would you|i want to|i'd like to|i need to)\s+)*"
+    r"(?:add|create|book|schedule|reschedule|move|cancel|delete|remove|invite|reply|respond|forward|send|draft|"
+    r"put|accept|decline|rsvp|mark|archive|update|change|rename)\b"
+)
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15, "twenty": 20, "few": 3, "couple of": 2,
+}
+NUMBER = r"(?:\d+|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + ")"
+
+# Words that, inside a name or keyword, mean the request has a filter the tools don't take
+QUALIFIERS = re.compile(
+    r"\b(today|tomorrow|yesterday|this|last|next|week|month|year|ago|since|before|after|about|and|or|"
+    r"but|not|unread|important|urgent|summar\w*|reply|when|where|why|how)\b"
+)
+
+POLITE = r"(?:(?:please|pls|hey|hi|ok|okay|can you|could you|would you|i want to|i'd like to)\s+)*"
+VERB = r"(?:(?:show|list|get|give|display|fetch|find|pull up|open|check|see|view|what are|what's|whats|what is)\s+)?"
+PREFIX = POLITE + VERB + r"(?:me\s+)?(?:all\s+)?(?:of\s+)?(?:my\s+|the\s+|our\s+)?"
+EMAILS = r"(?:e-?mails?|messages|mails?)"
+EVENTS = r"(?:events|meetings|appointments|calendar|schedule|agenda)"
+WINDOW = r"(?:(?:in|for|over|during)\s+)?(?:the\s+)?(?:next|coming)\s+(?P<num>" + NUMBER + r")\s+(?P<unit>days?|weeks?)"
+NAME = r"(?P<name>[\w.@+'-]+(?:\s+[\w.@+'-]+){0,2})"
+
+# (intent, pattern, tool name); patterns must match the whole normalized message
+TOOL_RULES: List[Tuple[str, "re.Pattern", str]] = [
+    ("email.by_sender", re.compile(PREFIX + r"(?:(?P<n>" + NUMBER + r")\s+)?(?:(?:latest|recent|last)\s+)?(?:(?P<n2>" + NUMBER + r")\s+)?" + EMAILS
+                                   + r"\s+(?:from|sent by|by)\s+" + NAME), "get_emails_by_sender"),
+    ("email.search", re.compile(PREFIX + EMAILS + r"\s+(?:about|regarding|mentioning|on|related to|with subject)\s+(?P<keyword>.+)"),
+     "search_emails"),
+    ("email.search", re.compile(POLITE + r"search\s+(?:my\s+|the\s+)?(?:e-?mails?|inbox|mail)\s+for\s+(?P<keyword>.+)"),
+     "search_emails"),
+    ("email.recent", re.compile(PREFIX + r"(?:(?P<n>" + NUMBER + r")\s+)?(?:most\s+)?(?:latest|recent|last|newest|new)\s+(?:(?P<n2>"
+                                + NUMBER + r")\s+)?" + EMAILS + r"(?:\s+in\s+my\s+inbox)?"), "get_recent_emails"),
+    ("email.recent", re.compile(PREFIX + r"(?:e-?mails|inbox)"), "get_recent_emails"),
+    ("calendar.next", re.compile(PREFIX + r"next\s+(?:(?P<n>" + NUMBER
+                                 + r")\s+)?(?P<noun>events?|meetings?|appointments?)(?:\s+on\s+my\s+calendar)?"), "get_next_events"),
+    ("calendar.next", re.compile(POLITE + r"what(?:'s|s| is)\s+next(?:\s+on\s+my\s+(?:calendar|schedule))?"), "get_next_events"),
+    ("calendar.by_attendee", re.compile(PREFIX + r"(?:events|meetings|appointments|calls)\s+with\s+" + NAME), "get_events_by_attendee"),
+    ("calendar.upcoming", re.compile(PREFIX + r"(?:upcoming\s+)?" + EVENTS + r"(?:\s+" + WINDOW + r")?"), "get_upcoming_events"),
+    ("calendar.upcoming", re.compile(POLITE + r"what(?:'s|s| is)\s+(?:on\s+my\s+(?:calendar|schedule|agenda)|coming up)(?:\s+" + WINDOW + r")?"),
+     "get_upcoming_events"),
+    ("calendar.upcoming", re.compile(POLITE + r"what\s+(?:events|meetings|appointments)\s+do\s+i\s+have(?:\s+coming\s+up)?(?:\s+" + WINDOW + r")?"),
+     "get_upcoming_events"),
+]
+
+TOOLS: Dict[str, Callable[..., str]] = {
+    "get_recent_emails": get_recent_emails,
+    "search_emails": search_emails,
+    "get_emails_by_sender": get_emails_by_sender,
+    "get_next_events": get_next_events,
+    "get_upcoming_events": get_upcoming_events,
+    "get_events_by_attendee": get_events_by_attendee,
+}
+
+
+@dataclass
+class Route:
+    target: str  # "tool", "member", "fanout" or "team"
+    domain: Optional[str] = None
+    confidence: float = 0.0
+    reason: str = ""
+    intent: Optional[str] = None
+    tool: Optional[str] = None
+    arguments: Dict[str, Any] = field(default_factory=dict)
+    domains: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v not in (None, {}, [])}
+
+
+def collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().rstrip("?!. ")
+
+
+def normalize(text: str) -> str:
+    return collapse(text).lower()
+
+
+def _number(value: Optional[str], default: int) -> int:
+    if not value:
+        return default
+    return int(value) if value.isdigit() else NUMBER_WORDS.get(value, default)
+
+
+def _tokens(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9@']+", text)
+    # Crude plural folding so "email" and "emails" share a feature
+    words = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class IntentClassifier:
+    """TF-IDF nearest-centroid classifier over a few example requests per domain."""
+
+    def __init__(self, examples: Dict[str, List[str]] = DOMAIN_EXAMPLES):
+        docs = [(domain, Counter(_tokens(normalize(text)))) for domain, texts in examples.items() for text in texts]
+        df = Counter(term for _, tf in docs for term in tf)
+        self.idf = {term: math.log((1 + len(docs)) / (1 + count)) + 1 for term, count in df.items()}
+        self.centroids: Dict[str, Dict[str, float]] = {}
+        for domain in examples:
+            centroid: Counter = Counter()
+            for doc_domain, tf in docs:
+                if doc_domain == domain:
+                    centroid.update(self._vector(tf))
+            self.centroids[domain] = self._normalized(centroid)
+
+    def _vector(self, tf: Counter) -> Dict[str, float]:
+        return self._normalized({term: count * self.idf[term] for term, count in tf.items() if term in self.idf})
+
+    @staticmethod
+    def _normalized(vector: Dict[str, float]) -> Dict[str, float]:
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {term: v / norm for term, v in vector.items()}
+
+    def scores(self, text: str) -> Dict[str, float]:
+        vector = self._vector(Counter(_tokens(text)))
+        return {
+            domain: sum(weight * centroid.get(term, 0.0) for term, weight in vector.items())
+            for domain, centroid in self.centroids.items()
+        }
+
+
+intent_classifier = IntentClassifier()
+
+
+def _tool_route(text: str, original: str) -> Optional[Route]:
+    for intent, pattern, tool in TOOL_RULES:
+        match = pattern.fullmatch(text)
+        if not match:
+            continue
+        groups = match.groupdict()
+        # Names and keywords keep the user's casing
+        if len(original) == len(text):
+            groups.update({k: original[match.start(k):match.end(k)] for k in ("name", "keyword") if groups.get(k)})
+        if tool == "get_recent_emails":
+            arguments = {"limit": _number(groups.get("n") or groups.get("n2"), 10)}
+        elif tool == "get_emails_by_sender":
+            arguments = {"sender_name": groups["name"], "limit": _number(groups.get("n") or groups.get("n2"), 10)}
+        elif tool == "search_emails":
+            arguments = {"keyword": groups["keyword"]}
+        elif tool == "get_events_by_attendee":
+            arguments = {"attendee_name": groups["name"]}
+        elif tool == "get_next_events":
+            plural = (groups.get("noun") or "s").endswith("s")
+            arguments = {"count": _number(groups.get("n"), 5 if plural else 1)}
+        else:
+            days = _number(groups.get("num"), 7)
+            arguments = {"days": days * 7 if (groups.get("unit") or "").startswith("week") else days}
+
+        # Names and keywords must be plain; anything else is a filter only an agent can apply
+        value = arguments.get("sender_name") or arguments.get("attendee_name") or arguments.get("keyword") or ""
+        if QUALIFIERS.search(value.lower()) or len(value.split()) > 5:
+            return None
+        domain = intent.split(".")[0]
+        return Route("tool", domain, 1.0, "rule", intent, tool, arguments)
+    return None
+
+
+def _refers_back(text: str, original: str) -> bool:
+    """Whether `text` points at earlier turns; he/she/they after a name in the message don't count"""
+    for match in REFERENCE.finditer(text):
+        word = match.group(1)
+        if word in PERSONAL and len(original) == len(text) and NAMED.search(original[:match.start()]):
+            continue
+        return True
+    return False
+
+
+def _part_confidence(text: str) -> Dict[str, float]:
+    """
+    Best score per domain over the parts of `text` that clearly ask for it: the classifier gives
+    the part to the domain, or the part has two or more of its keywords and none of another's
+    ("web news on pricing")
+    """
+    confidence: Dict[str, float] = {}
+    for part in PART_BREAK.split(text):
+        if not part:
+            continue
+        scores = intent_classifier.scores(part)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (best, score), (_, runner_up) = ranked[0], ranked[1]
+        if score >= ROUTER_FANOUT_MIN_SCORE and score - runner_up >= ROUTER_MIN_MARGIN:
+            confidence[best] = max(confidence.get(best, 0.0), score)
+            continue
+        words = set(re.findall(r"[a-z-]+", part))
+        hits = {domain: len(words & keywords) for domain, keywords in DOMAIN_KEYWORDS.items() if words & keywords}
+        if len(hits) == 1 and max(hits.values()) >= 2:
+            domain = next(iter(hits))
+            confidence[domain] = max(confidence.get(domain, 0.0), scores[domain])
+    return confidence
+
+
+def _fanout_route(text: str, original: str, domains: List[str]) -> Route:
+    reason = f"mixes {' and '.join(domains)}"
+    if not ROUTER_FANOUT:
+        return Route("team", reason=reason)
+    if DEPENDENT.search(text):
+        return Route("team", reason=f"{reason}, parts depend on each other")
+    if _refers_back(text, original):
+        return Route("team", reason="refers to the conversation")
+    # Keywords only say a domain is mentioned; each one needs a part that asks for it
+    confidence = _part_confidence(text)
+    unsure = [domain for domain in domains if domain not in confidence]
+    if unsure:
+        return Route("team", reason=f"{reason}, no clear request for {' and '.join(unsure)}")
+    return Route("fanout", confidence=round(min(confidence[domain] for domain in domains), 3), reason=reason, domains=domains)
+
+
+def classify(message: str) -> Route:
+    """Picks the cheapest handler that can answer `message` on its own"""
+    text = normalize(message)
+    if not text:
+        return Route("team", reason="empty")
+    if len(text.split()) > ROUTER_MAX_WORDS:
+        return Route("team", reason="long message")
+
+    words = set(re.findall(r"[a-z-]+", text))
+    mentioned = [domain for domain, keywords in DOMAIN_KEYWORDS.items() if words & keywords]
+    if len(mentioned) > 1:
+        return _fanout_route(text, collapse(message), mentioned)
+    if REFERENCE.search(text) or FOLLOW_UP.search(text):
+        return Route("team", reason="refers to the conversation")
+    if ACTION.match(text):
+        return Route("team", reason="asks for a change")
+
+    if ROUTER_DIRECT_TOOLS:
+        route = _tool_route(text, collapse(message))
+        if route is not None:
+            return route
+
+    scores = intent_classifier.scores(text)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, score), (_, runner_up) = ranked[0], ranked[1]
+    if mentioned and mentioned[0] != best:
+        return Route("team", best, round(score, 3), f"keywords say {mentioned[0]}")
+    if score - runner_up >= ROUTER_MIN_MARGIN:
+        if mentioned and score >= ROUTER_KEYWORD_MIN_SCORE:
+            return Route("member", best, round(score, 3), "keywords and classifier")
+        if score >= ROUTER_MIN_SCORE:
+            return Route("member", best, round(score, 3), "classifier")
+    return Route("team", best if score > 0 else None, round(score, 3), "low confidence")
+
+
+class RouteStats:
+    """Requests per route target, fast paths that fell back to the team, and time per target."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, target: str, seconds: float, fallback: bool = False) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(target, {"requests": 0, "fallbacks": 0, "total_ms": 0.0})
+            stats["requests"] += 1
+            stats["fallbacks"] += fallback
+            stats["total_ms"] += seconds * 1000
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                target: {**stats, "avg_ms": round(stats["total_ms"] / stats["requests"], 1)}
+                for target, stats in self._stats.items()
+            }
+
+
+route_stats = RouteStats()
+
+
+def _fast_path_agent(team, domain: str):
+    # History-less copy of the member, built once per pooled team; the team session keeps the history
+    agents = team.__dict__.setdefault("_fast_path_agents", {})
+    if domain not in agents:
+        agent = DOMAIN_AGENTS[domain]
+        # The team's member copy has the resolved model (ExaAgent inherits the team's)
+        member = next(m for m in team.members if m.name == agent.name)
+        agents[domain] = agent.deep_copy(update={"db": None, "add_history_to_context": False, "model": member.model})
+    return agents[domain]
+
+
+def _drop_fast_path_agent(team, domain: str) -> None:
+    # A timed-out run may still be winding down on its thread; the next request gets a fresh copy
+    team.__dict__.get("_fast_path_agents", {}).pop(domain, None)
+
+
+def _scoped_task(message: str, domain: str) -> str:
+    return (
+        f"{message}\n\nOnly answer the part of this request about {DOMAIN_SCOPES[domain]}; "
+        "other assistants answer the rest, so don't mention it."
+    )
+
+
+def _team_session(team, session_id: str) -> TeamSession:
+    """The stored team session, or a new one as team.run() would start it (public agno API only)"""
+    session = team.get_session(session_id)
+    if session is None:
+        session = TeamSession(
+            session_id=session_id,
+            team_id=team.id,
+            team_data={"name": team.name, "team_id": team.id, "model": team.model.to_dict()},
+            session_data={},
+            created_at=int(time.time()),
+        )
+    return session
+
+
+def _record_run(team, session_id: str, message: str, content: str, route: Route,
+                tool_output: Optional[str] = None, member_runs: Sequence = ()) -> TeamRunOutput:
+    messages = [Message(role="user", content=message)]
+    if tool_output is not None:
+        call_id = f"call_{uuid.uuid4().hex[:24]}"
+        messages += [
+            Message(role="assistant", tool_calls=[{
+                "id": call_id, "type": "function",
+                "function": {"name": route.tool, "arguments": json.dumps(route.arguments)},
+            }]),
+            Message(role="tool", tool_call_id=call_id, tool_name=route.tool, content=tool_output),
+        ]
+    messages.append(Message(role="assistant", content=content))
+
+    run = TeamRunOutput(
+        run_id=str(uuid.uuid4()),
+        team_id=team.id,
+        team_name=team.name,
+        session_id=session_id,
+        content=content,
+        messages=messages,
+        member_responses=list(member_runs),
+        model=getattr(member_runs[0], "model", None) if member_runs else None,
+        metadata={"route": route.as_dict()},
+        status=RunStatus.completed,
+    )
+    # Stored without member runs (saving scrubs them in place), the caller still gets them
+    session = _team_session(team, session_id)
+    session.upsert_run(replace(run, member_responses=[]))
+    team.save_session(session)
+    return run
+
+
+def run_routed(team, message: str, session_id: str, route: Optional[Route] = None) -> TeamRunOutput:
+    """
+    Answers `message` through the fast path picked by classify(), or team.run() otherwise.
+    A fast path that fails falls back to the team. The route is in the run's metadata["route"],
+    and metadata["cached"] is set when the answer came from the answer cache.
+    """
+    start = time.perf_counter()
+    with span("route") as current:
+        route = route or (classify(message) if ROUTER_ENABLED else Route("team", reason="router disabled"))
+        if current is not None:
+            current.set("target", route.target)
+    fallback = False
+
+    cache_key = answer_cache.key(message, route, team.model.id)
+    if cache_key is not None:
+        with span("answer_cache"):
+            cached = answer_cache.get(cache_key)
+        if cached is not None:
+            run = _record_run(team, session_id, message, cached, route)
+            run.metadata["cached"] = True
+            route_stats.record("cache", time.perf_counter() - start)
+            return run
+
+    if route.target == "tool":
+        output = TOOLS[route.tool](**route.arguments)
+        if output.startswith("Error"):
+            fallback = True
+        else:
+            run = _record_run(team, session_id, message, page_to_markdown(output), route, tool_output=output)
+            answer_cache.put(cache_key, run.content)
+            route_stats.record("tool", time.perf_counter() - start)
+            return run
+
+    elif route.target == "member":
+        # stream=False explicitly: agno keeps `stream` switched on after any streamed run of the same agent
+        member_run = _fast_path_agent(team, route.domain).run(input=message, session_id=session_id, stream=False)
+        if member_run.status == RunStatus.error or not member_run.content:
+            fallback = True
+        else:
+            run = _record_run(team, session_id, message, member_run.content, route, member_runs=[member_run])
+            answer_cache.put(cache_key, run.content)
+            route_stats.record("member", time.perf_counter() - start)
+            return run
+
+    elif route.target == "fanout":
+        tasks = {domain: (_fast_path_agent(team, domain), _scoped_task(message, domain)) for domain in route.domains}
+        results = fan_out(tasks, session_id)
+        for domain, result in results.items():
+            if result.timed_out:
+                _drop_fast_path_agent(team, domain)
+        answered = [result.run for result in results.values() if result.ok]
+        if not answered:
+            fallback = True
+        else:
+            run = _record_run(team, session_id, message, merge_answers(results, DOMAIN_TITLES), route, member_runs=answered)
+            run.metadata["members"] = {
+                domain: {"ok": result.ok, "ms": round(result.seconds * 1000), **({"error": result.error} if result.error else {})}
+                for domain, result in results.items()
+            }
+            if len(answered) == len(results):
+                # Partial answers (a member timed out or failed) are not reused
+                answer_cache.put(cache_key, run.content)
+            route_stats.record("fanout", time.perf_counter() - start)
+            return run
+
+    if fallback:
+        route = Route("team", route.domain, route.confidence, f"{route.target} fast path failed")
+    run = team.run(input=message, session_id=session_id, stream=False)
+    run.metadata = {**(run.metadata or {}), "route": route.as_dict()}
+    route_stats.record("team", time.perf_counter() - start, fallback=fallback)
+    return run
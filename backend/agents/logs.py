@@ -0,0 +1,52 @@
+"""
+Request logging off the request path: records are put on a queue and written to stdout by a
+background thread (logging.handlers.QueueListener), tagged with the trace id of the request.
+"""
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from .tracing import current_trace_id
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener = None
+_lock = threading.Lock()
+
+
+class _TraceIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = current_trace_id()
+        record.trace = f" [trace {trace_id}]" if trace_id else ""
+        return True
+
+
+def _start_listener() -> None:
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s%(trace)s", datefmt="%Y-%m-%d %H:%M:%S"))
+        _listener = QueueListener(_queue, handler)
+        _listener.start()
+        # Write out whatever is still queued when the process exits
+        atexit.register(_listener.stop)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger whose records are formatted and written on the background thread"""
+    _start_listener()
+    logger = logging.getLogger(f"intern.{name}")
+    if not logger.handlers:
+        handler = QueueHandler(_queue)
+        handler.addFilter(_TraceIdFilter())
+        logger.addHandler(handler)
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+    return logger
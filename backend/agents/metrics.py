@@ -0,0 +1,256 @@
+"""
+Prometheus metrics, served in the text exposition format at GET /health/metrics.
+
+Counters, gauges and histograms keep one shard of values per thread, so recording is a
+thread-local dict lookup and an add, with no lock shared across requests; the shards are only
+summed when /health/metrics is scraped. Numbers that other modules already track (cache counters,
+pool and executor state) are read at scrape time by collectors instead of being recorded twice.
+"""
+import bisect
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from database import observe_statements
+
+# Seconds; covers in-memory tool calls up to long multi-agent runs
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SQL_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+        registry.register(self)
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            # Only taken once per thread; shards outlive their thread so no counts are lost
+            with self._shards_lock:
+                self._shards.append(values)
+            return values
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def _merged(self) -> Dict[Labels, float]:
+        merged: Dict[Labels, float] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                merged[labels] = merged.get(labels, 0.0) + value
+        return merged
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in sorted(self._merged().items()):
+            yield self.name, dict(zip(self.label_names, labels)), value
+
+
+class Gauge(Counter):
+    """Up/down value (e.g. requests in flight); inc and dec may happen on different threads"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            # Per-bucket counts (+Inf last), then sum
+            series = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merged(self) -> Dict[Labels, list]:
+        merged: Dict[Labels, list] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for labels, series in list(shard.items()):
+                total = merged.setdefault(labels, [0] * len(series))
+                for i, value in enumerate(series):
+                    total[i] += value
+        return merged
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, series in sorted(self._merged().items()):
+            base = dict(zip(self.label_names, labels))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), series[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", {**base, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", base, series[-1]
+            yield f"{self.name}_count", base, cumulative
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            self._metrics.append(metric)
+
+    def collector(self, fn: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+        """Registers fn, which yields (name, type, help, samples) read from existing stats at scrape time"""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def exposition(self) -> str:
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help: str, samples: Iterable[Sample]) -> None:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        for metric in metrics:
+            family(metric.name, metric.kind, metric.help, metric.samples())
+        for collect in collectors:
+            try:
+                for name, kind, help, samples in collect():
+                    family(name, kind, help, samples)
+            except Exception as e:
+                lines.append(f"# collector {getattr(collect, '__name__', collect)} failed: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# ---------- metrics recorded on the hot path ----------
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "Time to the end of the response body, per route", ["method", "route"])
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled")
+
+CHAT_LATENCY = Histogram("chat_request_duration_seconds", "Chat runs by endpoint and model (streams until the last event)", ["endpoint", "model"])
+CHAT_IN_FLIGHT = Gauge("chat_in_flight", "Chat runs in progress", ["endpoint"])
+
+LLM_REQUESTS = Counter("llm_requests_total", "Model API calls by calling agent, model and outcome", ["agent", "model", "status"])
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "Model API call time (to the last chunk when streaming)", ["agent", "model"])
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens reported by the model API", ["agent", "model", "kind"])
+
+FANOUT_MEMBERS = Counter("team_fanout_members_total", "Member runs of parallel fan-outs by outcome (ok, error, timeout)", ["member", "status"])
+
+TOOL_CALLS = Counter("tool_calls_total", "Agent tool calls by outcome (error = raised or returned an Error string)", ["tool", "status"])
+TOOL_LATENCY = Histogram("tool_call_duration_seconds", "Agent tool call time", ["tool"])
+
+SQL_LATENCY = Histogram("sqlite_query_duration_seconds", "SQLite statement execution time", ["source", "statement"], buckets=SQL_BUCKETS)
+
+
+@lru_cache(maxsize=1024)
+def statement_kind(sql: str) -> str:
+    # First keyword only, so labels stay bounded
+    word = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE", "PRAGMA", "BEGIN", "COMMIT") else "OTHER"
+
+
+def _observe_statement(source: str, sql: str, seconds: float) -> None:
+    SQL_LATENCY.observe(seconds, source, statement_kind(sql))
+
+
+observe_statements(_observe_statement)
+
+
+# ---------- HTTP ----------
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording count, latency and in-flight requests per route template
+    (/api/sessions/{session_id}/messages rather than every session id).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates: Dict[object, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        template = self._templates.get(endpoint)
+        if template is None:
+            app = scope.get("app")
+            template = next(
+                (getattr(r, "path", None) for r in getattr(app, "routes", ()) if getattr(r, "endpoint", None) is endpoint),
+                None,
+            ) or scope["path"]
+            self._templates[endpoint] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = "500"
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = self._route(scope)
+            HTTP_REQUESTS.inc(scope["method"], route, status)
+            HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], route)
+
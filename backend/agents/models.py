@@ -0,0 +1,109 @@
+"""
+Model backend for every agent, team and summary model.
+
+MODEL_BACKEND=openai (default) uses the OpenAI API. MODEL_BACKEND=stub points the same OpenAIChat
+client at the local OpenAI-compatible server in benchmarks/stub_openai.py, so the whole app,
+including HTTP, streaming and tool-call parsing, runs offline with scripted, deterministic replies:
+
+    python -m benchmarks.stub_openai --latency 0.3 --tokens-per-sec 80 &
+    MODEL_BACKEND=stub uvicorn main:app
+
+MODEL_BASE_URL points either backend at any other OpenAI-compatible server.
+"""
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from agno.models.base import Model
+from agno.models.openai import OpenAIChat
+
+from .metrics import LLM_LATENCY, LLM_REQUESTS, LLM_TOKENS
+from .tracing import current_agent, span, traced_iterator
+
+# "openai" or "stub" (local OpenAI-compatible stub server, no API key needed)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "openai").strip().lower()
+# Base URL of an OpenAI-compatible API; empty = api.openai.com, or the stub server for MODEL_BACKEND=stub
+MODEL_BASE_URL = os.getenv("MODEL_BASE_URL", "")
+STUB_MODEL_URL = os.getenv("STUB_MODEL_URL", "http://127.0.0.1:8100/v1")
+
+MODEL_BACKENDS = ("openai", "stub")
+if MODEL_BACKEND not in MODEL_BACKENDS:
+    raise ValueError(f"MODEL_BACKEND must be one of {', '.join(MODEL_BACKENDS)}, got {MODEL_BACKEND!r}")
+
+# Models a chat request may ask for, the first being the default; others are refused before they
+# become a team pool key
+CHAT_MODELS = [m.strip() for m in os.getenv("CHAT_MODELS", "gpt-4o,gpt-4o-mini").split(",") if m.strip()]
+DEFAULT_CHAT_MODEL = CHAT_MODELS[0] if CHAT_MODELS else "gpt-4o"
+
+
+def check_model(model: Optional[str]) -> str:
+    """The requested chat model, or the default one when none is given. Raises ValueError for others."""
+    if not model:
+        return DEFAULT_CHAT_MODEL
+    if model not in CHAT_MODELS:
+        raise ValueError(f"Unknown model '{model}', expected one of: {', '.join(CHAT_MODELS)}")
+    return model
+
+
+def _record_call(agent: str, model: str, start: float, status: str, usage) -> None:
+    LLM_LATENCY.observe(time.perf_counter() - start, agent, model)
+    LLM_REQUESTS.inc(agent, model, status)
+    if usage is not None:
+        LLM_TOKENS.inc(agent, model, "prompt", amount=usage.input_tokens or 0)
+        LLM_TOKENS.inc(agent, model, "completion", amount=usage.output_tokens or 0)
+
+
+@dataclass
+class TracedOpenAIChat(OpenAIChat):
+    """
+    OpenAIChat with a span and metrics (latency, tokens per calling agent) around every provider
+    call, i.e. one per LLM round trip, tool loops included
+    """
+
+    def invoke(self, *args, **kwargs):
+        agent, start, status, response = current_agent(), time.perf_counter(), "error", None
+        try:
+            with span("llm", kind=3, model=self.id):
+                response = super().invoke(*args, **kwargs)
+            status = "ok"
+            return response
+        finally:
+            _record_call(agent, self.id, start, status, getattr(response, "response_usage", None))
+
+    async def ainvoke(self, *args, **kwargs):
+        agent, start, status, response = current_agent(), time.perf_counter(), "error", None
+        try:
+            with span("llm", kind=3, model=self.id):
+                response = await super().ainvoke(*args, **kwargs)
+            status = "ok"
+            return response
+        finally:
+            _record_call(agent, self.id, start, status, getattr(response, "response_usage", None))
+
+    def invoke_stream(self, *args, **kwargs):
+        agent, start, status, usage = current_agent(), time.perf_counter(), "error", None
+        try:
+            # The usage arrives with the last chunk (stream_options.include_usage)
+            for chunk in traced_iterator("llm", super().invoke_stream(*args, **kwargs), model=self.id):
+                usage = getattr(chunk, "response_usage", None) or usage
+                yield chunk
+            status = "ok"
+        except GeneratorExit:
+            status = "cancelled"
+            raise
+        finally:
+            _record_call(agent, self.id, start, status, usage)
+
+
+def build_model(model_id: str) -> Model:
+    """Returns the chat model for `model_id` on the configured backend"""
+    if MODEL_BACKEND == "stub":
+        # The stub ignores the key, but the OpenAI client refuses to start without one;
+        # no retries so a stalled stub shows up in the measurements instead of being hidden
+        return TracedOpenAIChat(id=model_id, base_url=MODEL_BASE_URL or STUB_MODEL_URL, api_key="stub", max_retries=0)
+    return TracedOpenAIChat(id=model_id, base_url=MODEL_BASE_URL or None)
+
+
+def backend_info() -> dict:
+    return {"backend": MODEL_BACKEND, "base_url": MODEL_BASE_URL or (STUB_MODEL_URL if MODEL_BACKEND == "stub" else "https://api.openai.com/v1")}
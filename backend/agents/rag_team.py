@@ -1,12 +1,42 @@
+import contextvars
 import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+from agno.agent import Agent
+from agno.run.agent import RunOutput
+from agno.run.base import RunStatus
 from agno.team.team import Team
-from agno.models.openai import OpenAIChat
-from agno.db.sqlite import SqliteDb
+from agno.models.base import Model
+from agno.utils.string import generate_id_from_name
+from database import get_database
 from .email_agent import EmailAgent
 from .calendar_agent import CalendarAgent
 from .exa_agent import ExaAgent
+from .context_budget import ContextBudgetMixin
+from .executor import AGENT_MAX_WORKERS
+from .metrics import FANOUT_MEMBERS
+from .models import build_model
+from .tool_memo import MemoScopeMixin
+from .tracing import TracedMixin, span
 
-DATABASE_PATH = os.getenv("DATABASE_PATH", "agno.db")
+# Pool sizing (per model) and how many distinct models stay warm at once
+TEAM_POOL_SIZE = int(os.getenv("TEAM_POOL_SIZE", "4"))
+TEAM_POOL_MAX_MODELS = int(os.getenv("TEAM_POOL_MAX_MODELS", "4"))
+TEAM_POOL_WARM_MODELS = [m.strip() for m in os.getenv("TEAM_POOL_WARM_MODELS", "gpt-4o").split(",") if m.strip()]
+
+# Seconds each member of a parallel fan-out gets before its part of the answer is given up
+TEAM_MEMBER_TIMEOUT = float(os.getenv("TEAM_MEMBER_TIMEOUT", "20"))
+# Member runs of all fan-outs at once; separate from the agent executor, whose workers wait on them
+TEAM_FANOUT_WORKERS = int(os.getenv("TEAM_FANOUT_WORKERS", str(AGENT_MAX_WORKERS * 2)))
+
+# Every RAGTeam has this name and so, as agno derives the id from it, this id whatever its model
+TEAM_NAME = "Personal Assistant Team"
+TEAM_ID = generate_id_from_name(TEAM_NAME)
 
 # RAGTeam = Team(
 #     name="Personal Assistant Team",
@@ -34,14 +64,21 @@ DATABASE_PATH = os.getenv("DATABASE_PATH", "agno.db")
 #     markdown=True,
 # )
 
-class RAGTeam(Team):
+class RAGTeam(TracedMixin, MemoScopeMixin, ContextBudgetMixin, Team):
 
-    def __init__(self, modelName: str = 'gpt-4o'):
+    def __init__(self, modelName: str = 'gpt-4o', model: Optional[Model] = None):
+        model = model or build_model(modelName)
+        # ExaAgent follows the team's model; set it on the copy because AgentOS gives the shared
+        # ExaAgent a default OpenAIChat when it registers it, which the copy would inherit
+        exa_agent = ExaAgent.deep_copy(update={"db": ExaAgent.db, "model": model})
         super().__init__(
-            name="Personal Assistant Team",
-            model=OpenAIChat(id=modelName),
-            members=[EmailAgent, CalendarAgent, ExaAgent],
-            db=SqliteDb(db_file=DATABASE_PATH),
+            name=TEAM_NAME,
+            id=TEAM_ID,
+            model=model,
+            # Each team gets its own member copies (sharing the db engine) so that
+            # pooled teams running concurrently never mutate the same Agent objects
+            members=[*(agent.deep_copy(update={"db": agent.db}) for agent in (EmailAgent, CalendarAgent)), exa_agent],
+            db=get_database(),
             instructions=[
                 "When routing to ExaAgent, PASS THROUGH the full formatted response with sources.",
                 "DO NOT summarize or truncate search results from ExaAgent.",
@@ -51,4 +88,189 @@ class RAGTeam(Team):
             store_history_messages=True,
             num_history_runs=3,
             markdown=True,
-        )
\ No newline at end of file
+        )
+
+
+class RAGTeamPool:
+    """
+    Model-keyed pool of pre-built RAGTeam instances.
+
+    A team is checked out exclusively for the duration of one request and handed
+    back afterwards, so concurrent sessions never share run state. Each model keeps
+    at most `size` idle teams; when more than `max_models` models are pooled the
+    least recently used model's teams are evicted.
+    """
+
+    def __init__(
+        self,
+        size: int = TEAM_POOL_SIZE,
+        max_models: int = TEAM_POOL_MAX_MODELS,
+        factory: Callable[[str], RAGTeam] = RAGTeam,
+    ):
+        self.size = size
+        self.max_models = max_models
+        self.factory = factory
+        self._idle: "OrderedDict[str, Deque[RAGTeam]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def _build(self, model_name: str) -> RAGTeam:
+        with span("team.build", model=model_name):
+            team = self.factory(model_name)
+            # Resolve tools, member ids and defaults now instead of on the first run
+            team.initialize_team()
+        with self._lock:
+            self.created += 1
+        return team
+
+    def _idle_for(self, model_name: str) -> Deque[RAGTeam]:
+        # Caller must hold the lock
+        idle = self._idle.get(model_name)
+        if idle is None:
+            idle = self._idle[model_name] = deque()
+            while len(self._idle) > self.max_models:
+                _, dropped = self._idle.popitem(last=False)
+                self.evicted += len(dropped)
+        self._idle.move_to_end(model_name)
+        return idle
+
+    def warm_up(self, model_names: Iterable[str] = TEAM_POOL_WARM_MODELS) -> None:
+        """Pre-builds `size` teams for each model so the first requests don't pay for it"""
+        for model_name in model_names:
+            with self._lock:
+                missing = self.size - len(self._idle_for(model_name))
+            teams = [self._build(model_name) for _ in range(max(missing, 0))]
+            for team in teams:
+                self.release(model_name, team)
+
+    def acquire(self, model_name: str) -> RAGTeam:
+        with span("team.acquire", model=model_name):
+            with self._lock:
+                idle = self._idle_for(model_name)
+                if idle:
+                    self.reused += 1
+                    return idle.pop()
+            # Pool is empty for this model: build outside the lock
+            return self._build(model_name)
+
+    def release(self, model_name: str, team: RAGTeam) -> None:
+        with self._lock:
+            idle = self._idle_for(model_name)
+            if len(idle) < self.size:
+                idle.append(team)
+            else:
+                self.evicted += 1
+
+    @contextmanager
+    def borrow(self, model_name: str) -> Iterator[RAGTeam]:
+        team = self.acquire(model_name)
+        try:
+            yield team
+        finally:
+            self.release(model_name, team)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "idle": {name: len(idle) for name, idle in self._idle.items()},
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+            }
+
+
+# Shared pool used by the routers; warmed up on app startup in main.py
+team_pool = RAGTeamPool()
+
+
+# ---------- parallel member fan-out ----------
+
+_fanout_executor = ThreadPoolExecutor(max_workers=TEAM_FANOUT_WORKERS, thread_name_prefix="member")
+
+
+@dataclass
+class MemberResult:
+    run: Optional[RunOutput] = None
+    error: Optional[str] = None
+    timed_out: bool = False
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.run is not None and self.run.status != RunStatus.error and bool(self.run.content)
+
+
+class _MemberRun:
+    """One member's run on a fan-out thread; `stop` ends it after the current chunk"""
+
+    def __init__(self, agent: Agent, task: str, session_id: str):
+        self.agent = agent
+        self.task = task
+        self.session_id = session_id
+        self.stop = threading.Event()
+        self.run_id: Optional[str] = None
+        self.seconds = 0.0
+
+    def __call__(self) -> Optional[RunOutput]:
+        start = time.perf_counter()
+        output = None
+        # Streamed so the run id is known early and the run can be cancelled on timeout
+        events = self.agent.run(input=self.task, session_id=self.session_id, stream=True, yield_run_response=True)
+        try:
+            for event in events:
+                self.run_id = self.run_id or getattr(event, "run_id", None)
+                if isinstance(event, RunOutput):
+                    output = event
+                if self.stop.is_set():
+                    break
+        finally:
+            events.close()
+            self.seconds = time.perf_counter() - start
+        return output
+
+    def cancel(self) -> None:
+        self.stop.set()
+        if self.run_id:
+            Agent.cancel_run(self.run_id)
+
+
+def fan_out(tasks: Dict[str, Tuple[Agent, str]], session_id: str, timeout: Optional[float] = None) -> Dict[str, MemberResult]:
+    """
+    Runs independent member tasks ({key: (agent, task)}) at the same time and waits until they are
+    all done or `timeout` seconds (default TEAM_MEMBER_TIMEOUT) have passed, so the wait is the slowest member's, capped. Members
+    still running then are cancelled and reported as timed out. Results keep the order of `tasks`.
+    An agent must not be reused while its timed-out run may still be winding down.
+    """
+    timeout = TEAM_MEMBER_TIMEOUT if timeout is None else timeout
+    with span("fanout", members=len(tasks)):
+        runs = {key: _MemberRun(agent, task, session_id) for key, (agent, task) in tasks.items()}
+        # Member spans nest under the fan-out span of the request's trace
+        futures = {key: _fanout_executor.submit(contextvars.copy_context().run, run) for key, run in runs.items()}
+        done, _ = wait(futures.values(), timeout=timeout)
+
+        results: Dict[str, MemberResult] = {}
+        for key, future in futures.items():
+            member = runs[key].agent.name or key
+            if future not in done:
+                future.cancel()
+                runs[key].cancel()
+                results[key] = MemberResult(error=f"no answer within {timeout:g}s", timed_out=True, seconds=timeout)
+            else:
+                try:
+                    results[key] = MemberResult(run=future.result(), seconds=runs[key].seconds)
+                except Exception as e:
+                    results[key] = MemberResult(error=str(e), seconds=runs[key].seconds)
+            status = "ok" if results[key].ok else "timeout" if results[key].timed_out else "error"
+            FANOUT_MEMBERS.inc(member, status)
+        return results
+
+
+def merge_answers(results: Dict[str, MemberResult], titles: Dict[str, str]) -> str:
+    """One markdown section per member answer, in the order of `results`"""
+    sections = []
+    for key, result in results.items():
+        body = result.run.content.strip() if result.ok else f"_No answer: {result.error or 'empty reply'}._"
+        sections.append(f"### {titles.get(key, key)}\n\n{body}")
+    return "\n\n".join(sections)
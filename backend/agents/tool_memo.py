@@ -0,0 +1,194 @@
+"""
+Memoization of the read-only email and calendar tools.
+
+In one team run the leader and the members often make the same call more than once
+(get_recent_emails(10) to look, then again to answer). @memoized returns the earlier result
+instead of querying SQLite and rendering the page again. Calls are keyed by tool and bound
+arguments, so get_recent_emails() and get_recent_emails(limit=10) are the same call.
+
+Every result is stored with the write counters (table_versions) of the tables it was read from,
+taken before the query ran. add_calendar_event, an import or any other writer bumps them through
+triggers, and the result is not served again, so a run that adds an event and then lists the week
+sees it. TOOL_MEMO_SCOPE picks how long results are shared:
+
+- run (default): within one team or agent run, members included; forgotten when the run ends
+- process: across runs and requests, for at most TOOL_MEMO_TTL seconds ("next 7 days" moves)
+- off
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from database import table_versions
+
+# "run", "process" or "off"
+TOOL_MEMO_SCOPE = os.getenv("TOOL_MEMO_SCOPE", "run").strip().lower()
+# Results kept per run, or in the whole process for TOOL_MEMO_SCOPE=process
+TOOL_MEMO_SIZE = int(os.getenv("TOOL_MEMO_SIZE", "1024"))
+# Seconds a process-wide result is reused even if its tables are unchanged
+TOOL_MEMO_TTL = int(os.getenv("TOOL_MEMO_TTL", "60"))
+
+TOOL_MEMO_SCOPES = ("run", "process", "off")
+if TOOL_MEMO_SCOPE not in TOOL_MEMO_SCOPES:
+    raise ValueError(f"TOOL_MEMO_SCOPE must be one of {', '.join(TOOL_MEMO_SCOPES)}, got {TOOL_MEMO_SCOPE!r}")
+
+
+class MemoStats:
+    """Per-tool calls, calls answered from the memo, results dropped because their tables changed, and time saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, tool: str, hit: bool, stale: bool = False, saved: float = 0.0) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tool, {"calls": 0, "hits": 0, "stale": 0, "saved_ms": 0.0})
+            stats["calls"] += 1
+            stats["hits"] += hit
+            stats["stale"] += stale
+            stats["saved_ms"] += saved * 1000
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            tools = {name: {**stats, "saved_ms": round(stats["saved_ms"], 1)} for name, stats in self._stats.items()}
+        calls = sum(stats["calls"] for stats in tools.values())
+        hits = sum(stats["hits"] for stats in tools.values())
+        return {
+            "scope": TOOL_MEMO_SCOPE,
+            "calls": calls,
+            "hits": hits,
+            "hit_rate": round(hits / calls, 3) if calls else 0.0,
+            "saved_ms": round(sum(stats["saved_ms"] for stats in tools.values()), 1),
+            "entries": process_memo.entries() if TOOL_MEMO_SCOPE == "process" else None,
+            "tools": tools,
+        }
+
+
+class ToolMemo:
+    """LRU of tool results, each with the table stamp it was computed at and how long it took."""
+
+    def __init__(self, max_entries: int = TOOL_MEMO_SIZE, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (result, stamp, stored at, seconds to compute)
+        self._entries: "OrderedDict[str, Tuple[str, Tuple[int, ...], float, float]]" = OrderedDict()
+
+    def get(self, key: str, stamp: Tuple[int, ...]) -> Tuple[Optional[str], bool, float]:
+        """(result, stale, seconds it took to compute); result is None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False, 0.0
+            result, stored_stamp, stored_at, seconds = entry
+            if stored_stamp != stamp or (self.ttl is not None and time.monotonic() - stored_at > self.ttl):
+                del self._entries[key]
+                return None, stored_stamp != stamp, 0.0
+            self._entries.move_to_end(key)
+            return result, False, seconds
+
+    def put(self, key: str, stamp: Tuple[int, ...], result: str, seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (result, stamp, time.monotonic(), seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def entries(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+memo_stats = MemoStats()
+process_memo = ToolMemo(ttl=TOOL_MEMO_TTL)
+# Memo of the run in progress; shared by the team and the members it delegates to
+_run_memo: ContextVar[Optional[ToolMemo]] = ContextVar("tool_memo", default=None)
+
+
+def _current_memo() -> Optional[ToolMemo]:
+    if TOOL_MEMO_SCOPE == "process":
+        return process_memo
+    return _run_memo.get()
+
+
+def memoized(*tables: str) -> Callable[[Callable[..., str]], Callable[..., str]]:
+    """
+    Decorator for read-only tools that only read `tables`. Error strings are never stored.
+    Keep @traced() outermost so memoized calls still show up in the tool spans and metrics.
+    """
+
+    def decorate(fn: Callable[..., str]) -> Callable[..., str]:
+        signature = inspect.signature(fn)
+        tool = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            memo = _current_memo()
+            if memo is None:
+                return fn(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return fn(*args, **kwargs)
+            bound.apply_defaults()
+            # Read before the query, so a write while it runs makes the result stale
+            stamp = table_versions(tables)
+            if stamp is None:
+                return fn(*args, **kwargs)
+            key = f"{tool}:{json.dumps(bound.arguments, sort_keys=True, default=str)}"
+
+            result, stale, seconds = memo.get(key, stamp)
+            if result is not None:
+                memo_stats.record(tool, hit=True, saved=seconds)
+                return result
+
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            if isinstance(result, str) and not result.startswith("Error"):
+                memo.put(key, stamp, result, time.perf_counter() - start)
+            memo_stats.record(tool, hit=False, stale=stale)
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def _scoped_iterator(memo: ToolMemo, iterator: Iterator) -> Iterator:
+    # A streamed run executes while it is iterated, so the memo is set around each step only
+    try:
+        while True:
+            token = _run_memo.set(memo)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _run_memo.reset(token)
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+class MemoScopeMixin:
+    """Gives the outermost run (team or agent) a fresh tool memo for TOOL_MEMO_SCOPE=run"""
+
+    def run(self, *args, **kwargs):
+        if TOOL_MEMO_SCOPE != "run" or _run_memo.get() is not None:
+            return super().run(*args, **kwargs)
+        memo = ToolMemo()
+        if kwargs.get("stream"):
+            return _scoped_iterator(memo, super().run(*args, **kwargs))
+        token = _run_memo.set(memo)
+        try:
+            return super().run(*args, **kwargs)
+        finally:
+            _run_memo.reset(token)
@@ -0,0 +1,125 @@
+import base64
+import json
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+# Upper bound on what a single list tool call adds to the prompt, and how much body text a row previews
+TOOL_RESULT_TOKEN_BUDGET = int(os.getenv("TOOL_RESULT_TOKEN_BUDGET", "1200"))
+TOOL_RESULT_SNIPPET_CHARS = int(os.getenv("TOOL_RESULT_SNIPPET_CHARS", "160"))
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text with OpenAI tokenizers; good enough for budgeting
+    return (len(text) + 3) // 4
+
+
+def snippet(text: Optional[str], limit: int = TOOL_RESULT_SNIPPET_CHARS) -> str:
+    text = re.sub(r"\s+", " ", text or "").strip()
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+class ToolResultStats:
+    """Per-tool count of calls, rows and estimated prompt tokens returned to the model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, tool_name: str, tokens: int, rows: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(tool_name, {"calls": 0, "rows": 0, "tokens": 0})
+            stats["calls"] += 1
+            stats["rows"] += rows
+            stats["tokens"] += tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {**stats, "avg_tokens": round(stats["tokens"] / stats["calls"], 1)}
+                for name, stats in self._stats.items()
+            }
+
+
+tool_result_stats = ToolResultStats()
+
+
+def record_result(tool_name: str, text: str, rows: int = 1) -> str:
+    """Records the size of a tool result and returns it unchanged"""
+    tool_result_stats.record(tool_name, estimate_tokens(text), rows)
+    return text
+
+
+def render_row(cells: Sequence[Any]) -> str:
+    """One result line: the cells joined by " | ", each "|" inside a cell escaped with a backslash"""
+    return " | ".join(str(cell).replace("|", "\\|") for cell in cells)
+
+
+def render_page(
+    tool_name: str,
+    header: str,
+    rows: Sequence[Sequence[Any]],
+    row_cells: Callable[[Sequence[Any]], Sequence[Any]],
+    cursor_for: Callable[[Sequence[Any]], Dict[str, Any]],
+    limit: int,
+    empty_message: str,
+    token_budget: int = TOOL_RESULT_TOKEN_BUDGET,
+) -> str:
+    """
+    Renders one page of rows as compact lines (render_row) under `header`, so page_to_markdown
+    can split them back into cells.
+
+    Tools query `limit + 1` rows so a next page can be detected. Rendering also stops once
+    `token_budget` is reached; in both cases the result ends with the cursor for the next page.
+    """
+    if not rows:
+        return record_result(tool_name, empty_message, rows=0)
+
+    lines = [header]
+    tokens = estimate_tokens(header)
+    shown = 0
+    for row in rows[:limit]:
+        line = render_row(row_cells(row))
+        line_tokens = estimate_tokens(line) + 1
+        if shown and tokens + line_tokens > token_budget:
+            break
+        lines.append(line)
+        tokens += line_tokens
+        shown += 1
+
+    if shown < len(rows):
+        lines.append(f'More results: call again with cursor="{encode_cursor(cursor_for(rows[shown - 1]))}"')
+
+    return record_result(tool_name, "\n".join(lines), rows=shown)
+
+
+def page_to_markdown(text: str) -> str:
+    """Turns a page from render_page into a markdown table for showing it to the user as-is"""
+    lines = text.splitlines()
+    match = re.match(r"^(.*?)\s*(\w+(?: \| \w+)+)$", lines[0]) if lines else None
+    if not match:
+        return text
+
+    columns = match.group(2).split(" | ")
+    out = [f"**{match.group(1).rstrip('.')}**", "", "| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    for line in lines[1:]:
+        if line.startswith("More results:"):
+            out += ["", "_More results available, ask for more to see them._"]
+            continue
+        # Cells come escaped from render_page, so every unescaped " | " is a separator
+        out.append("| " + line + " |")
+    return "\n".join(out)
@@ -0,0 +1,462 @@
+"""
+Span timing for the hot path of a request: executor queueing, team checkout, session reads and
+writes, history preparation, every LLM call, member runs and tool calls.
+
+TracingMiddleware opens a root span per HTTP request and sends the per-stage totals back in a
+`Server-Timing` header. Finished traces are handed to a background thread that exports them as
+OpenTelemetry spans (OTLP/JSON), so nothing is written on the request path:
+
+    TRACE_EXPORTER=console   indented span tree per trace on stderr
+    TRACE_EXPORTER=file      one OTLP/JSON ExportTraceServiceRequest per line in TRACE_FILE
+    TRACE_EXPORTER=otlp      POSTed to an OTLP/HTTP collector at TRACE_OTLP_ENDPOINT
+
+Spans started outside a request (CLI, benchmarks) form their own traces, and cost nothing
+when TRACE_EXPORTER=none.
+"""
+import functools
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agno.agent import Agent
+from agno.team.team import Team
+
+from .metrics import TOOL_CALLS, TOOL_LATENCY
+
+# Where finished traces go: none, console, file or otlp
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").strip().lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+# Share of request traces exported (Server-Timing is sent for all of them)
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))
+# Spans waiting for the exporter thread before new traces are dropped
+TRACE_QUEUE_SPANS = int(os.getenv("TRACE_QUEUE_SPANS", "20000"))
+TRACE_SERVER_TIMING = os.getenv("TRACE_SERVER_TIMING", "1") == "1"
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "intern-ai-backend")
+
+TRACE_EXPORTERS = ("none", "console", "file", "otlp")
+if TRACE_EXPORTER not in TRACE_EXPORTERS:
+    raise ValueError(f"TRACE_EXPORTER must be one of {', '.join(TRACE_EXPORTERS)}, got {TRACE_EXPORTER!r}")
+
+
+class Trace:
+    """Finished spans of one request (or one standalone operation)."""
+
+    __slots__ = ("trace_id", "sampled", "spans", "_lock")
+
+    def __init__(self, trace_id: Optional[str] = None, sampled: bool = True):
+        self.trace_id = trace_id or f"{random.getrandbits(128):032x}"
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: "Span") -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def server_timing(self, root: "Span") -> str:
+        """Server-Timing value: total duration per span name so far, plus the request total"""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self.spans:
+                total = totals.setdefault(span.name, [0.0, 0])
+                total[0] += (span.end_ns - span.start_ns) / 1e6
+                total[1] += 1
+        entries = [
+            f'{name};dur={ms:.1f}' + (f';desc="{count}x"' if count > 1 else "")
+            for name, (ms, count) in totals.items()
+        ]
+        entries.append(f"total;dur={(time.time_ns() - root.start_ns) / 1e6:.1f}")
+        return ", ".join(entries)
+
+
+class Span:
+    __slots__ = ("name", "trace", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error", "kind")
+
+    def __init__(self, name: str, trace: Trace, parent_id: Optional[str], attributes: Dict[str, Any], kind: int = 1):
+        self.name = name
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        # OTLP SpanKind: 1 internal, 2 server, 3 client
+        self.kind = kind
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_agent() -> str:
+    """Name of the agent or team whose run is the current span ("team", "email-agent", ...)"""
+    span = _current.get()
+    if span is None:
+        return "none"
+    if span.name == "team.run":
+        return "team"
+    if span.name.startswith("agent."):
+        return span.name[6:]
+    # e.g. "history": the context summary model
+    return span.name
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current.get()
+    return span.trace.trace_id if span else None
+
+
+@contextmanager
+def span(name: str, kind: int = 1, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Times the block as a child of the current span, or as a new trace when there is none"""
+    parent = _current.get()
+    if parent is None:
+        if TRACE_EXPORTER == "none":
+            yield None
+            return
+        trace, parent_id = Trace(), None
+    else:
+        trace, parent_id = parent.trace, parent.span_id
+    current = Span(name, trace, parent_id, attributes, kind)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        trace.add(current)
+        if parent is None:
+            exporter.submit(trace)
+
+
+@contextmanager
+def request_span(name: str, traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """Root span of an incoming request; continues the caller's trace when a W3C traceparent is given"""
+    trace_id, parent_id = _parse_traceparent(traceparent)
+    sampled = TRACE_EXPORTER != "none" and random.random() < TRACE_SAMPLE_RATIO
+    trace = Trace(trace_id, sampled)
+    root = Span(name, trace, parent_id, attributes, kind=2)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        root.end_ns = time.time_ns()
+        trace.add(root)
+        if trace.sampled:
+            exporter.submit(trace)
+
+
+def record_span(name: str, start_ns: int, **attributes: Any) -> None:
+    """Adds an already finished span (start_ns until now) under the current span, e.g. time spent queued"""
+    parent = _current.get()
+    if parent is None:
+        return
+    finished = Span(name, parent.trace, parent.span_id, attributes)
+    finished.start_ns = start_ns
+    finished.end_ns = time.time_ns()
+    parent.trace.add(finished)
+
+
+def _parse_traceparent(header: Optional[str]):
+    # 00-<32 hex trace id>-<16 hex parent span id>-<flags>
+    parts = (header or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None, None
+
+
+def traced(name: Optional[str] = None):
+    """
+    Decorator: every call of the function is a span. Without a name the function is an agent
+    tool: the span is `tool.<function name>` and calls are counted in the tool metrics.
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        if name:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with span(name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        tool = fn.__name__
+        span_name = f"tool.{tool}"
+
+        @functools.wraps(fn)
+        def tool_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = "error"
+            try:
+                with span(span_name):
+                    result = fn(*args, **kwargs)
+                status = "error" if isinstance(result, str) and result.startswith("Error") else "ok"
+                return result
+            finally:
+                TOOL_LATENCY.observe(time.perf_counter() - start, tool)
+                TOOL_CALLS.inc(tool, status)
+
+        return tool_wrapper
+
+    return decorate
+
+
+def traced_iterator(name: str, iterator: Iterator, **attributes: Any) -> Iterator:
+    """
+    Span around consuming `iterator` (e.g. a streamed run). It is only the current span while
+    the iterator is producing an item, so spans opened inside nest under it and the consumer's don't.
+    """
+    parent = _current.get()
+    if parent is None and TRACE_EXPORTER == "none":
+        yield from iterator
+        return
+    trace = parent.trace if parent else Trace()
+    current = Span(name, trace, parent.span_id if parent else None, attributes)
+    try:
+        while True:
+            token = _current.set(current)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _current.reset(token)
+            yield item
+    except BaseException as e:
+        if not isinstance(e, GeneratorExit):
+            current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+        current.end_ns = time.time_ns()
+        trace.add(current)
+        if parent is None:
+            exporter.submit(trace)
+
+
+class TracedMixin:
+    """
+    Spans for agno Agents and Teams: the run itself, session reads/writes and building the
+    messages sent to the model (history, summaries). LLM calls are timed by agents/models.py.
+    """
+
+    def _span_name(self) -> str:
+        if isinstance(self, Team):
+            return "team.run"
+        return f"agent.{(self.name or 'agent').lower().replace(' ', '-')}"
+
+    def run(self, *args, **kwargs):
+        name = self._span_name()
+        if kwargs.get("stream"):
+            return traced_iterator(name, super().run(*args, **kwargs))
+        with span(name):
+            return super().run(*args, **kwargs)
+
+    def _read_session(self, *args, **kwargs):
+        with span("session.read"):
+            return super()._read_session(*args, **kwargs)
+
+    def _upsert_session(self, *args, **kwargs):
+        with span("session.write"):
+            return super()._upsert_session(*args, **kwargs)
+
+    def _get_run_messages(self, **kwargs):
+        with span("history"):
+            return super()._get_run_messages(**kwargs)
+
+
+class TracedAgent(TracedMixin, Agent):
+    """Agent with spans for its runs, session reads/writes and message building"""
+
+
+# ---------- export ----------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    encoded = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        # OTLP StatusCode: 1 ok, 2 error
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def otlp_request(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/JSON ExportTraceServiceRequest for `spans`"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACE_SERVICE_NAME}}]},
+        "scopeSpans": [{"scope": {"name": "agents.tracing"}, "spans": [_otlp_span(s) for s in spans]}],
+    }]}
+
+
+def format_trace(spans: List[Span]) -> str:
+    """Indented span tree with durations, for the console exporter"""
+    children: Dict[Optional[str], List[Span]] = {}
+    ids = {s.span_id for s in spans}
+    for s in sorted(spans, key=lambda s: s.start_ns):
+        children.setdefault(s.parent_id if s.parent_id in ids else None, []).append(s)
+    lines = [f"trace {spans[0].trace.trace_id}"]
+
+    def walk(parent_id: Optional[str], depth: int) -> None:
+        for s in children.get(parent_id, []):
+            attributes = " ".join(f"{k}={v}" for k, v in s.attributes.items())
+            lines.append(f"{'  ' * depth}{s.name:<{max(40 - 2 * depth, 1)}}{s.duration_ms:>10.1f} ms  {attributes}{'  ERROR ' + s.error if s.error else ''}")
+            walk(s.span_id, depth + 1)
+
+    walk(None, 1)
+    return "\n".join(lines)
+
+
+class SpanExporter:
+    """Background thread that writes finished traces with the configured exporter."""
+
+    def __init__(self, kind: str = TRACE_EXPORTER, max_spans: int = TRACE_QUEUE_SPANS):
+        self.kind = kind
+        self.max_spans = max_spans
+        self._queue: "queue.Queue[Trace]" = queue.Queue()
+        self._queued_spans = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, trace: Trace) -> None:
+        if self.kind == "none":
+            return
+        with self._lock:
+            if self._queued_spans + len(trace.spans) > self.max_spans:
+                self.dropped += len(trace.spans)
+                return
+            self._queued_spans += len(trace.spans)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+        self._queue.put(trace)
+
+    def _run(self) -> None:
+        while True:
+            traces = [self._queue.get()]
+            # Export whatever else is already waiting in the same batch
+            while True:
+                try:
+                    traces.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            spans = [s for trace in traces for s in trace.spans]
+            try:
+                self._export(traces, spans)
+                self.exported += len(spans)
+            except Exception as e:
+                self.failed += len(spans)
+                print(f"Span export failed: {e}", file=sys.stderr)
+            with self._lock:
+                self._queued_spans -= len(spans)
+            for _ in traces:
+                self._queue.task_done()
+
+    def _export(self, traces: List[Trace], spans: List[Span]) -> None:
+        if self.kind == "console":
+            sys.stderr.write("".join(format_trace(trace.spans) + "\n" for trace in traces))
+        elif self.kind == "file":
+            with open(TRACE_FILE, "a") as f:
+                f.write(json.dumps(otlp_request(spans), separators=(",", ":")) + "\n")
+        elif self.kind == "otlp":
+            request = urllib.request.Request(
+                TRACE_OTLP_ENDPOINT,
+                data=json.dumps(otlp_request(spans)).encode(),
+                headers={"Content-Type": "application/json"},
+            )
+            urllib.request.urlopen(request, timeout=10).read()
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            self._queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "exporter": self.kind,
+            "queued_spans": self._queued_spans,
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+exporter = SpanExporter()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one root span per HTTP request, a Server-Timing header with the time spent
+    per stage before the response started, and an X-Trace-Id header to find the exported trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode() or None
+        with request_span(
+            f"{scope['method']} {scope['path']}", traceparent,
+            **{"http.method": scope["method"], "http.target": scope["path"]},
+        ) as root:
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    root.set("http.status_code", message["status"])
+                    extra = [(b"x-trace-id", root.trace.trace_id.encode())]
+                    if TRACE_SERVER_TIMING:
+                        extra.append((b"server-timing", root.trace.server_timing(root).encode()))
+                    message = {**message, "headers": [*message.get("headers", []), *extra]}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1 @@
+"""Offline benchmarks. Run from backend/ as `python -m benchmarks.<name>`."""
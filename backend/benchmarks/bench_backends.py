@@ -0,0 +1,135 @@
+"""
+The email and calendar tools on SQLite vs PostgreSQL: same generated data, same calls, latency
+per tool on each backend and whether both returned the same text.
+
+    python -m benchmarks.bench_backends --url postgresql://postgres@localhost/agno_bench --emails 20000
+
+--url should be an empty database (it is migrated and the generated data copied in, as
+`python -m database.migrations --copy-from` does). The backend is fixed when `database` is
+imported, so each one runs the calls in a child process. search_emails ranks with bm25 on
+SQLite and ts_rank on PostgreSQL, so its order and highlights may differ; every other tool
+should match. Each child also books one slot twice (the second must report the conflict) and
+deletes the event again, and measures tool calls per second from --threads threads at once.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.datagen import generate
+
+BACKEND = Path(__file__).resolve().parent.parent
+SEED = 7
+
+# (name, tool, kwargs); the same calls on both backends
+CALLS = [
+    ("get_recent_emails", "get_recent_emails", {"limit": 10}),
+    ("search_emails", "search_emails", {"keyword": "budget review", "limit": 10}),
+    ("get_emails_by_sender", "get_emails_by_sender", {"sender_name": "jordan", "limit": 10}),
+    ("get_email_body", "get_email_body", {"email_id": 42}),
+    ("get_all_events", "get_all_events", {"limit": 20}),
+    ("get_upcoming_events", "get_upcoming_events", {"days": 30, "limit": 20}),
+    ("get_events_by_attendee", "get_events_by_attendee", {"attendee_name": "dana", "limit": 20}),
+    ("get_events_by_attendee (email)", "get_events_by_attendee", {"attendee_name": "riley.haddad", "limit": 20}),
+    ("find_conflicts", "find_conflicts", {"start_ts": "2026-11-02T09:00:00Z", "end_ts": "2026-11-06T18:00:00Z"}),
+    ("get_free_busy", "get_free_busy", {"start_ts": "2026-11-02T09:00:00Z", "end_ts": "2026-11-02T18:00:00Z"}),
+]
+
+
+def child(out: str, repeat: int, threads: int) -> None:
+    from agents import calendar_agent, email_agent
+    from database import DATABASE_BACKEND, write_queue
+
+    tools = {**vars(email_agent), **vars(calendar_agent)}
+    results = {"backend": DATABASE_BACKEND, "calls": {}}
+    for name, tool, kwargs in CALLS:
+        fn = tools[tool]
+        output = fn(**kwargs)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn(**kwargs)
+            timings.append(time.perf_counter() - start)
+        results["calls"][name] = {"output": output, "ms": statistics.median(timings) * 1000}
+
+    booking = ("Backend check", "2032-03-01T10:00:00Z", "2032-03-01T11:00:00Z", "Dana Green, Riley Haddad")
+    first, second = calendar_agent.add_calendar_event(*booking), calendar_agent.add_calendar_event(*booking)
+    results["booking"] = {"first": first.split(" with ID")[0], "second": second.split(" it overlaps")[0]}
+    write_queue.write(lambda conn: conn.execute("DELETE FROM calendar WHERE title = ?", (booking[0],)))
+
+    def call(n: int) -> None:
+        name, tool, kwargs = CALLS[n % len(CALLS)]
+        tools[tool](**kwargs)
+
+    calls = repeat * len(CALLS) * threads
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, range(calls)))
+    results["throughput"] = calls / (time.perf_counter() - start)
+    with open(out, "w") as f:
+        json.dump(results, f)
+
+
+def run_child(env: Dict[str, str], out: str, repeat: int, threads: int) -> Dict:
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_backends", "--child", out, "--repeat", str(repeat), "--threads", str(threads)],
+        cwd=BACKEND, env=env, check=True,
+    )
+    with open(out) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("DATABASE_URL", ""), help="PostgreSQL database (default: DATABASE_URL)")
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per tool")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.repeat, args.threads)
+    if not args.url.startswith(("postgres://", "postgresql://")):
+        raise SystemExit("--url (or DATABASE_URL) must be a postgresql:// URL")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        database_path = os.path.join(workdir, "bench.db")
+        generate(database_path, emails=args.emails, events=args.events, sessions_count=0, seed=SEED)
+        env = dict(os.environ, AGNO_TELEMETRY="false", DATABASE_PATH=database_path)
+        env.setdefault("EXA_API_KEY", "stub")
+        env.setdefault("OPENAI_API_KEY", "stub")
+        sqlite_env = {key: value for key, value in env.items() if key != "DATABASE_URL"}
+        postgres_env = dict(env, DATABASE_URL=args.url)
+
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "database.migrations", "--copy-from", database_path],
+                       cwd=BACKEND, env=postgres_env, check=True, stdout=subprocess.DEVNULL)
+        print(f"copied to PostgreSQL in {time.perf_counter() - start:.1f}s")
+
+        sqlite = run_child(sqlite_env, os.path.join(workdir, "sqlite.json"), args.repeat, args.threads)
+        postgres = run_child(postgres_env, os.path.join(workdir, "postgres.json"), args.repeat, args.threads)
+
+        print(f"\n{'tool':<34}{'sqlite p50':>12}{'postgres p50':>14}  result")
+        for name, _, _ in CALLS:
+            a, b = sqlite["calls"][name], postgres["calls"][name]
+            same = "same" if a["output"] == b["output"] else "differs"
+            print(f"{name:<34}{a['ms']:>10.2f}ms{b['ms']:>12.2f}ms  {same}")
+        booking = "same" if sqlite["booking"] == postgres["booking"] else f"differs: {sqlite['booking']} vs {postgres['booking']}"
+        print(f"{'add_calendar_event x2':<34}{'':>26}  {booking}")
+        print(f"\n{args.threads} threads: {sqlite['throughput']:.0f} calls/s on SQLite, {postgres['throughput']:.0f} calls/s on PostgreSQL")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+ISO-string scans vs the epoch/attendee indexes on a synthetic calendar.
+
+    python -m benchmarks.bench_calendar_queries --rows 500000
+
+The database is generated once under $DATABASE_PATH (default: a temp file) and reused on later runs.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.gettempdir(), "bench_calendar.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from agents.calendar_agent import get_events_by_attendee  # noqa: E402
+from benchmarks.bench_email_search import DOMAINS, NAMES, WORDS, timed  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+
+
+def generate(path: str, rows: int, batch: int = 50_000) -> None:
+    apply_migrations(path)
+    conn = sqlite3.connect(path)
+    existing = conn.execute("SELECT COUNT(*) FROM calendar").fetchone()[0]
+    if existing >= rows:
+        conn.close()
+        return
+
+    rng = random.Random(7)
+    base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    start = time.perf_counter()
+    for offset in range(existing, rows, batch):
+        chunk = []
+        for i in range(offset, min(offset + batch, rows)):
+            # ~10 minutes apart on average, 15 min - 2 h long, so plenty of overlaps
+            begins = base + timedelta(minutes=i * 10 + rng.randint(0, 9))
+            ends = begins + timedelta(minutes=rng.choice((15, 30, 45, 60, 90, 120)))
+            people = rng.sample(NAMES, rng.randint(0, 3))
+            if rng.random() < 0.2:
+                people.append(f"{rng.choice(NAMES)} <{rng.choice(NAMES).lower()}{i % 499}@{rng.choice(DOMAINS)}>")
+            chunk.append((
+                " ".join(rng.choices(WORDS, k=3)).capitalize(),
+                begins.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                ends.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                ", ".join(people),
+            ))
+        with conn:
+            conn.executemany("INSERT INTO calendar(title, start_ts, end_ts, attendees) VALUES (?,?,?,?)", chunk)
+    conn.close()
+    print(f"generated {rows - existing} events in {time.perf_counter() - start:.1f}s")
+
+
+def timed_tool(tool, attendee: str, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = tool(attendee, limit=20)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result.count("\n") - ("More results" in result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    generate(os.environ["DATABASE_PATH"], args.rows)
+    conn = sqlite3.connect(os.environ["DATABASE_PATH"])
+    last = conn.execute("SELECT max(start_epoch) FROM calendar").fetchone()[0]
+    # A window in the middle of the data, so neither end of the index helps the old queries
+    mid = last - (last - 1577836800) // 2
+    week = (mid, mid + 7 * 86400)
+    hour = (mid, mid + 3600)
+
+    def iso(epoch: int) -> str:
+        return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    columns = "id, title, start_ts, end_ts, attendees"
+    cases = [
+        (
+            "upcoming (7 day window)",
+            f"SELECT {columns} FROM calendar WHERE start_ts >= ? AND start_ts <= ? ORDER BY start_ts, id LIMIT 21",
+            (iso(week[0]), iso(week[1])),
+            f"SELECT {columns} FROM calendar WHERE start_epoch >= ? AND start_epoch <= ? ORDER BY start_epoch, id LIMIT 21",
+            week,
+        ),
+        (
+            "conflicts (1 hour)",
+            f"SELECT {columns} FROM calendar WHERE start_ts < ? AND end_ts > ? ORDER BY start_ts, id",
+            (iso(hour[1]), iso(hour[0])),
+            f"""SELECT {columns} FROM calendar
+                WHERE start_epoch < ? AND end_epoch > ?
+                  AND start_epoch >= ? - (SELECT coalesce(max(end_epoch - start_epoch), 0) FROM calendar)
+                ORDER BY start_epoch, id""",
+            (hour[1], hour[0], hour[0]),
+        ),
+        (
+            "next 5 events",
+            f"SELECT {columns} FROM calendar WHERE start_ts >= ? ORDER BY start_ts, id LIMIT 5",
+            (iso(mid),),
+            f"SELECT {columns} FROM calendar WHERE start_epoch >= ? ORDER BY start_epoch, id LIMIT 5",
+            (mid,),
+        ),
+    ]
+    by_attendee_old = f"SELECT {columns} FROM calendar WHERE attendees LIKE ? ORDER BY start_ts, id LIMIT 21"
+    for attendee in ("quinn", "riley42@"):
+        cases.append((f"by attendee {attendee!r}", by_attendee_old, (f"%{attendee}%",), None, attendee))
+
+    print(f"{'query':<28}{'ISO ms':>10}{'rows':>6}{'epoch ms':>10}{'rows':>6}")
+    for name, old_sql, old_params, new_sql, new_params in cases:
+        old_ms, old_rows = timed(conn, old_sql, old_params, args.repeat)
+        if new_sql is None:
+            # The attendee tool picks its query plan per attendee, so time the tool itself
+            new_ms, new_rows = timed_tool(get_events_by_attendee, new_params, args.repeat)
+        else:
+            new_ms, new_rows = timed(conn, new_sql, new_params, args.repeat)
+        print(f"{name:<28}{old_ms:>10.2f}{old_rows:>6}{new_ms:>10.2f}{new_rows:>6}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+A nightly-style job of N prompts: one POST /api/chat at a time vs POST /api/chat/batch,
+with a StubModel that sleeps `--delay` seconds per completion.
+
+    python -m benchmarks.bench_chat_batch --items 32 --delay 0.5 --rpm 240
+
+The last run limits the stub model to --rpm team runs per minute (CHAT_BATCH_MODEL_RPM).
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+os.environ.setdefault("CHAT_MODELS", "stub,stub-limited")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from agents import chat_batch, team_pool  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+from routers import chat_router  # noqa: E402
+
+
+def items(n: int, model: str):
+    return [{"session_id": str(uuid.uuid4()), "message": f"summarize today's email for user {i}", "model": model} for i in range(n)]
+
+
+def stub_team(name: str, delay: float) -> RAGTeam:
+    # The intent router hands these prompts straight to the email member, so it needs a stub too
+    team = RAGTeam(name, model=StubModel(id=name, latency=delay))
+    for member in team.members:
+        member.model = StubModel(id=f"{name}-member", latency=delay)
+    return team
+
+
+async def run(n: int, delay: float, rpm: int):
+    team_pool.factory = lambda name: stub_team(name, delay)
+    team_pool.warm_up(["stub", "stub-limited"])
+    chat_batch.model_limiter("stub-limited").__init__(rpm, burst=1)
+
+    app = FastAPI()
+    app.include_router(chat_router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # First run creates the agno tables; keep it out of the measurement
+        await client.post("/api/chat", json=items(1, "stub")[0])
+
+        start = time.perf_counter()
+        for item in items(n, "stub"):
+            (await client.post("/api/chat", json=item)).raise_for_status()
+        print(f"{'sequential /api/chat':<34}{time.perf_counter() - start:>8.2f}s")
+
+        for label, model, concurrency in (
+            ("batch, concurrency 4", "stub", 4),
+            ("batch, concurrency 8", "stub", 8),
+            (f"batch, concurrency 8, {rpm} rpm", "stub-limited", 8),
+        ):
+            response = await client.post("/api/chat/batch", json={"items": items(n, model), "concurrency": concurrency})
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            summary, results = lines[-1], lines[:-1]
+            print(
+                f"{label:<34}{summary['elapsed_ms'] / 1000:>8.2f}s  ok {summary['ok']}/{summary['count']}"
+                f"  median run {statistics.median(r['run_ms'] for r in results):.0f} ms"
+                f"  median queued {statistics.median(r['queued_ms'] for r in results):.0f} ms"
+                f"  median rate-limited {statistics.median(r['rate_limited_ms'] for r in results):.0f} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=32)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--rpm", type=int, default=240)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.delay, args.rpm))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Fires N parallel POST /api/chat requests against the app in-process, with a StubModel that
+sleeps `--delay` seconds per completion. With the blocking call moved off the event loop the
+batch should finish in about one delay, not N delays.
+
+    python -m benchmarks.bench_chat_concurrency --requests 8 --delay 1.0
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+os.environ.setdefault("CHAT_MODELS", "stub")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from agents import team_pool  # noqa: E402
+from agents.executor import agent_executor  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+from routers import chat_router, health_router  # noqa: E402
+
+
+async def run(n: int, delay: float) -> float:
+    team_pool.factory = lambda name: RAGTeam(name, model=StubModel(id=name, latency=delay))
+    team_pool.warm_up(["stub"])
+
+    app = FastAPI()
+    app.include_router(chat_router)
+    app.include_router(health_router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def chat(i: int):
+            payload = {"message": f"hello {i}", "session_id": str(uuid.uuid4()), "model": "stub"}
+            response = await client.post("/api/chat", json=payload)
+            response.raise_for_status()
+
+        async def health_latency() -> float:
+            # /health must stay responsive while the chats are in flight
+            await asyncio.sleep(delay / 2)
+            start = time.perf_counter()
+            await client.get("/health")
+            return time.perf_counter() - start
+
+        # First run creates the agno tables; keep it out of the measurement
+        await chat(-1)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(health_latency(), *(chat(i) for i in range(n)))
+        elapsed = time.perf_counter() - start
+
+    print(f"{n} parallel chats, {delay:.2f}s model delay: {elapsed:.2f}s total ({elapsed / delay:.2f} delays)")
+    print(f"/health latency during load: {results[0] * 1000:.1f}ms")
+    print(f"executor: {agent_executor.stats()}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    if args.requests > agent_executor.max_workers:
+        print(f"note: only {agent_executor.max_workers} workers (AGENT_MAX_WORKERS), expect ~{-(-args.requests // agent_executor.max_workers)} delays")
+    asyncio.run(run(args.requests, args.delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Time-to-first-byte of POST /api/chat vs POST /api/chat/stream, in-process with a StubModel
+that waits `--latency` before the first token and `--token-latency` between tokens.
+
+    python -m benchmarks.bench_chat_stream --latency 0.5 --token-latency 0.02 --tokens 100
+"""
+import argparse
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+os.environ.setdefault("CHAT_MODELS", "stub")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from agents import team_pool  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+from routers import chat_router  # noqa: E402
+
+
+async def measure(client: httpx.AsyncClient, path: str):
+    payload = {"message": "hello", "session_id": str(uuid.uuid4()), "model": "stub"}
+    start = time.perf_counter()
+    first_byte = first_token = None
+    async with client.stream("POST", path, json=payload) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_text():
+            now = time.perf_counter() - start
+            first_byte = first_byte or now
+            if first_token is None and (path == "/api/chat" or "event: delta" in chunk):
+                first_token = now
+    return first_byte, first_token, time.perf_counter() - start
+
+
+async def run(latency: float, token_latency: float, tokens: int):
+    reply = " ".join(f"tok{i}" for i in range(tokens))
+    team_pool.factory = lambda name: RAGTeam(
+        name, model=StubModel(id=name, reply=reply, latency=latency, token_latency=token_latency)
+    )
+    team_pool.warm_up(["stub"])
+
+    app = FastAPI()
+    app.include_router(chat_router)
+
+    # A real server: httpx's ASGITransport buffers the whole body, which would hide the streaming
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        await measure(client, "/api/chat")  # creates the agno tables
+        for path in ("/api/chat", "/api/chat/stream"):
+            ttfb, first_token, total = await measure(client, path)
+            print(f"{path:<18} ttfb={ttfb * 1000:8.1f}ms  first token={first_token * 1000:8.1f}ms  total={total * 1000:8.1f}ms")
+    server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.latency, args.token_latency, args.tokens))
+
+
+if __name__ == "__main__":
+    main()
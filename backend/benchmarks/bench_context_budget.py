@@ -0,0 +1,78 @@
+"""
+Prompt tokens per turn of a long chat session with and without the context budget
+(agents/context_budget.py).
+
+    python -m benchmarks.bench_context_budget --turns 12 --reply-chars 6000
+
+The team runs on StubModel. Its long replies stand in for passed-through search results,
+which is what makes real sessions grow. Summaries come from a second stub, and their input
+tokens count against the savings.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from agents.context_budget import CONTEXT_HISTORY_TOKEN_BUDGET, context_metrics, history_tokens  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from benchmarks.bench_email_search import WORDS  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+
+prompt_tokens = {"stub": [], "summary": []}
+
+
+class RecordingStubModel(StubModel):
+    def invoke(self, *args, **kwargs):
+        prompt_tokens[self.id].append(history_tokens(kwargs["messages"]))
+        return super().invoke(*args, **kwargs)
+
+
+def session(turns: int, reply_chars: int, budget: int):
+    reply = " ".join(WORDS[i % len(WORDS)] for i in range(reply_chars // 6))
+    team = RAGTeam("stub", model=RecordingStubModel(id="stub", reply=reply))
+    team.context_token_budget = budget
+    summarizer = RecordingStubModel(id="summary", reply="The user asked about " + " ".join(WORDS[:150]))
+    team._summary_model = lambda: summarizer
+
+    session_id = str(uuid.uuid4())
+    sent, overhead, summaries = [], [], 0
+    del prompt_tokens["summary"][:]
+    for turn in range(turns):
+        del prompt_tokens["stub"][:]
+        start = time.perf_counter()
+        run = team.run(input=f"question {turn}: what did we find about {WORDS[turn]}?", session_id=session_id)
+        overhead.append((time.perf_counter() - start) * 1000)
+        sent.append(prompt_tokens["stub"][0])
+        summaries += context_metrics(run)["summaries_created"]
+    return sent, statistics.median(overhead), summaries, sum(prompt_tokens["summary"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--reply-chars", type=int, default=6000)
+    parser.add_argument("--budget", type=int, default=CONTEXT_HISTORY_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    apply_migrations()
+    print(f"{args.turns} turns, ~{args.reply_chars // 4} token replies, budget {args.budget} tokens")
+    print(f"{'':<18}{'last turn':>10}{'total':>10}{'run (median)':>15}{'summaries':>11}{'summary input':>15}")
+    results = {}
+    for label, budget in (("no budget", 0), ("context budget", args.budget)):
+        sent, run_ms, summaries, summary_tokens = session(args.turns, args.reply_chars, budget)
+        results[label] = sum(sent) + summary_tokens
+        print(f"{label:<18}{sent[-1]:>10}{sum(sent):>10}{run_ms:>12.1f} ms{summaries:>11}{summary_tokens:>15}")
+    saved = 1 - results["context budget"] / results["no budget"]
+    print(f"prompt tokens saved over the session, summary calls included: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
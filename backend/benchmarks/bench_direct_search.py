@@ -0,0 +1,76 @@
+"""
+Overhead of POST /api/search on top of Exa itself, against the offline FakeExa backend.
+The old endpoint ran a full ExaAgent completion per search; the direct path should add
+milliseconds, and a batch of queries should take about one Exa round trip.
+
+    python -m benchmarks.bench_direct_search --latency 0.3 --iterations 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from agents.exa_search import SEARCH_TYPES, search_tools  # noqa: E402
+from benchmarks.fake_exa import FakeExa  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+from routers import chat_router  # noqa: E402
+
+
+async def run(latency: float, iterations: int, batch: int):
+    fake = FakeExa(latency)
+    for search_type in SEARCH_TYPES:
+        for include_content in (False, True):
+            search_tools(search_type, include_content).exa = fake
+
+    app = FastAPI()
+    app.include_router(chat_router)
+
+    async def timed(client, payload):
+        start = time.perf_counter()
+        response = await client.post("/api/search", json=payload)
+        response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await timed(client, {"query": "warm up"})
+        exa_ms = latency * 1000
+
+        # Unique queries, so every search goes to (fake) Exa
+        single = [await timed(client, {"query": uuid.uuid4().hex}) for _ in range(iterations)]
+        batched = [
+            await timed(client, {"queries": [uuid.uuid4().hex for _ in range(batch)]}) for _ in range(iterations)
+        ]
+        cached = [await timed(client, {"query": "warm up"}) for _ in range(iterations)]
+
+    print(f"fake Exa latency: {exa_ms:.0f} ms per call")
+    print(f"single query      median {statistics.median(single):7.1f} ms  overhead {statistics.median(single) - exa_ms:5.1f} ms")
+    print(f"batch of {batch:<2}       median {statistics.median(batched):7.1f} ms  overhead {statistics.median(batched) - exa_ms:5.1f} ms")
+    print(f"cached query      median {statistics.median(cached):7.1f} ms")
+    print(f"Exa calls: {fake.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per fake Exa call")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=8)
+    args = parser.parse_args()
+
+    apply_migrations()
+    asyncio.run(run(args.latency, args.iterations, args.batch))
+
+
+if __name__ == "__main__":
+    main()
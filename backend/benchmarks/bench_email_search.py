@@ -0,0 +1,121 @@
+"""
+LIKE '%kw%' scans vs the emails_fts index on a synthetic mailbox.
+
+    python -m benchmarks.bench_email_search --rows 1000000
+
+The database is generated once under --db (default: a temp file) and reused on later runs.
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from database.migrations import apply_migrations
+
+WORDS = (
+    "meeting project budget review invoice contract launch roadmap hiring offer design sprint "
+    "release customer feedback quarterly report travel schedule deadline update proposal demo "
+    "security incident migration database outage lunch workshop training onboarding renewal"
+).split()
+NAMES = "Dana Chris Alex Sam Jordan Taylor Morgan Casey Riley Jamie Avery Quinn".split()
+DOMAINS = "example.com acme.com client.com globex.io initech.net".split()
+SYLLABLES = "ka lo mi ne ru ta ve zo pi da sel mor tin gra fe lu".split()
+
+
+def vocabulary(rng: random.Random, size: int = 5000):
+    # Zipf-distributed vocabulary: a few very common filler words, the topic words
+    # above at mid frequency, and a long tail, roughly like real mail text
+    filler = list(dict.fromkeys("".join(rng.choices(SYLLABLES, k=rng.randint(1, 4))) for _ in range(size * 2)))
+    words = filler[:50] + WORDS + NAMES + filler[50:size]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    return words, cum_weights
+
+
+def generate(path: str, rows: int, batch: int = 50_000) -> None:
+    apply_migrations(path)
+    conn = sqlite3.connect(path)
+    existing = conn.execute("SELECT COUNT(*) FROM emails").fetchone()[0]
+    if existing >= rows:
+        conn.close()
+        return
+
+    rng = random.Random(42)
+    words, cum_weights = vocabulary(rng)
+    base = datetime(2020, 1, 1)
+    start = time.perf_counter()
+    for offset in range(existing, rows, batch):
+        chunk = []
+        for i in range(offset, min(offset + batch, rows)):
+            name = rng.choice(NAMES)
+            chunk.append((
+                "synthetic",
+                f"{name} {rng.choice(NAMES)}son <{name.lower()}{i % 997}@{rng.choice(DOMAINS)}>",
+                (base + timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                " ".join(rng.choices(WORDS, k=4)).capitalize(),
+                " ".join(rng.choices(words, cum_weights=cum_weights, k=60)) + ".",
+            ))
+        with conn:
+            conn.executemany(
+                "INSERT INTO emails(origin, sender, received_at, subject, content) VALUES (?,?,?,?,?)",
+                chunk,
+            )
+    conn.close()
+    print(f"generated {rows - existing} emails in {time.perf_counter() - start:.1f}s")
+
+
+def timed(conn: sqlite3.Connection, sql: str, params, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_emails.db"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    generate(args.db, args.rows)
+    conn = sqlite3.connect(args.db)
+
+    # Same shapes as the old and new search_emails / get_emails_by_sender queries
+    like_search = """
+        SELECT id, sender, received_at, subject, content FROM emails
+        WHERE subject LIKE ? OR content LIKE ? ORDER BY received_at DESC
+    """
+    fts_search = """
+        SELECT e.id, e.sender, e.received_at, e.subject, e.content,
+               snippet(emails_fts, -1, '**', '**', '...', 12)
+        FROM emails_fts JOIN emails e ON e.id = emails_fts.rowid
+        WHERE emails_fts MATCH ? ORDER BY bm25(emails_fts, 3.0, 1.0, 0.0) LIMIT 10
+    """
+    like_sender = "SELECT id, sender, received_at, subject, content FROM emails WHERE sender LIKE ? ORDER BY received_at DESC"
+    fts_sender = """
+        SELECT id, sender, received_at, subject, content FROM emails INDEXED BY idx_emails_received_at
+        WHERE id IN (SELECT rowid FROM emails_fts WHERE emails_fts MATCH ?) ORDER BY received_at DESC LIMIT 10
+    """
+
+    print(f"{'query':<34}{'LIKE ms':>10}{'rows':>10}{'FTS ms':>10}{'rows':>6}")
+    for keyword in ("outage", "quarterly invoice", "zzznotfound"):
+        like_ms, like_rows = timed(conn, like_search, (f"%{keyword}%", f"%{keyword}%"), args.repeat)
+        fts_query = " ".join(f'"{w}"*' for w in keyword.split())
+        fts_ms, fts_rows = timed(conn, fts_search, (f"{{subject content}}: ({fts_query})",), args.repeat)
+        print(f"{'search_emails ' + repr(keyword):<34}{like_ms:>10.1f}{like_rows:>10}{fts_ms:>10.1f}{fts_rows:>6}")
+    for sender in ("quinn", "riley42"):
+        like_ms, like_rows = timed(conn, like_sender, (f"%{sender}%",), args.repeat)
+        fts_ms, fts_rows = timed(conn, fts_sender, (f'sender: ("{sender}"*)',), args.repeat)
+        print(f"{'get_emails_by_sender ' + repr(sender):<34}{like_ms:>10.1f}{like_rows:>10}{fts_ms:>10.1f}{fts_rows:>6}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
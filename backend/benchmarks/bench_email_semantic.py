@@ -0,0 +1,76 @@
+"""
+Email vector index (agents/email_index.py) on a synthetic mailbox: build and incremental sync time,
+IVF search latency one query at a time and batched, and recall@k against an exact scan of every row,
+for a range of probe counts.
+
+    python -m benchmarks.bench_email_semantic --rows 1000000
+
+The mailbox is the one from bench_email_search (generated once under --db and reused); the index
+is built from scratch in a temp directory on every run. Its text is uniformly random words with no
+topics to cluster on, the worst case for IVF; real mail needs fewer probes for the same recall.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from agents.email_index import EMAIL_INDEX_PROBES, EmailVectorIndex  # noqa: E402
+from benchmarks.bench_email_search import NAMES, WORDS, generate  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_emails.db"))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--probes", type=int, default=EMAIL_INDEX_PROBES)
+    parser.add_argument("--new-rows", type=int, default=1000, help="rows left out of the build and added by an incremental sync")
+    args = parser.parse_args()
+
+    generate(args.db, args.rows)
+    index = EmailVectorIndex(path=os.path.join(tempfile.mkdtemp(), "email_index"), database_path=args.db)
+
+    start = time.perf_counter()
+    built = index.sync(max_rows=args.rows - args.new_rows)
+    print(f"build: {built} emails in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    added = index.sync()
+    print(f"incremental sync: {added} emails in {(time.perf_counter() - start) * 1000:.0f} ms")
+    stats = index.stats()
+    print(f"index: {stats['rows']} rows, {stats['lists']} lists, {stats['rows'] - stats['clustered_rows']} in the tail, probes={args.probes}")
+
+    rng = random.Random(7)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 3)) + rng.sample(NAMES, rng.randint(0, 1))) for _ in range(args.queries)]
+    index.search_batch(queries[:8], args.k, args.probes)  # fault the memmaps in
+
+    started = time.perf_counter()
+    exact = index.search_batch(queries, args.k, probes=max(stats["lists"], 1))
+    print(f"exact scan of every row, batched: {(time.perf_counter() - started) * 1000 / len(queries):.2f} ms/query")
+
+    # A hit counts if it scores at least the exact k-th best (ties are interchangeable)
+    print(f"{'probes':>8}{'p50 ms':>10}{'p95 ms':>10}{'batch ms/q':>12}{'recall@' + str(args.k):>12}")
+    for probes in sorted({8, 16, 32, 128, args.probes}):
+        samples = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search_batch([query], args.k, probes)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        started = time.perf_counter()
+        approximate = index.search_batch(queries, args.k, probes)
+        batch_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        recall = statistics.mean(
+            sum(score >= e[-1][1] - 1e-4 for _, score in a) / len(e) for a, e in zip(approximate, exact) if e
+        )
+        print(f"{probes:>8}{statistics.median(samples):>10.2f}{samples[int(len(samples) * 0.95) - 1]:>10.2f}{batch_ms:>12.2f}{recall:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
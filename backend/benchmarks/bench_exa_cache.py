@@ -0,0 +1,103 @@
+"""
+Uncached ExaTools vs CachedExaTools on a replayed query trace, against the offline FakeExa backend.
+
+    python -m benchmarks.bench_exa_cache --requests 500 --latency 0.3
+
+The trace repeats popular queries (Zipf) with case/whitespace variants, like real traffic.
+Also shows a restart (memory empty, disk warm) and stale-while-revalidate after the TTL.
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.gettempdir(), "bench_exa_cache.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+
+from agno.tools.exa import ExaTools  # noqa: E402
+
+from agents.exa_cache import CachedExaTools, ResponseCache  # noqa: E402
+from benchmarks.bench_email_search import WORDS  # noqa: E402
+from benchmarks.fake_exa import FakeExa  # noqa: E402
+from database import write_queue  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+
+TOOL_OPTIONS = dict(enable_answer=False, enable_find_similar=False, num_results=3, text_length_limit=800)
+
+
+def trace(requests: int, topics: int, seed: int = 1):
+    rng = random.Random(seed)
+    queries = [" ".join(rng.sample(WORDS, 3)) for _ in range(topics)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(topics)))
+    variants = (str, str.title, str.upper, lambda q: f"  {q} ", lambda q: q.replace(" ", "  "))
+    return [rng.choice(variants)(q) for q in rng.choices(queries, cum_weights=cum_weights, k=requests)]
+
+
+def replay(tools, queries, concurrency: int):
+    def one(query):
+        start = time.perf_counter()
+        tools.search_exa(query)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = sorted(pool.map(one, queries))
+    return time.perf_counter() - start, samples
+
+
+def report(name, wall, samples, calls):
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<26}{wall:>8.2f}s{statistics.mean(samples):>10.1f}{statistics.median(samples):>10.1f}{p95:>10.1f}{calls:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per fake Exa call")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    apply_migrations()
+    queries = trace(args.requests, args.topics)
+
+    print(f"{'':<26}{'wall':>9}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'Exa calls':>10}")
+    plain = ExaTools(**TOOL_OPTIONS)
+    plain.exa = FakeExa(args.latency)
+    report("ExaTools", *replay(plain, queries, args.concurrency), plain.exa.calls)
+
+    cache = ResponseCache(ttls={"search_exa": 3600})
+    cache.clear()
+    cached = CachedExaTools(cache=cache, **TOOL_OPTIONS)
+    cached.exa = FakeExa(args.latency)
+    report("CachedExaTools (cold)", *replay(cached, queries, args.concurrency), cached.exa.calls)
+    print(f"  {cache.stats()}")
+
+    # A restart: empty memory tier, same exa_cache table (once the queued disk writes are in)
+    write_queue.flush()
+    restarted = CachedExaTools(cache=ResponseCache(ttls={"search_exa": 3600}), **TOOL_OPTIONS)
+    restarted.exa = FakeExa(args.latency)
+    report("CachedExaTools (restart)", *replay(restarted, queries, args.concurrency), restarted.exa.calls)
+    print(f"  {restarted.cache.stats()}")
+
+    # Stale-while-revalidate: past the TTL the old result is served at once and refreshed behind it
+    now = [time.time()]
+    swr = CachedExaTools(cache=ResponseCache(ttls={"search_exa": 60}, persist=False, clock=lambda: now[0]), **TOOL_OPTIONS)
+    swr.exa = FakeExa(args.latency)
+    swr.search_exa("stale while revalidate")
+    now[0] += 120
+    start = time.perf_counter()
+    swr.search_exa("stale while revalidate")
+    stale_ms = (time.perf_counter() - start) * 1000
+    time.sleep(args.latency + 0.2)
+    print(f"stale read past TTL: {stale_ms:.2f} ms, Exa calls after background refresh: {swr.exa.calls}")
+    print(f"  {swr.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
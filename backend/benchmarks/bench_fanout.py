@@ -0,0 +1,109 @@
+"""
+Multi-domain questions answered by the team leader delegating to one member after another
+("sequential") versus the intent router's parallel fan-out ("fanout", see fan_out in
+agents/rag_team.py), on stub models (benchmarks/stub_openai.py with --multi-tool-calls, so the
+leader delegates to every member a question touches) and a fake Exa client that is slower than
+the other tools, as the real one usually is.
+
+    python -m benchmarks.bench_fanout --latency 0.3 --exa-latency 1.0
+    python -m benchmarks.bench_fanout --exa-latency 5 --member-timeout 2    # Exa gets cut off
+
+"slowest" is the slowest member of each fan-out, the floor for its end-to-end time.
+"""
+import argparse
+import os
+import socket
+import statistics
+import tempfile
+import time
+import uuid
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+STUB_PORT = free_port()
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ["MODEL_BACKEND"] = "stub"
+os.environ["STUB_MODEL_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+import agents.rag_team as rag_team  # noqa: E402
+from agents import ExaAgent, team_pool  # noqa: E402
+from agents.exa_cache import exa_cache  # noqa: E402
+from agents.intent_router import Route, classify, run_routed  # noqa: E402
+from benchmarks.datagen import generate  # noqa: E402
+from benchmarks.fake_exa import FakeExa  # noqa: E402
+from benchmarks.stub_openai import server_stats, start_server  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+
+PROMPTS = [
+    "What emails did Dana send and when is my next meeting with her?",
+    "Find emails about the launch and search the web for news on vector databases",
+    "Show my emails about the budget, my meetings this week and web news on pricing",
+]
+
+
+def ask(message: str, mode: str):
+    # Every question misses the Exa cache, like a new one would
+    exa_cache.clear()
+    route = Route("team", reason="benchmark") if mode == "sequential" else classify(message)
+    if mode == "fanout" and route.target != "fanout":
+        raise SystemExit(f"not routed to the fan-out ({route.reason}): {message}")
+    start = time.perf_counter()
+    with team_pool.borrow("gpt-4o") as team:
+        run = run_routed(team, message, str(uuid.uuid4()), route=route)
+    members = (run.metadata or {}).get("members", {})
+    return time.perf_counter() - start, members
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub seconds per model call")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0)
+    parser.add_argument("--exa-latency", type=float, default=1.0, help="seconds per fake Exa request")
+    parser.add_argument("--member-timeout", type=float, default=None, help="TEAM_MEMBER_TIMEOUT for the fan-out")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.member_timeout is not None:
+        rag_team.TEAM_MEMBER_TIMEOUT = args.member_timeout
+    timeout = rag_team.TEAM_MEMBER_TIMEOUT
+
+    generate(os.environ["DATABASE_PATH"], emails=5000, events=1000)
+    apply_migrations()
+    # Member copies share the toolkit objects, so this reaches every team's Exa agent
+    for toolkit in ExaAgent.tools:
+        toolkit.exa = FakeExa(latency=args.exa_latency)
+    stub = start_server(STUB_PORT, "--latency", str(args.latency), "--tokens-per-sec", str(args.tokens_per_sec), "--multi-tool-calls")
+    try:
+        team_pool.warm_up(["gpt-4o"])
+        ask(PROMPTS[0], "sequential")  # creates the agno tables
+
+        print(f"model call {args.latency * 1000:.0f} ms, Exa request {args.exa_latency * 1000:.0f} ms, member timeout {timeout:g} s")
+        print(f"{'question':<48}{'mode':>12}{'p50 ms':>9}{'calls':>7}{'slowest':>9}{'timeouts':>10}")
+        for message in PROMPTS:
+            for mode in ("sequential", "fanout"):
+                before = server_stats(STUB_PORT)["requests"]
+                times, slowest, timeouts = [], [], 0
+                for _ in range(args.repeat):
+                    seconds, members = ask(message, mode)
+                    times.append(seconds)
+                    if members:
+                        slowest.append(max(m["ms"] for m in members.values()))
+                        timeouts += sum(1 for m in members.values() if "within" in m.get("error", ""))
+                calls = (server_stats(STUB_PORT)["requests"] - before) / args.repeat
+                print(
+                    f"{message[:46]:<48}{mode:>12}{statistics.median(times) * 1000:>9.0f}{calls:>7.1f}"
+                    f"{(f'{statistics.median(slowest):.0f}' if slowest else '-'):>9}{timeouts:>10}"
+                )
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Bulk import of a synthetic mbox: one INSERT + commit per message (what a naive importer does) vs
+database/ingest.py parsing inline and in a process pool, with the latency of a reader running
+get_recent_emails-shaped queries during the import, and a re-run that resumes from the checkpoint.
+
+    python -m benchmarks.bench_ingest --messages 100000 --workers 4
+"""
+import argparse
+import mailbox
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+
+from benchmarks.bench_email_search import DOMAINS, NAMES, WORDS, vocabulary
+from database.ingest import ingest, parse_message
+from database.migrations import apply_migrations
+
+
+def write_mbox(path: str, messages: int) -> None:
+    rng = random.Random(42)
+    words, cum_weights = vocabulary(rng)
+    base = datetime(2024, 1, 1).astimezone()
+    with open(path, "w") as f:
+        for i in range(messages):
+            name = rng.choice(NAMES)
+            body = "\n".join(" ".join(rng.choices(words, cum_weights=cum_weights, k=12)) for _ in range(6))
+            f.write(
+                f"From {name.lower()}@{DOMAINS[i % len(DOMAINS)]} Mon Jan  1 00:00:00 2024\n"
+                f"From: {name} <{name.lower()}{i % 997}@{rng.choice(DOMAINS)}>\n"
+                f"To: me@example.com\n"
+                f"Subject: {' '.join(rng.choices(WORDS, k=4)).capitalize()}\n"
+                f"Date: {format_datetime(base + timedelta(minutes=i))}\n"
+                f"Message-ID: <{i}.bench@example.com>\n"
+                f"Content-Type: text/plain; charset=utf-8\n\n{body}\n\n"
+            )
+
+
+def naive_import(path: str, db: str, limit: int) -> float:
+    # mailbox.mbox + one autocommitted INSERT per message
+    apply_migrations(db)
+    conn = sqlite3.connect(db)
+    conn.execute("PRAGMA journal_mode=WAL")
+    started = time.perf_counter()
+    for i, message in enumerate(mailbox.mbox(path)):
+        if i == limit:
+            break
+        _, row = parse_message(message.as_bytes(), "mbox")
+        conn.execute("INSERT INTO emails(origin, message_id, sender, received_at, subject, content) VALUES (?,?,?,?,?,?)", row)
+        conn.commit()
+    conn.close()
+    return limit / (time.perf_counter() - started)
+
+
+def reader(db: str, stop: threading.Event, samples: list) -> None:
+    conn = sqlite3.connect(db)
+    conn.execute("PRAGMA busy_timeout=5000")
+    while not stop.is_set():
+        started = time.perf_counter()
+        conn.execute("SELECT id, sender, received_at, subject FROM emails ORDER BY received_at DESC, id DESC LIMIT 11").fetchall()
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.005)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument("--naive", type=int, default=5000, help="messages imported the naive way")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    mbox = os.path.join(tmp, "bench.mbox")
+    write_mbox(mbox, args.messages)
+    print(f"mbox: {args.messages} messages, {os.path.getsize(mbox) / 1e6:.0f} MB")
+
+    print(f"{'import':<34}{'rows/s':>10}")
+    print(f"{'naive (commit per row)':<34}{naive_import(mbox, os.path.join(tmp, 'naive.db'), args.naive):>10.0f}")
+
+    for workers in (0, args.workers):
+        db = os.path.join(tmp, f"ingest{workers}.db")
+        apply_migrations(db)
+        stop, samples = threading.Event(), []
+        thread = threading.Thread(target=reader, args=(db, stop, samples))
+        thread.start()
+        report = ingest(mbox, database_path=db, workers=workers)
+        stop.set()
+        thread.join()
+        samples.sort()
+        label = f"ingest, {workers or 'inline'} parse workers"
+        print(
+            f"{label:<34}{report.rows_per_sec:>10.0f}   {report.emails} inserted; concurrent reads "
+            f"p50 {statistics.median(samples):.2f} ms, max {samples[-1]:.1f} ms"
+        )
+
+    started = time.perf_counter()
+    resumed = ingest(mbox, database_path=db, workers=args.workers)
+    print(f"re-run from checkpoint: {resumed.records} records read in {(time.perf_counter() - started) * 1000:.0f} ms")
+    duplicate = ingest(mbox, database_path=db, workers=args.workers, restart=True)
+    print(f"re-run with --restart: {duplicate.duplicates} duplicates skipped, {duplicate.emails} inserted, {duplicate.rows_per_sec:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Routing accuracy of agents/intent_router.py on the labelled set in benchmarks/intent_eval.jsonl,
+classifier latency, and end-to-end latency of /api/chat requests with and without the fast path.
+
+    python -m benchmarks.bench_intent_router --llm-latency 0.3
+
+End to end runs on StubModel against generated emails and events. The team leader stub takes
+two round trips of --llm-latency, the least a delegated request costs; member stubs take one.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from agents.intent_router import Route, classify, run_routed  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from benchmarks import bench_calendar_queries, bench_email_search  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+from database.db import DATABASE_PATH  # noqa: E402
+
+EVAL_SET = Path(__file__).with_name("intent_eval.jsonl")
+
+
+def expected(row):
+    if row.get("tool"):
+        return ("tool", row["route"], row["tool"], row["arguments"])
+    if row["route"] == "fanout":
+        return ("fanout", tuple(row["domains"]))
+    return ("team",) if row["route"] == "team" else ("member", row["route"])
+
+
+def predicted(route: Route):
+    if route.target == "tool":
+        return ("tool", route.domain, route.tool, route.arguments)
+    if route.target == "fanout":
+        return ("fanout", tuple(route.domains))
+    return ("team",) if route.target == "team" else ("member", route.domain)
+
+
+def percentile(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+def evaluate(rows):
+    counts = Counter()
+    for row in rows:
+        want, got = expected(row), predicted(classify(row["text"]))
+        counts["total"] += 1
+        counts["correct"] += want == got
+        if want != got:
+            print(f"  {row['text']!r}: expected {want}, routed {got}")
+        if want[0] != "team":
+            counts["fast_labelled"] += 1
+        if got[0] == "team":
+            # Sending a request to the team is always safe, just slower
+            counts["missed"] += want[0] != "team"
+            continue
+        counts["dispatched"] += 1
+        # Right member (a tool-labelled request answered by its member is still right)
+        counts["dispatched_ok"] += want[0] != "team" and got[1] == want[1]
+        counts["tool_dispatched"] += got[0] == "tool"
+        counts["tool_exact"] += got[0] == "tool" and got == want
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--emails", type=int, default=20_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    args = parser.parse_args()
+
+    rows = [json.loads(line) for line in EVAL_SET.read_text().splitlines() if line.strip()]
+    print(f"eval set: {len(rows)} requests; routes that differ from the label:")
+    counts = evaluate(rows)
+    print(f"exact route accuracy      {counts['correct'] / counts['total']:.1%}")
+    print(f"fast-path precision       {counts['dispatched_ok'] / counts['dispatched']:.1%} of {counts['dispatched']} dispatched")
+    print(f"fast-path coverage        {counts['dispatched_ok'] / counts['fast_labelled']:.1%} of {counts['fast_labelled']} fast-path requests "
+          f"({counts['missed']} sent to the team)")
+    print(f"direct tool calls exact   {counts['tool_exact']} of {counts['tool_dispatched']}")
+
+    samples = []
+    for _ in range(max(args.repeat // len(rows), 1)):
+        for row in rows:
+            start = time.perf_counter()
+            classify(row["text"])
+            samples.append((time.perf_counter() - start) * 1e6)
+    print(f"classify latency          p50 {percentile(samples, 0.5):.0f} us, p95 {percentile(samples, 0.95):.0f} us")
+
+    bench_email_search.generate(DATABASE_PATH, args.emails)
+    bench_calendar_queries.generate(DATABASE_PATH, args.events)
+    team = RAGTeam("stub", model=StubModel(id="leader", latency=2 * args.llm_latency, reply="Here you go."))
+    for member in team.members:
+        member.model = StubModel(id="member", latency=args.llm_latency, reply="Here you go.")
+
+    timings = {"team only": [], "routed": []}
+    by_target = {"tool": [], "member": [], "fanout": [], "team": []}
+    for row in rows:
+        start = time.perf_counter()
+        run_routed(team, row["text"], str(uuid.uuid4()), route=Route("team"))
+        timings["team only"].append(time.perf_counter() - start)
+
+        route = classify(row["text"])
+        start = time.perf_counter()
+        run_routed(team, row["text"], str(uuid.uuid4()), route=route)
+        elapsed = time.perf_counter() - start
+        timings["routed"].append(elapsed)
+        by_target[route.target].append(elapsed)
+
+    print(f"end to end, {len(rows)} requests, {args.llm_latency * 1000:.0f} ms per LLM round trip:")
+    for label, samples in list(timings.items()) + [(f"  routed: {t}", s) for t, s in by_target.items() if s]:
+        print(f"{label:<22}{len(samples):>5} req  p50 {percentile(samples, 0.5) * 1000:>7.1f} ms  "
+              f"p95 {percentile(samples, 0.95) * 1000:>7.1f} ms  mean {statistics.mean(samples) * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+GET /api/sessions/{id}/messages on a long session: agno's get_messages_for_session (the old
+endpoint) vs the pages cut from the cached message index in database/sessions.py, and a 304 revalidation.
+
+    python -m benchmarks.bench_session_history --runs 500
+
+The session is built from one real StubModel run, copied --runs times with a tool call and
+a large tool result in every run.
+"""
+import argparse
+import copy
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+os.environ.setdefault("CHAT_MODELS", "stub")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from agents import team_pool  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+from database import clear_history_cache, transaction  # noqa: E402
+from routers import chat_router  # noqa: E402
+
+SESSION_ID = "bench-history"
+
+
+def build_session(runs: int, tool_result_chars: int) -> None:
+    with team_pool.borrow("stub") as team:
+        team.run(input="hello", session_id=SESSION_ID)
+
+    with transaction() as conn:
+        (raw,) = conn.execute("SELECT runs FROM agno_sessions WHERE session_id = ?", (SESSION_ID,)).fetchone()
+        template = json.loads(json.loads(raw))[0]
+        session_runs = []
+        for i in range(runs):
+            run = copy.deepcopy(template)
+            run["run_id"] = str(uuid.uuid4())
+            call_id = f"call_{i}"
+            for message in run["messages"]:
+                message["id"] = str(uuid.uuid4())
+                if message["role"] == "user":
+                    message["content"] = f"question {i}"
+                if message["role"] == "assistant":
+                    message["content"] = f"answer {i}"
+            # An assistant turn that called a tool, and the (large) tool result
+            run["messages"][-1:-1] = [
+                {"id": str(uuid.uuid4()), "role": "assistant", "content": None, "from_history": False,
+                 "tool_calls": [{"id": call_id, "type": "function",
+                                 "function": {"name": "search_exa", "arguments": json.dumps({"query": f"topic {i}"})}}]},
+                {"id": str(uuid.uuid4()), "role": "tool", "tool_call_id": call_id, "from_history": False,
+                 "content": "x" * tool_result_chars},
+            ]
+            session_runs.append(run)
+        conn.execute(
+            "UPDATE agno_sessions SET runs = ? WHERE session_id = ?",
+            (json.dumps(json.dumps(session_runs)), SESSION_ID),
+        )
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--tool-result-chars", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    team_pool.factory = lambda name: RAGTeam(name, model=StubModel(id=name))
+    build_session(args.runs, args.tool_result_chars)
+
+    app = FastAPI()
+    app.include_router(chat_router)
+    client = TestClient(app)
+    url = f"/api/sessions/{SESSION_ID}/messages"
+
+    def old_endpoint():
+        # What the endpoint did before: every message of every run as agno objects
+        with team_pool.borrow("stub") as team:
+            messages = team.get_messages_for_session(session_id=SESSION_ID)
+        return [{"role": m.role, "content": m.content} for m in messages if m.role in ("user", "assistant")]
+
+    old_ms, old = timed(old_endpoint, args.repeat)
+    def cold_tail():
+        clear_history_cache()
+        return client.get(url, params={"model": "stub", "limit": 50})
+
+    cold_ms, _ = timed(cold_tail, args.repeat)
+    tail_ms, tail = timed(lambda: client.get(url, params={"model": "stub", "limit": 50}), args.repeat)
+    lean_ms, lean = timed(lambda: client.get(url, params={"model": "stub", "limit": 50, "include_tool_data": False}), args.repeat)
+    etag = tail.headers["etag"]
+    cached_ms, cached = timed(lambda: client.get(url, params={"model": "stub"}, headers={"If-None-Match": etag}), args.repeat)
+    after = tail.json()["after"]
+    poll_ms, poll = timed(lambda: client.get(url, params={"model": "stub", "after": after}), args.repeat)
+
+    print(f"session: {args.runs} runs, {len(old)} user/assistant messages")
+    print(f"{'get_messages_for_session (old)':<40}{old_ms:>9.1f} ms  {len(json.dumps(old)) // 1024:>6} KB")
+    print(f"{'last 50, first read of this version':<40}{cold_ms:>9.1f} ms")
+    print(f"{'last 50 with tool_data':<40}{tail_ms:>9.1f} ms  {len(tail.content) // 1024:>6} KB")
+    print(f"{'last 50, include_tool_data=false':<40}{lean_ms:>9.1f} ms  {len(lean.content) // 1024:>6} KB")
+    print(f"{'poll with after= (no new messages)':<40}{poll_ms:>9.1f} ms  {len(poll.json()['messages'])} messages")
+    print(f"{'If-None-Match revalidation':<40}{cached_ms:>9.1f} ms  status {cached.status_code}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-call sqlite3.connect() (the old tool pattern) vs the shared per-thread connections from
+database.get_connection(), running the email tool queries against a synthetic mailbox.
+
+    python -m benchmarks.bench_sqlite_connections --rows 50000 --calls 2000
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_email_search import generate
+from database import get_connection
+
+QUERIES = [
+    ("recent", "SELECT id, sender, received_at, subject, content FROM emails ORDER BY received_at DESC LIMIT ?", (10,)),
+    (
+        "search",
+        """
+        SELECT e.id, e.sender, e.received_at, e.subject, e.content, snippet(emails_fts, -1, '**', '**', '...', 12)
+        FROM emails_fts JOIN emails e ON e.id = emails_fts.rowid
+        WHERE emails_fts MATCH ? ORDER BY bm25(emails_fts, 3.0, 1.0, 0.0) LIMIT 10
+        """,
+        ('{subject content}: ("invoice"* "renewal"*)',),
+    ),
+]
+
+
+def per_call_connect(path: str, sql: str, params) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute(sql, params).fetchall()
+    conn.close()
+
+
+def shared_connection(path: str, sql: str, params) -> None:
+    get_connection(path).execute(sql, params).fetchall()
+
+
+def bench(fn, path: str, sql: str, params, calls: int):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn(path, sql, params)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(samples), statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_connections.db"))
+    args = parser.parse_args()
+
+    generate(args.db, args.rows)
+    for name, sql, params in QUERIES:
+        for label, fn in (("connect per call", per_call_connect), ("shared connection", shared_connection)):
+            mean, p50 = bench(fn, args.db, sql, params, args.calls)
+            print(f"{name:<8}{label:<20} mean={mean:7.3f}ms  p50={p50:7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Cold start of the API process: time from launching uvicorn to the first 200 from GET /health
+and from GET /health/ready, plus an import-time profile of `import main`.
+
+    python -m benchmarks.bench_startup --runs 5 --top 20
+
+Every run is a fresh process (python -m uvicorn main:app) on a copy of the same database and
+email index, with MODEL_BACKEND=stub pointed at benchmarks/stub_openai.py, which /health/ready
+checks. The profile comes from `python -X importtime` and adds up each module's own
+import time per top-level package, then lists the slowest single modules.
+"""
+import argparse
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.stub_openai import start_server
+
+BACKEND = Path(__file__).resolve().parent.parent
+STUB_PORT = None
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def environment(database_path: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({"DATABASE_PATH": database_path, "AGNO_TELEMETRY": "false", "PYTHONDONTWRITEBYTECODE": "0"})
+    env.update({"MODEL_BACKEND": "stub", "STUB_MODEL_URL": f"http://127.0.0.1:{STUB_PORT}/v1"})
+    env.setdefault("EXA_API_KEY", "stub")
+    return env
+
+
+def wait_for(client: httpx.Client, url: str, started: float, deadline: float) -> Optional[float]:
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url, timeout=1.0).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.005)
+    return None
+
+
+def cold_start(database_path: str, timeout: float) -> Tuple[Optional[float], Optional[float]]:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND, env=environment(database_path), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            deadline = started + timeout
+            healthy = wait_for(client, "/health", started, deadline)
+            ready = wait_for(client, "/health/ready", started, deadline) if healthy is not None else None
+        return healthy, ready
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def import_profile(database_path: str) -> Tuple[float, List[Tuple[str, int]], List[Tuple[str, int]]]:
+    """(total seconds, own microseconds per top-level package, slowest modules by own time)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND, env=environment(database_path), capture_output=True, text=True,
+    )
+    packages: Counter = Counter()
+    modules: List[Tuple[str, int]] = []
+    total = 0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, indent, name = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        packages[name.split(".")[0]] += own
+        modules.append((name, own))
+        if len(indent) <= 1:
+            total += cumulative
+    return total / 1e6, packages.most_common(), sorted(modules, key=lambda m: -m[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="packages and modules listed in the profile")
+    parser.add_argument("--db", help="database to copy for every run (default: a fresh one)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    global STUB_PORT
+    STUB_PORT = free_port()
+    stub = start_server(STUB_PORT)
+    workdir = tempfile.mkdtemp()
+    try:
+        template = os.path.join(workdir, "template.db")
+        if args.db:
+            shutil.copy(args.db, template)
+        # Migrate the template and build its email index up front, so runs measure a restart
+        # rather than a first deployment
+        subprocess.run([sys.executable, "-m", "agents.email_index"], cwd=BACKEND, env=environment(template),
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        index = f"{template}.email_index"
+
+        healthy, ready = [], []
+        for run in range(args.runs):
+            database_path = os.path.join(workdir, f"run{run}.db")
+            shutil.copy(template, database_path)
+            if os.path.isdir(index):
+                shutil.copytree(index, f"{database_path}.email_index")
+            first_healthy, first_ready = cold_start(database_path, args.timeout)
+            if first_healthy is None:
+                raise SystemExit(f"run {run}: no healthy response within {args.timeout}s")
+            healthy.append(first_healthy)
+            if first_ready is not None:
+                ready.append(first_ready)
+            ready_ms = f"{first_ready * 1000:.0f} ms" if first_ready is not None else "not ready"
+            print(f"run {run}: /health {first_healthy * 1000:.0f} ms, /health/ready {ready_ms}")
+
+        print(f"\ntime to first healthy response: median {statistics.median(healthy) * 1000:.0f} ms, "
+              f"min {min(healthy) * 1000:.0f} ms over {len(healthy)} runs")
+        if ready:
+            print(f"time to ready:                  median {statistics.median(ready) * 1000:.0f} ms")
+
+        total, packages, modules = import_profile(template)
+        print(f"\nimport main: {total * 1000:.0f} ms")
+        print(f"{'package':<32}{'own ms':>8}")
+        for name, own in packages[:args.top]:
+            print(f"{name:<32}{own / 1000:>8.0f}")
+        print(f"\n{'slowest modules':<56}{'own ms':>8}")
+        for name, own in modules[:args.top]:
+            print(f"{name:<56}{own / 1000:>8.1f}")
+    finally:
+        stub.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
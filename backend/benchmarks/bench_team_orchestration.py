@@ -0,0 +1,153 @@
+"""
+Latency and throughput of the team orchestration itself: the app runs with MODEL_BACKEND=stub
+against benchmarks/stub_openai.py (separate process, fixed latency and tokens/sec, scripted
+delegation and tool calls), so every request pays the real OpenAI client, SSE parsing, team
+delegation, member tool calls and session writes, but no vendor variance.
+
+    python -m benchmarks.bench_team_orchestration --latency 0.2 --tokens-per-sec 100 --concurrency 1,4,16
+
+"model floor" is the time the stub itself spends per request (latency per model call plus the
+paced reply tokens); "overhead" is p50 minus that floor, i.e. what the app adds.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+STUB_PORT = free_port()
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ["MODEL_BACKEND"] = "stub"
+os.environ["STUB_MODEL_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+# Every message goes through the team leader
+os.environ.setdefault("ROUTER_ENABLED", "0")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from agents import team_pool  # noqa: E402
+from agents.exa_search import SEARCH_TYPES, search_tools  # noqa: E402
+from agents.rag_team import RAGTeam  # noqa: E402
+from agents.tracing import TracingMiddleware  # noqa: E402
+from benchmarks.datagen import generate  # noqa: E402
+from benchmarks.fake_exa import FakeExa  # noqa: E402
+from benchmarks.stub_openai import server_stats, start_server  # noqa: E402
+from routers import chat_router  # noqa: E402
+
+PROMPTS = [
+    "Show me emails about the launch",
+    "What's on my calendar this week?",
+    "Search the web for news about vector databases",
+    "Hello, what can you do?",
+]
+
+
+def offline_team(name: str) -> RAGTeam:
+    team = RAGTeam(name)
+    for member in team.members:
+        for toolkit in member.tools or []:
+            if hasattr(toolkit, "exa"):
+                toolkit.exa = FakeExa()
+    return team
+
+
+async def request(client: httpx.AsyncClient, path: str, message: str):
+    payload = {"message": message, "session_id": str(uuid.uuid4()), "model": "gpt-4o"}
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream("POST", path, json=payload) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_text():
+            if first_token is None and (path == "/api/chat" or "event: delta" in chunk):
+                first_token = time.perf_counter() - start
+    return first_token, time.perf_counter() - start
+
+
+async def run(client, path: str, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            return await request(client, path, PROMPTS[i % len(PROMPTS)])
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(requests)))
+    return results, time.perf_counter() - started
+
+
+async def main_async(args):
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+    app.include_router(chat_router)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    reply_seconds = args.reply_tokens / args.tokens_per_sec if args.tokens_per_sec else 0.0
+    print(f"{'endpoint':<18}{'conc':>5}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'ttft p50':>10}{'calls/req':>11}{'floor ms':>10}{'overhead':>10}")
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+        await request(client, "/api/chat", PROMPTS[0])  # creates the agno tables
+        for path in ("/api/chat", "/api/chat/stream"):
+            for concurrency in args.concurrency:
+                before = server_stats(STUB_PORT)
+                results, wall = await run(client, path, args.requests, concurrency)
+                after = server_stats(STUB_PORT)
+                calls = (after["requests"] - before["requests"]) / args.requests
+                tool_calls = (after["tool_calls"] - before["tool_calls"]) / args.requests
+                floor = calls * args.latency + (calls - tool_calls) * reply_seconds
+                totals = sorted(total for _, total in results)
+                p50 = statistics.median(totals)
+                print(
+                    f"{path:<18}{concurrency:>5}{args.requests / wall:>8.1f}{p50 * 1000:>9.0f}"
+                    f"{totals[int(len(totals) * 0.95) - 1] * 1000:>9.0f}"
+                    f"{statistics.median(t for t, _ in results) * 1000:>10.0f}{calls:>11.1f}"
+                    f"{floor * 1000:>10.0f}{(p50 - floor) * 1000:>10.0f}"
+                )
+    server.should_exit = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=100.0)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=40, help="requests per endpoint and concurrency")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16])
+    parser.add_argument("--emails", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    generate(os.environ["DATABASE_PATH"], emails=args.emails, events=args.events)
+    for search_type in SEARCH_TYPES:
+        for include_content in (False, True):
+            search_tools(search_type, include_content).exa = FakeExa()
+    stub = start_server(
+        STUB_PORT, "--latency", str(args.latency), "--tokens-per-sec", str(args.tokens_per_sec),
+        "--reply-tokens", str(args.reply_tokens),
+    )
+    try:
+        team_pool.factory = offline_team
+        team_pool.warm_up(["gpt-4o"])
+        asyncio.run(main_async(args))
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-request overhead of building a RAGTeam on every request vs borrowing one from RAGTeamPool.
+
+    python -m benchmarks.bench_team_pool --requests 200
+
+Uses StubModel so the numbers only contain team setup and orchestration, not LLM latency.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+# Keep benchmark sessions out of the real agno.db (read at import time by the agents)
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from agents.rag_team import RAGTeam, RAGTeamPool  # noqa: E402
+from benchmarks.stub_model import StubModel  # noqa: E402
+
+
+def build_team(model_name: str) -> RAGTeam:
+    return RAGTeam(model_name, model=StubModel(id=model_name))
+
+
+def summarize(label: str, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<22} mean={statistics.mean(samples):7.2f}ms  p50={statistics.median(samples):7.2f}ms  p95={p95:7.2f}ms")
+
+
+def bench_per_request(n: int):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        build_team("stub").run(input="hi", session_id=str(uuid.uuid4()))
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def bench_pooled(n: int):
+    pool = RAGTeamPool(size=1, factory=build_team)
+    pool.warm_up(["stub"])
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        with pool.borrow("stub") as team:
+            team.run(input="hi", session_id=str(uuid.uuid4()))
+        samples.append((time.perf_counter() - start) * 1000)
+    print(f"pool stats: {pool.stats()}")
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    # Warm imports/DB tables so neither side pays one-off costs
+    build_team("stub").run(input="warm up", session_id=str(uuid.uuid4()))
+
+    summarize("new team per request", bench_per_request(args.requests))
+    summarize("pooled team", bench_pooled(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Tool memoization (agents/tool_memo.py): the email/calendar tool calls of a typical team run,
+where the leader and the members repeat some calls, replayed by concurrent "runs" without the
+memo, with a memo per run and with the process-wide memo.
+
+    python -m benchmarks.bench_tool_memo --emails 20000 --events 5000 --threads 4 --runs 200
+
+Then checks that a write made in the middle of a run is seen by the next call in the same run,
+while other threads keep reading and writing.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench_memo.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from agents import tool_memo  # noqa: E402
+from agents.calendar_agent import add_calendar_event, get_all_events, get_events_by_attendee, get_upcoming_events  # noqa: E402
+from agents.email_agent import get_email_body, get_recent_emails, search_emails  # noqa: E402
+from benchmarks.datagen import generate  # noqa: E402
+
+# One run's tool calls: the leader looks, delegates, and the members fetch again to answer
+RUN = [
+    (get_recent_emails, {"limit": 10}),
+    (get_upcoming_events, {"days": 7}),
+    (get_recent_emails, {}),
+    (search_emails, {"keyword": "launch"}),
+    (get_upcoming_events, {"days": 7, "limit": 20}),
+    (get_all_events, {}),
+    (get_email_body, {"email_id": 1}),
+    (search_emails, {"keyword": "launch", "limit": 10}),
+    (get_all_events, {"limit": 20}),
+    (get_recent_emails, {"limit": 10}),
+]
+
+
+def replay(scope: str) -> float:
+    start = time.perf_counter()
+    token = tool_memo._run_memo.set(tool_memo.ToolMemo()) if scope == "run" else None
+    try:
+        for tool, kwargs in RUN:
+            tool(**kwargs)
+    finally:
+        if token is not None:
+            tool_memo._run_memo.reset(token)
+    return time.perf_counter() - start
+
+
+def measure(scope: str, threads: int, runs: int):
+    # _current_memo reads the scope on every call
+    tool_memo.TOOL_MEMO_SCOPE = "process" if scope == "process" else "run"
+    tool_memo.process_memo = tool_memo.ToolMemo(ttl=tool_memo.TOOL_MEMO_TTL)
+    tool_memo.memo_stats = tool_memo.MemoStats()
+    times = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(runs // threads):
+            seconds = replay(scope)
+            with lock:
+                times.append(seconds)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return times, time.perf_counter() - started, tool_memo.memo_stats.snapshot()
+
+
+def check_writes(threads: int, rounds: int) -> int:
+    """Every thread adds an event for its own attendee mid-run and must see it on the next call"""
+    tool_memo.TOOL_MEMO_SCOPE = "run"
+    failures = []
+
+    def worker(n):
+        for i in range(rounds):
+            attendee = f"memo-check-{n}-{i}"
+            token = tool_memo._run_memo.set(tool_memo.ToolMemo())
+            try:
+                get_events_by_attendee(attendee)
+                get_upcoming_events(days=7)
+                added = add_calendar_event(f"Memo check {n}.{i}", "2030-01-01T09:00:00Z", "2030-01-01T09:30:00Z", attendee, allow_conflicts=True)
+                if f"Memo check {n}.{i}" not in get_events_by_attendee(attendee):
+                    failures.append(added)
+            finally:
+                tool_memo._run_memo.reset(token)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    generate(os.environ["DATABASE_PATH"], emails=args.emails, events=args.events)
+    for tool, kwargs in RUN:
+        tool(**kwargs)
+
+    print(f"{len(RUN)} tool calls per run, {args.threads} threads")
+    print(f"{'memo':<10}{'runs/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'saved':>8}{'saved ms':>10}")
+    for scope in ("off", "run", "process"):
+        times, wall, stats = measure(scope, args.threads, args.runs)
+        times.sort()
+        print(
+            f"{scope:<10}{len(times) / wall:>9.0f}{statistics.median(times) * 1000:>9.2f}"
+            f"{times[int(len(times) * 0.95) - 1] * 1000:>9.2f}{stats['hits']:>8}{stats['saved_ms']:>10.0f}"
+        )
+    failures = check_writes(args.threads, 25)
+    print(f"writes seen by the next call in the same run: {args.threads * 25 - failures}/{args.threads * 25}")
+
+
+if __name__ == "__main__":
+    main()
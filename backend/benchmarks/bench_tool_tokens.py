@@ -0,0 +1,66 @@
+"""
+Prompt tokens added by the email tools: the old full-content dumps vs the compact pages.
+
+    python -m benchmarks.bench_tool_tokens --rows 50000
+
+Token counts use the same ~4 chars/token estimate the tools record in /health/tools.
+"""
+import argparse
+import os
+import tempfile
+
+DB = os.path.join(tempfile.gettempdir(), "bench_tool_tokens.db")
+os.environ.setdefault("DATABASE_PATH", DB)
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+
+from agents.email_agent import get_emails_by_sender, get_recent_emails, search_emails  # noqa: E402
+from agents.tool_results import estimate_tokens  # noqa: E402
+from benchmarks.bench_email_search import generate  # noqa: E402
+from database import get_connection  # noqa: E402
+
+
+def old_format(rows) -> str:
+    # What every email tool returned before: all columns, full content, no limit on searches
+    return "\n---\n".join(
+        f"ID: {email_id}\nFrom: {sender}\nReceived: {received_at}\nSubject: {subject}\nContent: {content}\n"
+        for email_id, sender, received_at, subject, content in rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    generate(os.environ["DATABASE_PATH"], args.rows)
+    conn = get_connection()
+    columns = "id, sender, received_at, subject, content"
+
+    cases = [
+        (
+            "get_recent_emails(10)",
+            conn.execute(f"SELECT {columns} FROM emails ORDER BY received_at DESC LIMIT 10").fetchall(),
+            lambda: get_recent_emails(10),
+        ),
+        (
+            "search_emails('renewal')",
+            conn.execute(f"SELECT {columns} FROM emails WHERE subject LIKE ? OR content LIKE ? ORDER BY received_at DESC",
+                         ("%renewal%", "%renewal%")).fetchall(),
+            lambda: search_emails("renewal"),
+        ),
+        (
+            "get_emails_by_sender('riley4')",
+            conn.execute(f"SELECT {columns} FROM emails WHERE sender LIKE ? ORDER BY received_at DESC",
+                         ("%riley4%",)).fetchall(),
+            lambda: get_emails_by_sender("riley4"),
+        ),
+    ]
+
+    print(f"{'tool call':<32}{'old tokens':>12}{'new tokens':>12}")
+    for name, old_rows, new_call in cases:
+        print(f"{name:<32}{estimate_tokens(old_format(old_rows)):>12}{estimate_tokens(new_call()):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Multi-worker throughput: read-heavy chat traffic against `uvicorn --workers N` sharing one SQLite
+database, for each N in --workers, plus a check that concurrent writes from several processes
+stay consistent.
+
+    python -m benchmarks.bench_workers --workers 1,2,4 --duration 20 --concurrency 32
+
+Every N starts a fresh server on a copy of the same generated database (and prebuilt email
+index), with MODEL_BACKEND=stub pointed at benchmarks/stub_openai.py. Clients keep --concurrency
+requests in flight for --duration seconds: --read-ratio of them page through the history of a
+generated session, the rest are POST /api/chat questions that the router answers with an email or
+calendar tool or a member agent (each also writes its session). Scaling efficiency is
+throughput(N) / (N * throughput(1)); expect it near 1 only while N <= the number of CPU cores.
+
+The write check has --writers processes call add_calendar_event for the same slot at once:
+exactly one may succeed, the others must report the conflict, and none may fail with
+"database is locked".
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.datagen import generate
+from benchmarks.stub_openai import start_server
+
+BACKEND = Path(__file__).resolve().parent.parent
+SEED = 42
+QUESTIONS = [
+    "what emails did I get about the launch",
+    "show my recent emails",
+    "what is on my calendar this week",
+    "when is my next meeting",
+    "search my inbox for budget",
+    "do I have any meetings tomorrow",
+    "summarize the email from alice about the schedule",
+    "am I free on friday afternoon",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def environment(database_path: str, stub_port: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({"DATABASE_PATH": database_path, "AGNO_TELEMETRY": "false"})
+    env.update({"MODEL_BACKEND": "stub", "STUB_MODEL_URL": f"http://127.0.0.1:{stub_port}/v1"})
+    env.setdefault("EXA_API_KEY", "stub")
+    return env
+
+
+def start_app(workers: int, database_path: str, stub_port: int, timeout: float) -> Tuple[subprocess.Popen, int]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND, env=environment(database_path, stub_port), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+        while time.monotonic() < deadline:
+            try:
+                if client.get("/health/ready", timeout=2.0).status_code == 200:
+                    return process, port
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None:
+                raise SystemExit(f"uvicorn --workers {workers} exited with code {process.returncode}")
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit(f"uvicorn --workers {workers} not ready within {timeout}s")
+
+
+async def drive(port: int, sessions: int, concurrency: int, duration: float, read_ratio: float) -> Dict[str, object]:
+    latencies: Dict[str, List[float]] = {"history": [], "chat": []}
+    errors: Counter = Counter()
+    pids = set()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60.0, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user(n: int):
+            rng = random.Random(n)
+            session_id = str(uuid.uuid4())
+            while time.perf_counter() < deadline:
+                if rng.random() < read_ratio:
+                    kind = "history"
+                    request = client.get(f"/api/sessions/datagen-{SEED}-{rng.randrange(sessions)}/messages", params={"limit": 20})
+                else:
+                    kind = "chat"
+                    request = client.post("/api/chat", json={"message": rng.choice(QUESTIONS), "session_id": session_id})
+                start = time.perf_counter()
+                try:
+                    status = (await request).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                if status == 200:
+                    latencies[kind].append(time.perf_counter() - start)
+                else:
+                    errors[f"{kind} {status}"] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(n) for n in range(concurrency)))
+        wall = time.perf_counter() - started
+        # Which worker processes answered (each reports its own pid); new connections, so the
+        # kernel hands them to different workers
+        for _ in range(4 * concurrency):
+            pids.add((await client.get("/health/database", headers={"Connection": "close"})).json()["pid"])
+    return {"wall": wall, "latencies": latencies, "errors": errors, "pids": len(pids)}
+
+
+def _book_slot(start_ts: str, end_ts: str, barrier, results) -> None:
+    from agents.calendar_agent import add_calendar_event
+
+    barrier.wait()
+    results.put(add_calendar_event("Worker booking", start_ts, end_ts, "bench"))
+
+
+def check_writes(database_path: str, writers: int) -> Dict[str, int]:
+    """Processes race to book one free slot; returns how many booked, saw the conflict, or errored"""
+    context = multiprocessing.get_context("spawn")
+    barrier, results = context.Barrier(writers), context.Queue()
+    slot = time.strftime("%Y-%m-%d", time.gmtime(time.time() + 400 * 86400))
+    args = (f"{slot}T03:00:00Z", f"{slot}T03:30:00Z", barrier, results)
+    processes = [context.Process(target=_book_slot, args=args) for _ in range(writers)]
+    # Children inherit the environment at start, before anything in them reads DATABASE_PATH
+    os.environ["DATABASE_PATH"] = database_path
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=120) for _ in processes]
+    for process in processes:
+        process.join()
+    return {
+        "booked": sum("added successfully" in outcome for outcome in outcomes),
+        "conflicts": sum("was not added" in outcome for outcome in outcomes),
+        "errors": sum(outcome.startswith("Error") for outcome in outcomes),
+    }
+
+
+def percentile(samples: List[float], p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))] if samples else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--emails", type=int, default=20000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--read-ratio", type=float, default=0.7, help="share of requests that read session history")
+    parser.add_argument("--latency", type=float, default=0.0, help="stub model seconds before the first token")
+    parser.add_argument("--writers", type=int, default=8, help="processes in the write check (0 to skip)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    stub_port = free_port()
+    stub = start_server(stub_port, "--latency", str(args.latency))
+    workdir = tempfile.mkdtemp()
+    try:
+        template = os.path.join(workdir, "template.db")
+        generate(template, emails=args.emails, events=args.events, sessions_count=args.sessions, seed=SEED)
+        subprocess.run([sys.executable, "-m", "agents.email_index"], cwd=BACKEND, env=environment(template, stub_port),
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        print(f"{os.cpu_count()} CPU(s), {args.concurrency} clients, {args.read_ratio:.0%} history reads, {args.duration:.0f}s per run")
+        print(f"{'workers':>7}{'served by':>10}{'req/s':>9}{'history p50':>13}{'chat p50':>10}{'chat p95':>10}{'errors':>8}{'scaling':>9}")
+        baseline: Optional[float] = None
+        for workers in (int(n) for n in args.workers.split(",")):
+            database_path = os.path.join(workdir, f"workers{workers}.db")
+            shutil.copy(template, database_path)
+            shutil.copytree(f"{template}.email_index", f"{database_path}.email_index")
+            process, port = start_app(workers, database_path, stub_port, args.timeout)
+            try:
+                result = asyncio.run(drive(port, args.sessions, args.concurrency, args.duration, args.read_ratio))
+            finally:
+                process.terminate()
+                process.wait()
+            latencies = result["latencies"]
+            throughput = sum(len(samples) for samples in latencies.values()) / result["wall"]
+            baseline = baseline or throughput / workers
+            print(
+                f"{workers:>7}{result['pids']:>10}{throughput:>9.1f}"
+                f"{statistics.median(latencies['history'] or [0]) * 1000:>11.1f}ms"
+                f"{statistics.median(latencies['chat'] or [0]) * 1000:>8.0f}ms{percentile(latencies['chat'], 0.95) * 1000:>8.0f}ms"
+                f"{sum(result['errors'].values()):>8}{throughput / (workers * baseline):>9.2f}"
+            )
+            if result["errors"]:
+                print(f"{'':>7}errors: {dict(result['errors'])}")
+
+        if args.writers:
+            outcome = check_writes(os.path.join(workdir, "template.db"), args.writers)
+            verdict = "ok" if outcome["booked"] == 1 and not outcome["errors"] else "FAILED"
+            print(f"\n{args.writers} processes booking the same slot: {outcome} -> {verdict}")
+    finally:
+        stub.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+Synthetic mailbox, calendar and chat history at a configurable scale (1k to 10M rows).
+
+    python -m benchmarks.datagen --db /tmp/load.db --emails 1000000 --events 200000 --sessions 1000
+
+Emails come in topic threads (replies reuse the subject with "Re:") from a few hundred people whose
+activity is Zipf-distributed, sent during working hours. Events are meetings and recurring standups
+with 1-8 attendees drawn from the same people. Chat sessions are stored the way the team stores them
+(agno_sessions), with user questions, tool calls with realistic results, and answers.
+
+Output is deterministic for a given --seed and --base-date. Rows carry a generated Message-ID / UID, so re-running
+with bigger sizes only adds the missing rows. Writes go through the normal triggers, so emails_fts
+and calendar_attendees are populated; the email vector index is built by the API on startup
+(or `python -m agents.email_index`).
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from database.migrations import apply_migrations  # noqa: E402
+
+FIRST_NAMES = (
+    "Dana Chris Alex Sam Jordan Taylor Morgan Casey Riley Jamie Avery Quinn Priya Wei Mateo Sofia Liam "
+    "Noah Emma Olivia Ava Mia Lucas Ethan Aisha Omar Hana Kenji Lena Marco Nina Ravi Sara Tom Uma Vik Zoe"
+).split()
+LAST_NAMES = (
+    "Smith Chen Garcia Patel Kim Nguyen Müller Rossi Silva Khan Cohen Novak Larsen Okafor Tanaka Dubois "
+    "Johansson Kowalski Haddad Moreau Fischer Ivanova Costa Brown Lee Walker Young Hill Green Adams"
+).split()
+DOMAINS = "acme.com globex.io initech.net umbrella.co hooli.com example.com client.com".split()
+PROJECTS = "Atlas Borealis Cobalt Drift Ember Falcon Granite Helix Ion Juniper Keystone Lumen".split()
+
+# topic -> (subject templates, body sentences, meeting titles); {p} person, {proj} project,
+# {n} number, {day} weekday, {amt} amount
+TOPICS: Dict[str, Tuple[List[str], List[str], List[str]]] = {
+    "budget": (
+        ["Q{n} budget review", "{proj} budget update", "Budget approval needed for {proj}"],
+        ["The {proj} budget is currently {amt} over plan.", "Can you approve the revised forecast by {day}?",
+         "Finance wants the cost breakdown before the quarterly review.", "We cut travel spend to stay within budget."],
+        ["Budget review", "Quarterly forecast sync"],
+    ),
+    "hiring": (
+        ["Interview feedback for {p}", "Offer for the {proj} engineer role", "Hiring plan Q{n}"],
+        ["{p} did well in the system design interview.", "Please submit your scorecard by {day}.",
+         "We are extending an offer for the senior role.", "The hiring committee meets {day} afternoon."],
+        ["Interview: {p}", "Hiring committee"],
+    ),
+    "launch": (
+        ["{proj} launch checklist", "Launch date for {proj}", "Release notes v{n}.0"],
+        ["The {proj} launch is scheduled for {day}.", "QA signed off on release {n}.0.",
+         "Marketing needs the final screenshots by {day}.", "Rollout will start with {n}% of users."],
+        ["{proj} launch readiness", "Release go/no-go"],
+    ),
+    "outage": (
+        ["Incident report: {proj} outage", "Postmortem for the {day} outage", "Database latency spike"],
+        ["The outage lasted {n} minutes and affected checkout.", "Root cause was a failed database migration.",
+         "On-call paged {p} at 3am.", "Action items are tracked in the incident doc."],
+        ["Incident postmortem", "Reliability review"],
+    ),
+    "travel": (
+        ["Travel itinerary for {day}", "Flight and hotel for the offsite", "Expense report for the trip"],
+        ["Your flight departs {day} at {n}:30.", "The hotel is booked near the client office.",
+         "Please submit receipts within two weeks.", "The offsite agenda is attached."],
+        ["Offsite planning", "Travel sync"],
+    ),
+    "contract": (
+        ["Contract renewal for {proj}", "Redlines on the MSA", "Signed agreement"],
+        ["Legal reviewed the redlines and has {n} comments.", "The renewal is due by {day}.",
+         "The client asked for net {n} payment terms.", "Please countersign the agreement."],
+        ["Contract review", "Client negotiation"],
+    ),
+    "design": (
+        ["Design review: {proj}", "Feedback on the new dashboard", "Mockups v{n}"],
+        ["The new mockups simplify onboarding.", "{p} suggested a darker color palette.",
+         "Usability tests showed {n} issues in the signup flow.", "Can we review the prototype {day}?"],
+        ["Design critique", "{proj} design review"],
+    ),
+    "customer": (
+        ["Customer feedback from {proj} pilot", "Escalation from a key account", "NPS results Q{n}"],
+        ["The customer reported slow exports.", "NPS went up {n} points this quarter.",
+         "{p} will follow up with the account team.", "They want a roadmap call {day}."],
+        ["Customer call", "Account review"],
+    ),
+    "security": (
+        ["Security review for {proj}", "Phishing attempt reported", "Password rotation reminder"],
+        ["Please rotate your credentials before {day}.", "The pen test found {n} medium issues.",
+         "Do not click links in the suspicious email.", "SSO enforcement starts next month."],
+        ["Security review", "Threat model session"],
+    ),
+    "report": (
+        ["Weekly report", "Q{n} metrics summary", "{proj} status update"],
+        ["Revenue grew {n}% week over week.", "{proj} is on track for the milestone.",
+         "Churn is down slightly.", "The full report is in the shared drive."],
+        ["Weekly status", "Metrics review"],
+    ),
+}
+TOPIC_NAMES = list(TOPICS)
+WEEKDAYS = "Monday Tuesday Wednesday Thursday Friday".split()
+GREETINGS = ["Hi {first},", "Hello {first},", "Hey {first},", "Dear {first},", "{first},"]
+SIGNOFFS = ["Thanks,", "Best,", "Cheers,", "Regards,", "Thanks a lot,"]
+QUESTIONS = [
+    ("Show me emails about {topic}", "search_emails", "keyword"),
+    ("Any emails from {first}?", "get_emails_by_sender", "sender_name"),
+    ("What meetings do I have with {first}?", "get_events_by_attendee", "attendee_name"),
+    ("What's on my calendar this week?", "get_upcoming_events", None),
+    ("Summarize my latest emails", "get_recent_emails", None),
+    ("Draft a reply about the {topic} thread", None, None),
+]
+
+_BATCH = 10_000
+
+
+def today() -> datetime:
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class People:
+    """A fixed cast of senders/attendees; a few are very active, most rarely write (Zipf)"""
+
+    def __init__(self, rng: random.Random, count: int):
+        self.people = []
+        for i in range(count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            address = f"{first.lower()}.{last.lower().replace('ü', 'u')}{i % 97}@{rng.choice(DOMAINS)}"
+            self.people.append((first, f"{first} {last}", address))
+        self.cum_weights = list(itertools.accumulate(1 / (rank + 1) ** 0.9 for rank in range(count)))
+
+    def pick(self, rng: random.Random, k: int = 1):
+        return rng.choices(self.people, cum_weights=self.cum_weights, k=k)
+
+    def distinct(self, rng: random.Random, k: int):
+        return list(dict.fromkeys(self.pick(rng, k * 2)))[:k]
+
+
+def _fill(template: str, rng: random.Random, people: People) -> str:
+    return template.format(
+        p=people.pick(rng)[0][1], proj=rng.choice(PROJECTS), n=rng.randint(1, 9),
+        day=rng.choice(WEEKDAYS), amt=f"${rng.randint(5, 250)}k",
+    )
+
+
+def _working_time(rng: random.Random, day: datetime) -> datetime:
+    # Weekday, 8:00-18:00 UTC
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day.replace(hour=rng.randint(8, 17), minute=rng.randrange(0, 60, 5), second=0)
+
+
+def _rng(seed: int, kind: str, batch: int) -> random.Random:
+    # One generator per batch, so a resumed run produces the same rows as a full one
+    return random.Random(f"{seed}:{kind}:{batch}")
+
+
+def email_rows(seed: int, base: datetime, people: People, start: int, count: int, total: int):
+    rng = _rng(seed, "emails", start // _BATCH)
+    # Spread `total` emails over the two years before `base`
+    span = timedelta(days=730) / max(total, 1)
+    threads: List[Tuple[str, str]] = []
+    for i in range(start, start + count):
+        topic = rng.choice(TOPIC_NAMES)
+        subjects, sentences, _ = TOPICS[topic]
+        if threads and rng.random() < 0.35:
+            subject, topic = rng.choice(threads)
+            subject = subject if subject.startswith("Re: ") else f"Re: {subject}"
+            sentences = TOPICS[topic][1]
+        else:
+            subject = _fill(rng.choice(subjects), rng, people)
+            threads = (threads + [(subject, topic)])[-50:]
+        (_, sender_name, sender_address), (recipient, _, _) = people.pick(rng, 2)
+        body = "\n\n".join([
+            rng.choice(GREETINGS).format(first=recipient),
+            " ".join(_fill(s, rng, people) for s in rng.sample(sentences, rng.randint(2, len(sentences)))),
+            f"{rng.choice(SIGNOFFS)}\n{sender_name.split()[0]}",
+        ])
+        received = _working_time(rng, base - span * (total - i))
+        yield ("datagen", f"<{i}.{seed}@datagen>", f"{sender_name} <{sender_address}>", _iso(received), subject, body)
+
+
+def event_rows(seed: int, base: datetime, people: People, start: int, count: int, total: int):
+    rng = _rng(seed, "events", start // _BATCH)
+    # From a year before `base` to three months after it
+    span = timedelta(days=455) / max(total, 1)
+    for i in range(start, start + count):
+        day = base - timedelta(days=365) + span * i
+        if rng.random() < 0.2:
+            title, minutes, size = "Daily standup", 15, rng.randint(3, 8)
+            begin = day.replace(hour=9, minute=30, second=0)
+        else:
+            topic = rng.choice(TOPIC_NAMES)
+            title = _fill(rng.choice(TOPICS[topic][2]), rng, people)
+            minutes, size = rng.choice((30, 30, 45, 60, 60, 90)), rng.randint(1, 6)
+            begin = _working_time(rng, day)
+        attendees = ", ".join(
+            name if rng.random() < 0.5 else f"{name} <{address}>" for _, name, address in people.distinct(rng, size)
+        )
+        yield (f"{i}.{seed}@datagen", title, _iso(begin), _iso(begin + timedelta(minutes=minutes)), attendees)
+
+
+def _fill_table(conn, label: str, sql: str, rows_fn, seed: int, base: datetime, people: People, total: int, existing: int) -> None:
+    started = time.perf_counter()
+    # Start at the batch holding the first missing row; rows already there are skipped by their id
+    for offset in range(existing - existing % _BATCH, total, _BATCH):
+        with conn:
+            conn.executemany(sql, rows_fn(seed, base, people, offset, min(_BATCH, total - offset), total))
+    print(f"{label}: {total - existing} generated in {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def sessions(database_path: str, seed: int, base: datetime, people: People, count: int, runs: int) -> None:
+    """Chat sessions of `runs` turns each, stored through agno like the team stores them"""
+    from agno.models.message import Message
+    from agno.run.base import RunStatus
+    from agno.run.team import TeamRunOutput
+    from agno.session.team import TeamSession
+    from agno.utils.string import generate_id_from_name
+    from agno.db.sqlite import SqliteDb
+
+    from agents.rag_team import RAGTeam
+    from benchmarks.stub_model import StubModel
+    from database import get_engine
+
+    team = RAGTeam("stub", model=StubModel())
+    team_id = team.id or generate_id_from_name(team.name)
+    db = SqliteDb(db_engine=get_engine(database_path))
+    conn = sqlite3.connect(database_path)
+    try:
+        existing = {row[0] for row in conn.execute("SELECT session_id FROM agno_sessions WHERE session_id LIKE 'datagen-%'")}
+    except sqlite3.OperationalError:
+        existing = set()  # agno creates its tables on first write
+    finally:
+        conn.close()
+    started = time.perf_counter()
+    created = 0
+    batch: List[TeamSession] = []
+    for s in range(count):
+        session_id = f"datagen-{seed}-{s}"
+        if session_id in existing:
+            continue
+        rng = _rng(seed, "sessions", s)
+        begin = int((base - timedelta(days=rng.randint(0, 90))).timestamp())
+        session_runs = []
+        for r in range(runs):
+            (first, _, _), = people.pick(rng)
+            topic = rng.choice(TOPIC_NAMES)
+            question, tool, argument = rng.choice(QUESTIONS)
+            question = question.format(first=first, topic=topic)
+            messages = [Message(role="user", content=question, created_at=begin + r * 60)]
+            if tool:
+                call_id = f"call_{s}_{r}"
+                value = {"keyword": topic, "sender_name": first, "attendee_name": first}.get(argument)
+                arguments = f'{{"{argument}": "{value}"}}' if argument else "{}"
+                result = "\n".join(
+                    f"{rng.randint(1, 10**6)} | {_iso(base - timedelta(hours=h))} | {name} | "
+                    f"{topic.capitalize()} follow-up | {rng.choice(TOPICS[topic][1]).format(p=name, proj='Atlas', n=3, day='Friday', amt='$40k')}"
+                    for h, (_, name, _) in enumerate(people.pick(rng, rng.randint(3, 10)))
+                )
+                messages += [
+                    Message(role="assistant", tool_calls=[{"id": call_id, "type": "function",
+                                                           "function": {"name": tool, "arguments": arguments}}]),
+                    Message(role="tool", tool_call_id=call_id, tool_name=tool, content=result),
+                ]
+            answer = f"Here is what I found about {topic}: " + " ".join(
+                _fill(sentence, rng, people) for sentence in rng.sample(TOPICS[topic][1], 2)
+            )
+            messages.append(Message(role="assistant", content=answer, created_at=begin + r * 60 + 5))
+            session_runs.append(TeamRunOutput(
+                run_id=f"{session_id}-{r}", team_id=team_id, team_name=team.name, session_id=session_id,
+                content=answer, messages=messages, status=RunStatus.completed, created_at=begin + r * 60,
+            ))
+        batch.append(TeamSession(
+            session_id=session_id, team_id=team_id, runs=session_runs,
+            created_at=begin, updated_at=begin + runs * 60,
+        ))
+        if len(batch) >= 100:
+            db.upsert_sessions(batch, preserve_updated_at=True)
+            created += len(batch)
+            batch = []
+    if batch:
+        db.upsert_sessions(batch, preserve_updated_at=True)
+        created += len(batch)
+    print(f"sessions: {created} generated ({runs} runs each) in {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def generate(database_path: str, emails: int = 0, events: int = 0, sessions_count: int = 0,
+             runs: int = 20, seed: int = 42, base: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Brings the database up to the requested sizes and returns the sizes it has afterwards.
+    Emails end and events are centred around `base` (default: today), so "upcoming" tools find events.
+    """
+    base = base or today()
+    apply_migrations(database_path)
+    conn = sqlite3.connect(database_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # A bigger cast for bigger mailboxes, so per-person result sizes stay realistic
+    people = People(random.Random(seed), max(50, min(5000, max(emails, events) // 2000)))
+    try:
+        if emails:
+            existing = conn.execute("SELECT COUNT(*) FROM emails WHERE origin = 'datagen'").fetchone()[0]
+            if existing < emails:
+                _fill_table(conn, "emails", """
+                    INSERT INTO emails(origin, message_id, sender, received_at, subject, content)
+                    VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(message_id) DO NOTHING
+                """, email_rows, seed, base, people, emails, existing)
+        if events:
+            existing = conn.execute("SELECT COUNT(*) FROM calendar WHERE uid LIKE '%@datagen'").fetchone()[0]
+            if existing < events:
+                _fill_table(conn, "events", """
+                    INSERT INTO calendar(uid, title, start_ts, end_ts, attendees)
+                    VALUES (?, ?, ?, ?, ?) ON CONFLICT(uid) DO NOTHING
+                """, event_rows, seed, base, people, events, existing)
+        sizes = {
+            "emails": conn.execute("SELECT COUNT(*) FROM emails").fetchone()[0],
+            "events": conn.execute("SELECT COUNT(*) FROM calendar").fetchone()[0],
+        }
+    finally:
+        conn.close()
+    if sessions_count:
+        sessions(database_path, seed, base, people, sessions_count, runs)
+    sizes["sessions"] = sessions_count
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("DATABASE_PATH", os.path.join(tempfile.gettempdir(), "datagen.db")))
+    parser.add_argument("--emails", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20, help="turns per chat session")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-date", type=lambda d: datetime.fromisoformat(d).replace(tzinfo=timezone.utc),
+                        help="date the mailbox ends and the calendar is centred on (default: today)")
+    args = parser.parse_args()
+    print(generate(args.db, args.emails, args.events, args.sessions, args.runs, args.seed, args.base_date))
+
+
+if __name__ == "__main__":
+    main()
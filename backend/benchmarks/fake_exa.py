@@ -0,0 +1,59 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class FakeResult:
+    url: str
+    title: str
+    text: str
+    author: Optional[str] = None
+    published_date: Optional[str] = None
+    highlights: List[str] = field(default_factory=list)
+
+
+@dataclass
+class FakeResponse:
+    results: List[FakeResult]
+
+
+class FakeExa:
+    """
+    Offline stand-in for the exa_py client used by ExaTools (`tools.exa = FakeExa()`).
+    Returns deterministic results per query/URL after sleeping `latency` seconds,
+    and counts the calls that would have gone to the Exa API.
+    """
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self) -> None:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail:
+            raise ConnectionError("fake Exa is down")
+
+    def search_and_contents(self, query: str, num_results: int = 5, **kwargs) -> FakeResponse:
+        self._call()
+        slug = hashlib.md5(query.encode()).hexdigest()[:8]
+        return FakeResponse([
+            FakeResult(
+                url=f"https://example.com/{slug}/{i}",
+                title=f"Result {i} for {query}",
+                text=f"Text about {query}. " * 20,
+                highlights=[f"{query} highlight {i}"],
+            )
+            for i in range(num_results)
+        ])
+
+    def get_contents(self, urls: List[str], **kwargs) -> FakeResponse:
+        self._call()
+        return FakeResponse([FakeResult(url=url, title=f"Page {url}", text=f"Contents of {url}. " * 40) for url in urls])
@@ -0,0 +1,395 @@
+"""
+End-to-end load test of the API and the agent tools on a generated dataset, with offline stubs
+for OpenAI (StubModel) and Exa (FakeExa).
+
+    python -m benchmarks.loadtest --emails 100000 --events 20000 --sessions 200
+    python -m benchmarks.loadtest --compare benchmarks/results/loadtest-<commit>.json
+    python -m benchmarks.loadtest --diff before.json after.json
+
+The dataset is generated once per --db by benchmarks.datagen and reused. Endpoints are driven
+in-process over ASGI with --concurrency requests in flight; tool functions are called directly.
+For every endpoint and tool the results have throughput, p50/p95/p99 latency, the peak Python
+allocation of a call (tracemalloc, measured separately so it doesn't slow the timed calls) and
+the process RSS growth. Results are written as JSON (--out, default
+benchmarks/results/loadtest-<commit>.json); --compare/--diff flag metrics that got worse by
+more than --threshold percent, and --fail-on-regression turns that into a non-zero exit.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+RESULTS_DIR = Path(__file__).parent / "results"
+# Metric -> True when higher is better
+COMPARED_METRICS = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False, "peak_alloc_kb": False}
+
+
+def percentile(sorted_samples: List[float], p: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_samples:
+        return 0.0
+    return sorted_samples[min(len(sorted_samples) - 1, max(math.ceil(p / 100 * len(sorted_samples)) - 1, 0))]
+
+
+def rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def summarize(samples: List[float], errors: int, wall: float, peak_alloc: int, rss_delta: int, **extra) -> Dict[str, Any]:
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(samples[-1], 3) if samples else 0.0,
+        "peak_alloc_kb": peak_alloc // 1024,
+        "rss_delta_kb": rss_delta,
+        **extra,
+    }
+
+
+def git_commit() -> Dict[str, Any]:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True, cwd=Path(__file__).parent).stdout.strip()
+
+    return {"commit": git("rev-parse", "--short", "HEAD") or "unknown", "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+# ---------- tools ----------
+
+def tool_calls(rng: random.Random, max_email_id: int) -> Dict[str, Callable[[], Any]]:
+    from agents.calendar_agent import (
+        find_conflicts, get_all_events, get_events_by_attendee, get_free_busy, get_next_events, get_upcoming_events,
+    )
+    from agents.email_agent import (
+        get_email_body, get_emails_by_sender, get_recent_emails, search_emails, semantic_search_emails,
+    )
+    from benchmarks.datagen import FIRST_NAMES, TOPIC_NAMES, TOPICS
+
+    def window():
+        start = datetime.now(timezone.utc) + timedelta(days=rng.randint(-30, 30), hours=rng.randint(8, 16))
+        return start.strftime("%Y-%m-%dT%H:%M:%SZ"), (start + timedelta(hours=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def day():
+        start = (datetime.now(timezone.utc) + timedelta(days=rng.randint(0, 14))).replace(hour=8, minute=0, second=0)
+        return start.strftime("%Y-%m-%dT%H:%M:%SZ"), (start + timedelta(hours=10)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    return {
+        "get_recent_emails": lambda: get_recent_emails(limit=10),
+        "search_emails": lambda: search_emails(rng.choice(TOPIC_NAMES)),
+        "semantic_search_emails": lambda: semantic_search_emails(rng.choice(TOPICS[rng.choice(TOPIC_NAMES)][1])),
+        "get_emails_by_sender": lambda: get_emails_by_sender(rng.choice(FIRST_NAMES)),
+        "get_email_body": lambda: get_email_body(rng.randint(1, max_email_id)),
+        "get_upcoming_events": lambda: get_upcoming_events(days=7),
+        "get_next_events": lambda: get_next_events(5),
+        "get_events_by_attendee": lambda: get_events_by_attendee(rng.choice(FIRST_NAMES)),
+        "find_conflicts": lambda: find_conflicts(*window()),
+        "get_free_busy": lambda: get_free_busy(*day()),
+        "get_all_events": lambda: get_all_events(limit=20),
+    }
+
+
+def run_tools(calls: Dict[str, Callable[[], Any]], count: int, memory_samples: int) -> Dict[str, Dict]:
+    results = {}
+    for name, call in calls.items():
+        call()  # warm caches and prepared statements
+        rss_before = rss_kb()
+        samples, errors = [], 0
+        started = time.perf_counter()
+        for _ in range(count):
+            t0 = time.perf_counter()
+            output = call()
+            samples.append((time.perf_counter() - t0) * 1000)
+            errors += isinstance(output, str) and output.startswith("Error")
+        wall = time.perf_counter() - started
+        rss_delta = rss_kb() - rss_before
+
+        tracemalloc.start()
+        peak = 0
+        for _ in range(memory_samples):
+            tracemalloc.reset_peak()
+            call()
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        results[name] = summarize(samples, errors, wall, peak, rss_delta)
+        print(f"  {name:<28}{results[name]['p50_ms']:>9.2f}{results[name]['p95_ms']:>9.2f}{results[name]['p99_ms']:>9.2f} ms"
+              f"{results[name]['throughput_rps']:>10.0f}/s", flush=True)
+    return results
+
+
+# ---------- endpoints ----------
+
+async def drive(send: Callable[[int], Awaitable[Any]], count: int, concurrency: int, memory_samples: int) -> Dict:
+    await send(-1)  # warm up
+    queue = asyncio.Queue()
+    for i in range(count):
+        queue.put_nowait(i)
+    samples: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            t0 = time.perf_counter()
+            try:
+                await send(i)
+            except Exception:
+                errors += 1
+                continue
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    rss_before = rss_kb()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    rss_delta = rss_kb() - rss_before
+
+    tracemalloc.start()
+    peak = 0
+    for i in range(memory_samples):
+        tracemalloc.reset_peak()
+        try:
+            await send(count + i)
+        except Exception:
+            pass
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return summarize(samples, errors, wall, peak, rss_delta)
+
+
+async def run_endpoints(args, session_ids: List[str]) -> Dict[str, Dict]:
+    import httpx
+    from fastapi import FastAPI
+
+    from agents.metrics import MetricsMiddleware
+    from agents.tracing import TracingMiddleware
+    from benchmarks.datagen import QUESTIONS, FIRST_NAMES, TOPIC_NAMES
+    from routers import chat_router, health_router
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(chat_router)
+    app.include_router(health_router)
+    rng = random.Random(args.seed)
+    prompts = [q.format(first=rng.choice(FIRST_NAMES), topic=rng.choice(TOPIC_NAMES)) for q, _, _ in QUESTIONS * 20]
+    prompts += ["Plan my week around the launch and tell me what to prioritize"] * 20
+    search_queries = [f"{rng.choice(TOPIC_NAMES)} news {i}" for i in range(50)]
+    routes: Dict[str, int] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        async def ok(response):
+            response.raise_for_status()
+            return response
+
+        async def health(i):
+            await ok(await client.get("/health/executor"))
+
+        async def chat(i):
+            response = await ok(await client.post("/api/chat", json={
+                "message": rng.choice(prompts), "session_id": f"loadtest-{uuid.uuid4().hex}",
+            }))
+            target = (response.json().get("route") or {}).get("target", "team")
+            routes[target] = routes.get(target, 0) + 1
+
+        async def chat_stream(i):
+            payload = {"message": "Plan my week around the launch", "session_id": f"loadtest-{uuid.uuid4().hex}"}
+            async with client.stream("POST", "/api/chat/stream", json=payload) as response:
+                response.raise_for_status()
+                async for _ in response.aiter_bytes():
+                    pass
+
+        async def search(i):
+            await ok(await client.post("/api/search", json={"query": rng.choice(search_queries)}))
+
+        async def history(i):
+            await ok(await client.get(f"/api/sessions/{rng.choice(session_ids)}/messages", params={"limit": 50}))
+
+        scenarios = {
+            "GET /health/executor": health,
+            "POST /api/chat": chat,
+            "POST /api/chat/stream": chat_stream,
+            "POST /api/search": search,
+        }
+        if session_ids:
+            scenarios["GET /api/sessions/{id}/messages"] = history
+
+        results = {}
+        for name, send in scenarios.items():
+            routes.clear()
+            results[name] = await drive(send, args.requests, args.concurrency, args.memory_samples)
+            if name == "POST /api/chat":
+                results[name]["routes"] = dict(routes)
+            r = results[name]
+            print(f"  {name:<34}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f} ms{r['throughput_rps']:>10.0f}/s"
+                  f"{'  errors ' + str(r['errors']) if r['errors'] else ''}", flush=True)
+    return results
+
+
+def install_stubs(llm_latency: float, exa_latency: float) -> None:
+    from agents import team_pool
+    from agents.models import DEFAULT_CHAT_MODEL
+    from agents.exa_search import SEARCH_TYPES, search_tools
+    from agents.rag_team import RAGTeam
+    from benchmarks.fake_exa import FakeExa
+    from benchmarks.stub_model import StubModel
+
+    fake_exa = FakeExa(exa_latency)
+    for search_type in SEARCH_TYPES:
+        for include_content in (False, True):
+            search_tools(search_type, include_content).exa = fake_exa
+
+    def stub_team(name: str) -> RAGTeam:
+        team = RAGTeam(name, model=StubModel(id=name, latency=llm_latency, reply="Here is a summary of what I found."))
+        for member in team.members:
+            member.model = StubModel(id=f"{name}-member", latency=llm_latency, reply="Here you go.")
+            for toolkit in member.tools or []:
+                if hasattr(toolkit, "exa"):
+                    toolkit.exa = fake_exa
+        return team
+
+    team_pool.factory = stub_team
+    team_pool.warm_up([DEFAULT_CHAT_MODEL])
+
+
+# ---------- comparison ----------
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Prints metric changes per endpoint/tool and returns the regressions beyond threshold percent"""
+    regressions = []
+    print(f"\ncompared with {baseline['meta']['commit']} ({baseline['meta']['timestamp']}):")
+    for section in ("endpoints", "tools"):
+        for name, now in current.get(section, {}).items():
+            before = baseline.get(section, {}).get(name)
+            if not before:
+                continue
+            changes = []
+            for metric, higher_is_better in COMPARED_METRICS.items():
+                old, new = before.get(metric), now.get(metric)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old * 100
+                worse = -change if higher_is_better else change
+                flag = ""
+                if worse > threshold:
+                    flag = "!"
+                    regressions.append(f"{section}/{name} {metric}: {old} -> {new} ({change:+.0f}%)")
+                changes.append(f"{metric} {change:+.0f}%{flag}")
+            print(f"  {name:<34}{'  '.join(changes)}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {threshold:.0f}%:")
+        for line in regressions:
+            print(f"  {line}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="dataset database (default: a temp file per dataset size, reused)")
+    parser.add_argument("--emails", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=20, help="turns per generated chat session")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--tool-calls", type=int, default=200, help="calls per tool function")
+    parser.add_argument("--memory-samples", type=int, default=5, help="calls per endpoint/tool traced for memory")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per stub model completion")
+    parser.add_argument("--exa-latency", type=float, default=0.0, help="seconds per fake Exa call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="results JSON (default: benchmarks/results/loadtest-<commit>.json)")
+    parser.add_argument("--compare", help="baseline results JSON to compare this run with")
+    parser.add_argument("--diff", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two results files and exit")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    if args.diff:
+        baseline, current = (json.loads(Path(p).read_text()) for p in args.diff)
+        sys.exit(1 if compare(baseline, current, args.threshold) and args.fail_on_regression else 0)
+
+    # The app reads its settings at import time, so point it at the dataset first
+    db = args.db or os.path.join(tempfile.gettempdir(), f"loadtest-{args.emails}-{args.events}-{args.sessions}x{args.runs}.db")
+    os.environ["DATABASE_PATH"] = db
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ.setdefault("EXA_API_KEY", "stub")
+    os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+    from benchmarks.datagen import generate
+
+    print(f"dataset {db}", flush=True)
+    sizes = generate(db, args.emails, args.events, args.sessions, args.runs, args.seed)
+
+    from agents.email_index import email_index
+    from database import get_connection
+
+    started = time.perf_counter()
+    email_index.sync()
+    index_seconds = time.perf_counter() - started
+    install_stubs(args.llm_latency, args.exa_latency)
+
+    conn = get_connection()
+    max_email_id = conn.execute("SELECT MAX(id) FROM emails").fetchone()[0] or 1
+    session_ids = [row[0] for row in conn.execute(
+        "SELECT session_id FROM agno_sessions WHERE session_id LIKE 'datagen-%' LIMIT 1000"
+    )] if args.sessions else []
+
+    print(f"{'endpoint':<36}{'p50':>9}{'p95':>9}{'p99':>9}{'throughput':>13}")
+    endpoints = asyncio.run(run_endpoints(args, session_ids))
+    print(f"{'tool':<30}{'p50':>9}{'p95':>9}{'p99':>9}{'throughput':>13}")
+    tools = run_tools(tool_calls(random.Random(args.seed), max_email_id), args.tool_calls, args.memory_samples)
+
+    results = {
+        "meta": {
+            **git_commit(),
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "dataset": {**sizes, "runs_per_session": args.runs, "db": db},
+            "email_index_sync_s": round(index_seconds, 2),
+            "rss_mb": rss_kb() // 1024,
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "diff", "out")},
+        },
+        "endpoints": endpoints,
+        "tools": tools,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"loadtest-{results['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"\nresults written to {out}")
+
+    if args.compare:
+        regressions = compare(json.loads(Path(args.compare).read_text()), results, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
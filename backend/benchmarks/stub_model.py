@@ -0,0 +1,54 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator
+
+from agno.models.base import Model
+from agno.models.response import ModelResponse
+
+
+@dataclass
+class StubModel(Model):
+    """
+    Offline stand-in for OpenAIChat used by the benchmarks.
+    Answers every request with `reply` after sleeping `latency` seconds and never calls tools.
+    When streaming, each word of `reply` is a delta, `token_latency` seconds apart.
+    """
+
+    id: str = "stub"
+    name: str = "StubModel"
+    provider: str = "Stub"
+
+    reply: str = "ok"
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    def invoke(self, *args, **kwargs) -> ModelResponse:
+        if self.latency or self.token_latency:
+            time.sleep(self.latency + self.token_latency * len(self.reply.split(" ")))
+        return self._parse_provider_response(self.reply)
+
+    async def ainvoke(self, *args, **kwargs) -> ModelResponse:
+        if self.latency or self.token_latency:
+            await asyncio.sleep(self.latency + self.token_latency * len(self.reply.split(" ")))
+        return self._parse_provider_response(self.reply)
+
+    def invoke_stream(self, *args, **kwargs) -> Iterator[ModelResponse]:
+        if self.latency:
+            time.sleep(self.latency)
+        for token in self.reply.split(" "):
+            time.sleep(self.token_latency)
+            yield self._parse_provider_response_delta(token + " ")
+
+    async def ainvoke_stream(self, *args, **kwargs) -> AsyncIterator[ModelResponse]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for token in self.reply.split(" "):
+            await asyncio.sleep(self.token_latency)
+            yield self._parse_provider_response_delta(token + " ")
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return ModelResponse(role="assistant", content=response)
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return ModelResponse(content=response)
@@ -0,0 +1,218 @@
+"""
+Local OpenAI-compatible chat completions server for offline, reproducible runs of the whole app
+(MODEL_BACKEND=stub, see agents/models.py).
+
+    python -m benchmarks.stub_openai --port 8100 --latency 0.3 --tokens-per-sec 80 --reply-tokens 60
+    python -m benchmarks.stub_openai --script my_script.json
+
+Serves POST /v1/chat/completions (plain and streaming, with usage), GET /v1/models and GET /stats.
+Each completion waits `latency` seconds before its first token and then emits `tokens-per-sec`
+tokens (words). Replies are deterministic: a script picks tool calls from the last user message,
+so team delegation and member tool use can be exercised without a real model. A script is a JSON
+list of rules, tried in order:
+
+    {"match": "regex on the last user message", "tool": "function name",
+     "arguments": {"query": "{message}"}, "reply": "final answer after the tool result"}
+
+A rule only fires when the request offers its tool. When the last message is a tool result the
+stub answers with the first matching rule's `reply` (or the default reply), so every turn makes
+at most one round of tool calls per model. That round is one call (the first matching rule), or
+one per matching rule with --multi-tool-calls, like a model delegating to several members at once.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+# Leader delegates by topic; members call one of their tools, then answer
+DEFAULT_SCRIPT = [
+    {"match": r"e-?mail|inbox|sent me|wrote", "tool": "delegate_task_to_member", "arguments": {"member_id": "email-agent", "task": "{message}"}},
+    {"match": r"calendar|meeting|schedule|event|week|free|busy", "tool": "delegate_task_to_member", "arguments": {"member_id": "calendar-agent", "task": "{message}"}},
+    {"match": r"search|news|web|research", "tool": "delegate_task_to_member", "arguments": {"member_id": "exa-search-agent", "task": "{message}"}},
+    {"match": r"e-?mail|inbox|sent me|wrote", "tool": "search_emails", "arguments": {"keyword": "launch"}},
+    {"match": r".", "tool": "get_upcoming_events", "arguments": {"days": 7}},
+    {"match": r".", "tool": "search_exa", "arguments": {"query": "{message}"}},
+]
+WORDS = (
+    "the team reviewed the launch plan and the next steps are to confirm the budget, "
+    "share the updated schedule with everyone and follow up on the open questions before friday"
+).split()
+
+
+def reply_text(tokens: int) -> str:
+    return " ".join(itertools.islice(itertools.cycle(WORDS), max(tokens, 1)))
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(json.dumps(m.get("content") or "")) + len(json.dumps(m.get("tool_calls") or "")) for m in messages) // 4
+
+
+class StubBackend:
+    def __init__(self, script: List[Dict[str, Any]], latency: float, tokens_per_sec: float, reply_tokens: int,
+                 multi_tool_calls: bool = False):
+        self.rules = [{**rule, "pattern": re.compile(rule.get("match", "."), re.IGNORECASE)} for rule in script]
+        self.multi_tool_calls = multi_tool_calls
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.reply = reply_text(reply_tokens)
+        self.ids = itertools.count(1)
+        self.stats = {"requests": 0, "streamed": 0, "tool_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def plan(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns {"content": str} or {"tool_calls": [...]} for a chat completions request"""
+        messages = body.get("messages") or []
+        last_user = next((m for m in reversed(messages) if m.get("role") == "user"), {})
+        text = last_user.get("content") or ""
+        if isinstance(text, list):
+            text = " ".join(part.get("text", "") for part in text if isinstance(part, dict))
+        offered = {t.get("function", {}).get("name") for t in body.get("tools") or []}
+        answered = bool(messages) and messages[-1].get("role") == "tool"
+
+        calls = []
+        for rule in self.rules:
+            if not rule["pattern"].search(text):
+                continue
+            if answered:
+                if rule.get("reply"):
+                    return {"content": rule["reply"]}
+                continue
+            if rule.get("tool") in offered:
+                arguments = {k: v.replace("{message}", text) if isinstance(v, str) else v for k, v in (rule.get("arguments") or {}).items()}
+                calls.append({
+                    "id": f"call_{next(self.ids)}",
+                    "type": "function",
+                    "function": {"name": rule["tool"], "arguments": json.dumps(arguments)},
+                })
+                if not self.multi_tool_calls:
+                    break
+        if calls:
+            self.stats["tool_calls"] += len(calls)
+            return {"tool_calls": calls}
+        return {"content": self.reply}
+
+    def usage(self, body: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, int]:
+        prompt = estimate_tokens(body.get("messages") or [])
+        completion = len(plan["content"].split()) if "content" in plan else 20
+        self.stats["prompt_tokens"] += prompt
+        self.stats["completion_tokens"] += completion
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def create_app(backend: StubBackend):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI(title="Stub OpenAI")
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return backend.stats
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        plan = backend.plan(body)
+        usage = backend.usage(body, plan)
+        stats = backend.stats
+        stats["requests"] += 1
+        completion_id = f"chatcmpl-stub-{next(backend.ids)}"
+        base = {"id": completion_id, "created": int(time.time()), "model": body.get("model", "stub")}
+        finish = "tool_calls" if "tool_calls" in plan else "stop"
+        tokens = plan["content"].split(" ") if "content" in plan else []
+        token_delay = 1 / backend.tokens_per_sec if backend.tokens_per_sec else 0.0
+
+        if not body.get("stream"):
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+            try:
+                await asyncio.sleep(backend.latency + token_delay * len(tokens))
+            finally:
+                stats["in_flight"] -= 1
+            message = {"role": "assistant", "content": plan.get("content"), **({"tool_calls": plan["tool_calls"]} if "tool_calls" in plan else {})}
+            return {**base, "object": "chat.completion", "usage": usage,
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish}]}
+
+        stats["streamed"] += 1
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> str:
+            choices = [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else []
+            return f"data: {json.dumps({**base, 'object': 'chat.completion.chunk', 'choices': choices, **extra})}\n\n"
+
+        async def events():
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+            try:
+                await asyncio.sleep(backend.latency)
+                yield chunk({"role": "assistant", "content": ""})
+                if "tool_calls" in plan:
+                    yield chunk({"tool_calls": [{"index": i, **call} for i, call in enumerate(plan["tool_calls"])]})
+                for i, token in enumerate(tokens):
+                    if token_delay:
+                        await asyncio.sleep(token_delay)
+                    yield chunk({"content": token if i == 0 else " " + token})
+                yield chunk({}, finish)
+                if include_usage:
+                    yield chunk(None, usage=usage)
+                yield "data: [DONE]\n\n"
+            finally:
+                stats["in_flight"] -= 1
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def start_server(port: int, *args: str, timeout: float = 20.0) -> subprocess.Popen:
+    """Starts the stub in a child process (so it doesn't share the GIL with what it is serving) and waits until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_openai", "--port", str(port), *args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/v1/models", timeout=1).read()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f"stub server exited with code {process.returncode}")
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"stub server did not start on port {port}")
+
+
+def server_stats(port: int) -> Dict[str, Any]:
+    return json.loads(urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=5).read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0, help="output pacing (0 = instant)")
+    parser.add_argument("--reply-tokens", type=int, default=40, help="words in the default reply")
+    parser.add_argument("--multi-tool-calls", action="store_true", help="one tool call per matching rule instead of the first only")
+    parser.add_argument("--script", help="JSON list of tool-call rules (default: delegate by topic, then one tool per member)")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    script = json.loads(open(args.script).read()) if args.script else DEFAULT_SCRIPT
+    backend = StubBackend(script, args.latency, args.tokens_per_sec, args.reply_tokens, args.multi_tool_calls)
+    uvicorn.run(create_app(backend), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,32 @@
 """Database package."""
 
-from .db import get_database
+import settings  # noqa: F401  (.env before the DATABASE_PATH/DATABASE_URL/SQLITE_* constants)
 
-__all__ = ["get_database"]
+from .db import (
+    DATABASE_BACKEND, DatabaseError, busy_stats, file_lock, get_database, get_connection, get_engine, is_busy,
+    observe_statements, pool_stats, retry_busy, table_versions, transaction,
+)
+from .sessions import clear_history_cache, history_cache_stats, message_tool_data, session_messages, session_version
+from .writer import write_queue
+
+__all__ = [
+    "DATABASE_BACKEND",
+    "DatabaseError",
+    "get_database",
+    "get_connection",
+    "get_engine",
+    "observe_statements",
+    "table_versions",
+    "transaction",
+    "busy_stats",
+    "file_lock",
+    "is_busy",
+    "pool_stats",
+    "retry_busy",
+    "write_queue",
+    "clear_history_cache",
+    "history_cache_stats",
+    "message_tool_data",
+    "session_messages",
+    "session_version",
+]
@@ -0,0 +1,131 @@
+"""
+Plain SQL migrations for the app tables (emails, calendar, ...).
+
+Files in database/migrations/ run once each, in name order, and are recorded in
+`schema_migrations`. PostgreSQL (DATABASE_URL) has its own files in database/migrations/postgres/.
+Applied on app startup, or by hand (--copy-from also copies a SQLite database into PostgreSQL):
+
+    python -m database.migrations [--copy-from agno.db]
+"""
+import argparse
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Optional
+
+from agno.utils.log import log_warning
+
+from .db import DATABASE_BACKEND, DatabaseError, file_lock
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+POSTGRES_MIGRATIONS_DIR = MIGRATIONS_DIR / "postgres"
+# Where the database lived before docker-compose moved it to data/; a new database elsewhere while
+# this file exists usually means the old one was left behind
+LEGACY_DATABASE_PATH = "agno.db"
+
+
+def apply_migrations(database_path: Optional[str] = None) -> List[str]:
+    """Applies pending migrations and returns their names"""
+    if database_path is None and DATABASE_BACKEND == "postgres":
+        return _apply_postgres()
+    if not database_path:
+        # Only for the app's own database, not for imports or benchmarks into other files
+        database_path = os.getenv("DATABASE_PATH", "agno.db")
+        _warn_if_left_behind(database_path)
+    # Workers start together; the first one migrates and the rest find nothing pending
+    with file_lock(f"{database_path}.migrate.lock"):
+        return _apply(database_path)
+
+
+def _warn_if_left_behind(database_path: str) -> None:
+    legacy = Path(LEGACY_DATABASE_PATH)
+    if Path(database_path).exists() or not legacy.is_file() or legacy.resolve() == Path(database_path).resolve():
+        return
+    log_warning(
+        f"Creating an empty database at {database_path}, but {legacy.resolve()} exists. To keep its data, "
+        f"stop the app and move it there along with its -wal/-shm files and .email_index directory."
+    )
+
+
+def _apply(database_path: str) -> List[str]:
+    conn = sqlite3.connect(database_path)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                name       TEXT PRIMARY KEY,
+                applied_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+            )
+        """)
+        applied = {row[0] for row in conn.execute("SELECT name FROM schema_migrations")}
+
+        newly_applied = []
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            if path.name in applied:
+                continue
+            # executescript commits any open transaction first, so wrap the file explicitly
+            conn.executescript(
+                "BEGIN;\n"
+                + path.read_text()
+                + f"\nINSERT INTO schema_migrations(name) VALUES ('{path.name}');\nCOMMIT;"
+            )
+            newly_applied.append(path.name)
+        return newly_applied
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _apply_postgres() -> List[str]:
+    from .postgres import MIGRATE_LOCK_KEY, get_pool
+
+    with get_pool().connection() as conn:
+        # Session-level advisory lock: nodes starting together wait here, and find nothing pending
+        conn.execute("SELECT pg_advisory_lock(%s)", (MIGRATE_LOCK_KEY,))
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    name       TEXT PRIMARY KEY,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+            """)
+            applied = {row[0] for row in conn.execute("SELECT name FROM schema_migrations")}
+
+            newly_applied = []
+            for path in sorted(POSTGRES_MIGRATIONS_DIR.glob("*.sql")):
+                if path.name in applied:
+                    continue
+                with conn.transaction():
+                    conn.execute(path.read_text())
+                    conn.execute("INSERT INTO schema_migrations(name) VALUES (%s)", (path.name,))
+                newly_applied.append(path.name)
+            return newly_applied
+        finally:
+            conn.execute("SELECT pg_advisory_unlock(%s)", (MIGRATE_LOCK_KEY,))
+
+
+def pending_migrations(conn: sqlite3.Connection) -> List[str]:
+    """Names of migration files not yet recorded in schema_migrations"""
+    directory = POSTGRES_MIGRATIONS_DIR if getattr(conn, "dialect", "sqlite") == "postgres" else MIGRATIONS_DIR
+    try:
+        applied = {row[0] for row in conn.execute("SELECT name FROM schema_migrations")}
+    except DatabaseError:
+        applied = set()
+    return [path.name for path in sorted(directory.glob("*.sql")) if path.name not in applied]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending migrations to the configured database")
+    parser.add_argument("--copy-from", metavar="SQLITE_FILE", help="then copy the app tables of this SQLite database (PostgreSQL only)")
+    args = parser.parse_args()
+    applied = apply_migrations()
+    print(f"Applied {len(applied)} migration(s): {', '.join(applied) or 'none pending'}")
+    if args.copy_from:
+        if DATABASE_BACKEND != "postgres":
+            raise SystemExit("--copy-from needs DATABASE_URL to point to PostgreSQL")
+        from .postgres import copy_from_sqlite
+
+        for table, rows in copy_from_sqlite(args.copy_from).items():
+            print(f"{table}: {rows} rows")
@@ -0,0 +1,32 @@
+-- Full-text index over emails (external content table, kept in sync by triggers).
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+  subject,
+  content,
+  sender,
+  content='emails',
+  content_rowid='id',
+  tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS emails_fts_ai AFTER INSERT ON emails BEGIN
+  INSERT INTO emails_fts(rowid, subject, content, sender)
+  VALUES (new.id, new.subject, new.content, new.sender);
+END;
+
+CREATE TRIGGER IF NOT EXISTS emails_fts_ad AFTER DELETE ON emails BEGIN
+  INSERT INTO emails_fts(emails_fts, rowid, subject, content, sender)
+  VALUES ('delete', old.id, old.subject, old.content, old.sender);
+END;
+
+CREATE TRIGGER IF NOT EXISTS emails_fts_au AFTER UPDATE ON emails BEGIN
+  INSERT INTO emails_fts(emails_fts, rowid, subject, content, sender)
+  VALUES ('delete', old.id, old.subject, old.content, old.sender);
+  INSERT INTO emails_fts(rowid, subject, content, sender)
+  VALUES (new.id, new.subject, new.content, new.sender);
+END;
+
+-- Index rows that existed before this migration
+INSERT INTO emails_fts(emails_fts) VALUES ('rebuild');
+
+-- get_recent_emails orders by received_at
+CREATE INDEX IF NOT EXISTS idx_emails_received_at ON emails(received_at);
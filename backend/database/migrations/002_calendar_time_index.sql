@@ -0,0 +1,93 @@
+-- Integer epoch columns + indexes for range/overlap queries, and attendees normalized
+-- into calendar_attendees. Triggers keep both in sync with start_ts/end_ts/attendees,
+-- so writers keep inserting ISO8601 strings and comma-separated attendees as before.
+ALTER TABLE calendar ADD COLUMN start_epoch INTEGER;
+ALTER TABLE calendar ADD COLUMN end_epoch INTEGER;
+
+UPDATE calendar
+SET start_epoch = CAST(strftime('%s', start_ts) AS INTEGER),
+    end_epoch   = CAST(strftime('%s', end_ts) AS INTEGER);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_start_end ON calendar(start_epoch, end_epoch);
+-- Lets overlap queries bound their scan by the longest event: MAX() over this index is O(log n)
+CREATE INDEX IF NOT EXISTS idx_calendar_duration ON calendar(end_epoch - start_epoch);
+
+CREATE TRIGGER IF NOT EXISTS calendar_epoch_ai AFTER INSERT ON calendar BEGIN
+  UPDATE calendar
+  SET start_epoch = CAST(strftime('%s', new.start_ts) AS INTEGER),
+      end_epoch   = CAST(strftime('%s', new.end_ts) AS INTEGER)
+  WHERE id = new.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_epoch_au AFTER UPDATE OF start_ts, end_ts ON calendar BEGIN
+  UPDATE calendar
+  SET start_epoch = CAST(strftime('%s', new.start_ts) AS INTEGER),
+      end_epoch   = CAST(strftime('%s', new.end_ts) AS INTEGER)
+  WHERE id = new.id;
+END;
+
+CREATE TABLE IF NOT EXISTS calendar_attendees (
+  event_id      INTEGER NOT NULL,
+  attendee      TEXT NOT NULL,        -- as written, e.g. 'Alex <alex@client.com>'
+  attendee_key  TEXT NOT NULL,        -- lower-cased, for prefix lookups
+  email         TEXT,                 -- lower-cased address if one is present
+  PRIMARY KEY (event_id, attendee_key)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_calendar_attendees_key ON calendar_attendees(attendee_key, event_id);
+CREATE INDEX IF NOT EXISTS idx_calendar_attendees_email ON calendar_attendees(email, event_id);
+
+-- The comma-separated list is split with json_each (CTEs are not allowed in triggers):
+-- 'Dana, Chris' -> '["Dana"," Chris"]' after escaping backslashes, quotes and line breaks.
+CREATE TRIGGER IF NOT EXISTS calendar_attendees_ai AFTER INSERT ON calendar BEGIN
+  INSERT OR IGNORE INTO calendar_attendees(event_id, attendee, attendee_key, email)
+  SELECT new.id, v, lower(v),
+         CASE
+           WHEN instr(v, '<') > 0 AND instr(v, '>') > instr(v, '<')
+             THEN lower(trim(substr(v, instr(v, '<') + 1, instr(v, '>') - instr(v, '<') - 1)))
+           WHEN instr(v, '@') > 0 THEN lower(v)
+         END
+  FROM (
+    SELECT trim(value) AS v
+    FROM json_each('["' || replace(replace(replace(replace(replace(replace(
+      coalesce(new.attendees, ''), '\', '\\'), '"', '\"'), char(10), ' '), char(13), ' '), char(9), ' '), ',', '","') || '"]')
+  )
+  WHERE v <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_attendees_au AFTER UPDATE OF attendees ON calendar BEGIN
+  DELETE FROM calendar_attendees WHERE event_id = old.id;
+  INSERT OR IGNORE INTO calendar_attendees(event_id, attendee, attendee_key, email)
+  SELECT new.id, v, lower(v),
+         CASE
+           WHEN instr(v, '<') > 0 AND instr(v, '>') > instr(v, '<')
+             THEN lower(trim(substr(v, instr(v, '<') + 1, instr(v, '>') - instr(v, '<') - 1)))
+           WHEN instr(v, '@') > 0 THEN lower(v)
+         END
+  FROM (
+    SELECT trim(value) AS v
+    FROM json_each('["' || replace(replace(replace(replace(replace(replace(
+      coalesce(new.attendees, ''), '\', '\\'), '"', '\"'), char(10), ' '), char(13), ' '), char(9), ' '), ',', '","') || '"]')
+  )
+  WHERE v <> '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_attendees_ad AFTER DELETE ON calendar BEGIN
+  DELETE FROM calendar_attendees WHERE event_id = old.id;
+END;
+
+-- Backfill attendees of existing events
+INSERT OR IGNORE INTO calendar_attendees(event_id, attendee, attendee_key, email)
+SELECT id, v, lower(v),
+       CASE
+         WHEN instr(v, '<') > 0 AND instr(v, '>') > instr(v, '<')
+           THEN lower(trim(substr(v, instr(v, '<') + 1, instr(v, '>') - instr(v, '<') - 1)))
+         WHEN instr(v, '@') > 0 THEN lower(v)
+       END
+FROM (
+  SELECT c.id AS id, trim(j.value) AS v
+  FROM calendar c,
+       json_each('["' || replace(replace(replace(replace(replace(replace(
+         coalesce(c.attendees, ''), '\', '\\'), '"', '\"'), char(10), ' '), char(13), ' '), char(9), ' '), ',', '","') || '"]') j
+)
+WHERE v <> '';
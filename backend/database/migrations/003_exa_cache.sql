@@ -0,0 +1,9 @@
+-- On-disk tier of the Exa response cache (agents/exa_cache.py); survives restarts.
+CREATE TABLE IF NOT EXISTS exa_cache (
+  key         TEXT PRIMARY KEY,       -- '<tool>:<sha256 of normalized params>'
+  tool        TEXT NOT NULL,          -- 'search_exa', 'get_contents'
+  value       TEXT NOT NULL,          -- tool output as returned to the model
+  created_at  REAL NOT NULL           -- unix seconds when fetched from Exa
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_exa_cache_created_at ON exa_cache(created_at);
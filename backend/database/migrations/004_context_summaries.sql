@@ -0,0 +1,9 @@
+-- Rolling summaries of older chat history (agents/context_budget.py), one per session and team/agent.
+CREATE TABLE IF NOT EXISTS context_summaries (
+  session_id          TEXT NOT NULL,
+  scope               TEXT NOT NULL,  -- id of the team or agent whose history is summarized
+  through_message_id  TEXT NOT NULL,  -- last history message folded into the summary
+  summary             TEXT NOT NULL,
+  updated_at          REAL NOT NULL,  -- unix seconds
+  PRIMARY KEY (session_id, scope)
+) WITHOUT ROWID;
@@ -0,0 +1,16 @@
+-- Source identifiers for imported rows (Message-ID, calendar UID) so database/ingest.py can
+-- skip duplicates, and per-source checkpoints so an interrupted import resumes where it stopped.
+ALTER TABLE emails ADD COLUMN message_id TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_emails_message_id ON emails(message_id);
+
+ALTER TABLE calendar ADD COLUMN uid TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_calendar_uid ON calendar(uid);
+
+CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+  source      TEXT PRIMARY KEY,       -- absolute path of the mbox/JSONL file or EML directory
+  kind        TEXT NOT NULL,          -- 'mbox', 'eml' or 'jsonl'
+  position    TEXT NOT NULL,          -- JSON: byte offset + file fingerprint, or last EML path, committed so far
+  records     INTEGER NOT NULL DEFAULT 0,
+  inserted    INTEGER NOT NULL DEFAULT 0,
+  updated_at  TEXT NOT NULL
+);
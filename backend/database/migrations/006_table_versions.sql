@@ -0,0 +1,32 @@
+-- Write counter per app table, bumped by triggers on every insert/update/delete from any connection
+-- or process, so caches can tell whether what they derived from a table is still current.
+CREATE TABLE IF NOT EXISTS table_versions (
+  name     TEXT PRIMARY KEY,
+  version  INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO table_versions(name) VALUES ('emails'), ('calendar');
+
+CREATE TRIGGER IF NOT EXISTS emails_version_ai AFTER INSERT ON emails BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'emails';
+END;
+
+CREATE TRIGGER IF NOT EXISTS emails_version_au AFTER UPDATE ON emails BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'emails';
+END;
+
+CREATE TRIGGER IF NOT EXISTS emails_version_ad AFTER DELETE ON emails BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'emails';
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_version_ai AFTER INSERT ON calendar BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'calendar';
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_version_au AFTER UPDATE ON calendar BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'calendar';
+END;
+
+CREATE TRIGGER IF NOT EXISTS calendar_version_ad AFTER DELETE ON calendar BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'calendar';
+END;
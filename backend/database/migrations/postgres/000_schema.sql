@@ -0,0 +1,132 @@
+-- The app tables of the SQLite migrations 000-006 for PostgreSQL (12+), in one file. Derived data
+-- is kept in sync as there: full-text search in generated tsvector columns (emails_fts), epochs and
+-- calendar_attendees by triggers, and write counters in table_versions.
+-- Text compared by range (received_at keyset cursors, attendee prefixes) uses the "C" collation, so
+-- it sorts by code point as in SQLite, whatever the database's locale.
+CREATE TABLE IF NOT EXISTS emails (
+  id          BIGSERIAL PRIMARY KEY,
+  origin      TEXT NOT NULL,          -- e.g., 'manual'
+  sender      TEXT NOT NULL,          -- e.g., 'Alice <alice@acme.com>'
+  received_at TEXT COLLATE "C" NOT NULL,  -- ISO8601, e.g., '2025-11-02T16:00:00Z'
+  subject     TEXT NOT NULL,
+  content     TEXT NOT NULL,
+  message_id  TEXT UNIQUE,
+  -- Words split on non-word characters like FTS5's unicode61 tokenizer (so 'alice@acme.com' is
+  -- 'alice', 'acme', 'com'); subject ranks above content as bm25's weights do in search_emails
+  search      tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', regexp_replace(subject, '\W+', ' ', 'g')), 'A')
+                || setweight(to_tsvector('simple', regexp_replace(content, '\W+', ' ', 'g')), 'B')
+              ) STORED,
+  sender_search tsvector GENERATED ALWAYS AS (to_tsvector('simple', regexp_replace(sender, '\W+', ' ', 'g'))) STORED
+);
+
+CREATE INDEX IF NOT EXISTS idx_emails_received_at ON emails(received_at);
+CREATE INDEX IF NOT EXISTS idx_emails_search ON emails USING gin(search);
+CREATE INDEX IF NOT EXISTS idx_emails_sender_search ON emails USING gin(sender_search);
+
+CREATE TABLE IF NOT EXISTS calendar (
+  id          BIGSERIAL PRIMARY KEY,
+  title       TEXT NOT NULL,
+  start_ts    TEXT NOT NULL,          -- ISO8601
+  end_ts      TEXT NOT NULL,          -- ISO8601
+  attendees   TEXT,                   -- comma-separated names/emails
+  start_epoch BIGINT,
+  end_epoch   BIGINT,
+  uid         TEXT UNIQUE
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_start_end ON calendar(start_epoch, end_epoch);
+-- Lets overlap queries bound their scan by the longest event
+CREATE INDEX IF NOT EXISTS idx_calendar_duration ON calendar((end_epoch - start_epoch));
+
+-- Timestamps without an offset are UTC, as in SQLite's strftime('%s', ...)
+CREATE OR REPLACE FUNCTION calendar_epochs() RETURNS trigger LANGUAGE plpgsql SET TimeZone = 'UTC' AS $$
+BEGIN
+  NEW.start_epoch := extract(epoch FROM NEW.start_ts::timestamptz)::bigint;
+  NEW.end_epoch := extract(epoch FROM NEW.end_ts::timestamptz)::bigint;
+  RETURN NEW;
+END $$;
+
+DROP TRIGGER IF EXISTS calendar_epochs ON calendar;
+CREATE TRIGGER calendar_epochs BEFORE INSERT OR UPDATE OF start_ts, end_ts ON calendar
+  FOR EACH ROW EXECUTE FUNCTION calendar_epochs();
+
+CREATE TABLE IF NOT EXISTS calendar_attendees (
+  event_id      BIGINT NOT NULL,
+  attendee      TEXT NOT NULL,          -- as written, e.g. 'Alex <alex@client.com>'
+  attendee_key  TEXT COLLATE "C" NOT NULL,  -- lower-cased, for prefix lookups
+  email         TEXT COLLATE "C",       -- lower-cased address if one is present
+  PRIMARY KEY (event_id, attendee_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_calendar_attendees_key ON calendar_attendees(attendee_key, event_id);
+CREATE INDEX IF NOT EXISTS idx_calendar_attendees_email ON calendar_attendees(email, event_id);
+
+CREATE OR REPLACE FUNCTION calendar_attendees_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP <> 'INSERT' THEN
+    DELETE FROM calendar_attendees WHERE event_id = OLD.id;
+  END IF;
+  IF TG_OP <> 'DELETE' THEN
+    INSERT INTO calendar_attendees(event_id, attendee, attendee_key, email)
+    SELECT NEW.id, v, lower(v),
+           CASE
+             WHEN strpos(v, '<') > 0 AND strpos(v, '>') > strpos(v, '<')
+               THEN lower(trim(substr(v, strpos(v, '<') + 1, strpos(v, '>') - strpos(v, '<') - 1)))
+             WHEN strpos(v, '@') > 0 THEN lower(v)
+           END
+    FROM (
+      SELECT trim(translate(part, E'\n\r\t', '   ')) AS v
+      FROM unnest(string_to_array(coalesce(NEW.attendees, ''), ',')) AS part
+    ) parts
+    WHERE v <> ''
+    ON CONFLICT DO NOTHING;
+  END IF;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS calendar_attendees_sync ON calendar;
+CREATE TRIGGER calendar_attendees_sync AFTER INSERT OR DELETE OR UPDATE OF attendees ON calendar
+  FOR EACH ROW EXECUTE FUNCTION calendar_attendees_sync();
+
+-- On-disk tier of the Exa response cache (agents/exa_cache.py)
+CREATE TABLE IF NOT EXISTS exa_cache (
+  key         TEXT PRIMARY KEY,       -- '<tool>:<sha256 of normalized params>'
+  tool        TEXT NOT NULL,          -- 'search_exa', 'get_contents'
+  value       TEXT NOT NULL,          -- tool output as returned to the model
+  created_at  DOUBLE PRECISION NOT NULL  -- unix seconds when fetched from Exa
+);
+
+CREATE INDEX IF NOT EXISTS idx_exa_cache_created_at ON exa_cache(created_at);
+
+-- Rolling summaries of older chat history (agents/context_budget.py)
+CREATE TABLE IF NOT EXISTS context_summaries (
+  session_id          TEXT NOT NULL,
+  scope               TEXT NOT NULL,  -- id of the team or agent whose history is summarized
+  through_message_id  TEXT NOT NULL,  -- last history message folded into the summary
+  summary             TEXT NOT NULL,
+  updated_at          DOUBLE PRECISION NOT NULL,  -- unix seconds
+  PRIMARY KEY (session_id, scope)
+);
+
+-- Write counter per app table (see 006_table_versions.sql), bumped once per writing statement
+CREATE TABLE IF NOT EXISTS table_versions (
+  name     TEXT PRIMARY KEY,
+  version  BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions(name) VALUES ('emails'), ('calendar') ON CONFLICT DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS emails_version ON emails;
+CREATE TRIGGER emails_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON emails
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
+
+DROP TRIGGER IF EXISTS calendar_version ON calendar;
+CREATE TRIGGER calendar_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON calendar
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version();
@@ -0,0 +1,220 @@
+"""
+PostgreSQL backend, used when DATABASE_URL is a postgresql:// URL, so several API nodes can share
+one database behind a load balancer.
+
+The tools keep writing the SQL they write for SQLite, with ? placeholders. Connection.execute()
+translates them for psycopg and runs each statement on a connection borrowed from a pool for
+just that statement, or on the connection of the enclosing transaction(). Rows are read before
+the connection goes back, so callers use the result like a sqlite3 cursor. The few queries that
+need another dialect (full-text search, index hints) check `conn.dialect`. The app schema comes
+from database/migrations/postgres/. agno keeps its sessions in the same database through a
+SQLAlchemy engine with a pool of its own.
+
+Needs `pip install "psycopg[binary]" psycopg-pool`. Migrate, and copy an existing SQLite database in:
+
+    DATABASE_URL=postgresql://... python -m database.migrations --copy-from agno.db
+"""
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+
+from . import db
+
+try:
+    import psycopg
+    from psycopg import errors
+    from psycopg_pool import ConnectionPool
+except ImportError:
+    psycopg = None
+
+# Connections each worker process keeps for the tools, and seconds to wait for a free one.
+# agno's engine keeps up to POSTGRES_POOL_MAX more.
+POSTGRES_POOL_MIN = int(os.getenv("POSTGRES_POOL_MIN", "1"))
+POSTGRES_POOL_MAX = int(os.getenv("POSTGRES_POOL_MAX", "10"))
+POSTGRES_POOL_TIMEOUT = float(os.getenv("POSTGRES_POOL_TIMEOUT", "10"))
+
+# Advisory lock held by transaction(immediate=True): like SQLite's write lock, one such writer at a time
+WRITE_LOCK_KEY = 0x61676E6F
+# Advisory lock held while migrating, so nodes starting together migrate once
+MIGRATE_LOCK_KEY = 0x61676E70
+
+# Errors a statement can fail with (psycopg.Error), for except clauses that cover both backends
+Error = psycopg.Error if psycopg is not None else sqlite3.Error
+
+# ? outside string literals becomes %s; % anywhere is doubled, since psycopg reads it as a placeholder
+_TOKENS = re.compile(r"'(?:[^']|'')*'|\?|%")
+
+
+def _require() -> None:
+    if psycopg is None:
+        raise ImportError(
+            "DATABASE_URL points to PostgreSQL but `psycopg` is not installed. "
+            "Please install it using `pip install \"psycopg[binary]\" psycopg-pool`"
+        )
+
+
+@lru_cache(maxsize=1024)
+def translate(sql: str) -> str:
+    """sqlite-style SQL with ? placeholders -> psycopg SQL with %s"""
+    return _TOKENS.sub(lambda m: "%s" if m.group() == "?" else m.group().replace("%", "%%"), sql)
+
+
+class Result:
+    """Rows of one statement, read before its connection went back to the pool (sqlite3 cursor API)"""
+
+    def __init__(self, rows: List[tuple], rowcount: int):
+        self._rows = rows
+        self._next = 0
+        self.rowcount = rowcount
+
+    def fetchone(self) -> Optional[tuple]:
+        if self._next >= len(self._rows):
+            return None
+        self._next += 1
+        return self._rows[self._next - 1]
+
+    def fetchall(self) -> List[tuple]:
+        rows, self._next = self._rows[self._next:], len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+class Connection:
+    """sqlite3-style execute() on the pool; bound to one pooled connection inside transaction()"""
+
+    dialect = "postgres"
+
+    def __init__(self, pool: "ConnectionPool", conn: Optional["psycopg.Connection"] = None):
+        self._pool = pool
+        self._conn = conn
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> Result:
+        if self._conn is not None:
+            return self._run(self._conn, sql, [parameters] if parameters else None)
+        with self._pool.connection() as conn:
+            return self._run(conn, sql, [parameters] if parameters else None)
+
+    def executemany(self, sql: str, parameters: Sequence[Sequence[Any]]) -> Result:
+        if self._conn is not None:
+            return self._run(self._conn, sql, list(parameters))
+        with self._pool.connection() as conn:
+            return self._run(conn, sql, list(parameters))
+
+    @staticmethod
+    def _run(conn: "psycopg.Connection", sql: str, batches: Optional[List[Sequence[Any]]]) -> Result:
+        start = time.perf_counter()
+        try:
+            with conn.cursor() as cursor:
+                if batches is None:
+                    cursor.execute(sql)
+                elif len(batches) == 1:
+                    cursor.execute(translate(sql), batches[0])
+                else:
+                    cursor.executemany(translate(sql), batches)
+                return Result(cursor.fetchall() if cursor.description else [], cursor.rowcount)
+        finally:
+            if db._statement_observer is not None:
+                db._statement_observer("tools", sql, time.perf_counter() - start)
+
+
+_pool: Optional["ConnectionPool"] = None
+
+
+def get_pool() -> "ConnectionPool":
+    """This process's pool for the tools, opened on first use (after a fork, workers open their own)"""
+    global _pool
+    _require()
+    if _pool is None or _pool.closed:
+        _pool = ConnectionPool(
+            db.DATABASE_URL, min_size=POSTGRES_POOL_MIN, max_size=POSTGRES_POOL_MAX, timeout=POSTGRES_POOL_TIMEOUT,
+            kwargs={"autocommit": True}, check=ConnectionPool.check_connection, name="tools", open=True,
+        )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def get_connection() -> Connection:
+    return Connection(get_pool())
+
+
+@contextmanager
+def transaction(immediate: bool = False) -> Iterator[Connection]:
+    """One pooled connection inside BEGIN/COMMIT (rolled back on error)"""
+    pool = get_pool()
+    with pool.connection() as conn, conn.transaction():
+        if immediate:
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (WRITE_LOCK_KEY,))
+        yield Connection(pool, conn)
+
+
+def is_busy(error: BaseException) -> bool:
+    """Lock and serialization conflicts, which succeed when the transaction is retried"""
+    if psycopg is None:
+        return False
+    return isinstance(error, (errors.SerializationFailure, errors.DeadlockDetected, errors.LockNotAvailable))
+
+
+def create_agno_engine() -> Engine:
+    """SQLAlchemy engine (psycopg 3 driver) for agno's PostgresDb"""
+    _require()
+    url = make_url(db.DATABASE_URL).set(drivername="postgresql+psycopg")
+    return create_engine(url, pool_size=POSTGRES_POOL_MAX, max_overflow=0, pool_pre_ping=True)
+
+
+def pool_stats() -> Dict[str, int]:
+    if _pool is None:
+        return {}
+    stats = _pool.get_stats()
+    return {name: stats.get(name, 0) for name in ("pool_size", "pool_available", "requests_waiting", "requests_num", "requests_wait_ms", "connections_errors")}
+
+
+# Tables copied by --copy-from, with their columns (derived ones are filled by the triggers)
+_COPIED_TABLES = {
+    "emails": ("id", "origin", "sender", "received_at", "subject", "content", "message_id"),
+    "calendar": ("id", "title", "start_ts", "end_ts", "attendees", "uid"),
+    "exa_cache": ("key", "tool", "value", "created_at"),
+    "context_summaries": ("session_id", "scope", "through_message_id", "summary", "updated_at"),
+}
+
+
+def copy_from_sqlite(database_path: str, batch_rows: int = 5000) -> Dict[str, int]:
+    """Copies the app tables of a SQLite database into this one (rows whose key exists are skipped)"""
+    source = sqlite3.connect(database_path)
+    copied = {}
+    try:
+        with transaction() as conn:
+            for table, columns in _COPIED_TABLES.items():
+                try:
+                    rows = source.execute(f"SELECT {', '.join(columns)} FROM {table}")
+                except sqlite3.OperationalError:
+                    continue
+                sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) ON CONFLICT DO NOTHING"
+                copied[table] = 0
+                while True:
+                    batch = rows.fetchmany(batch_rows)
+                    if not batch:
+                        break
+                    conn.executemany(sql, batch)
+                    copied[table] += len(batch)
+            # Rows came with their ids: move the sequences past them
+            for table in ("emails", "calendar"):
+                conn.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 0) + 1, false) FROM {table}")
+    finally:
+        source.close()
+    return copied
+
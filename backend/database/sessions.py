@@ -0,0 +1,174 @@
+"""
+Chat history read straight from agno's `agno_sessions` table.
+
+agno keeps every run of a session, messages included, in the JSON `runs` column, and
+`Team.get_messages_for_session` rebuilds all of them as agno objects on each call. Here the
+column is parsed once per version of the session into a small index of the user/assistant
+messages, kept in an LRU, and pages are cut from that index. The filters are the ones agno
+applies: top-level runs of the team that didn't pause, fail or get cancelled, skipping
+messages that were replayed from history.
+"""
+import bisect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .db import DatabaseError, get_connection
+
+SESSIONS_TABLE = "agno_sessions"
+SKIPPED_RUN_STATUSES = ("PAUSED", "CANCELLED", "ERROR")
+
+# Sessions whose parsed message index stays in memory
+SESSION_HISTORY_CACHE_SIZE = int(os.getenv("SESSION_HISTORY_CACHE_SIZE", "16"))
+
+# A message's position in the session: (run index, message index within the run)
+Position = Tuple[int, int]
+
+_lock = threading.Lock()
+_cache: "OrderedDict[Tuple[str, str], Tuple[str, List[Position], List[Dict[str, Any]]]]" = OrderedDict()
+_counters = {"hits": 0, "misses": 0}
+
+
+def session_version(session_id: str) -> Optional[str]:
+    """Cheap fingerprint of a session's history (None if it doesn't exist), used as its ETag"""
+    try:
+        row = get_connection().execute(
+            f"SELECT updated_at, length(CAST(runs AS TEXT)) FROM {SESSIONS_TABLE} WHERE session_id = ?", (session_id,)
+        ).fetchone()
+    except DatabaseError:
+        # agno creates the table on the first run
+        return None
+    return None if row is None else f"{row[0]}-{row[1] or 0}"
+
+
+def _decode_runs(raw: Any) -> List[Dict[str, Any]]:
+    # psycopg hands the JSON column back parsed (PostgreSQL), sqlite3 as text
+    runs = json.loads(raw) if isinstance(raw, str) else raw
+    # agno stores the list JSON-encoded inside the JSON column on SQLite
+    if isinstance(runs, str):
+        runs = json.loads(runs)
+    return runs or []
+
+
+def _tool_data(run: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, Any]:
+    # Tool calls of `message`, each with its result from the run's tool messages
+    results = {m.get("tool_call_id"): m.get("content") for m in run.get("messages") or [] if m.get("role") == "tool"}
+    tool_calls = []
+    for call in message.get("tool_calls") or []:
+        function = call.get("function") or {}
+        arguments = function.get("arguments", call.get("arguments"))
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments)
+            except ValueError:
+                pass
+        tool_calls.append({
+            "id": call.get("id"),
+            "name": function.get("name", call.get("name")),
+            "arguments": arguments,
+            "result": results.get(call.get("id"), call.get("result")),
+        })
+    return {"tool_calls": tool_calls}
+
+
+def _build_index(runs: List[Dict[str, Any]], team_id: str) -> List[Dict[str, Any]]:
+    messages = []
+    for run_index, run in enumerate(runs):
+        if (
+            run.get("team_id") != team_id
+            or run.get("parent_run_id") is not None
+            or run.get("status") in SKIPPED_RUN_STATUSES
+        ):
+            continue
+        for message_index, message in enumerate(run.get("messages") or []):
+            if message.get("role") not in ("user", "assistant") or message.get("from_history"):
+                continue
+            entry = {
+                "id": message.get("id"),
+                "role": message["role"],
+                "content": message.get("content"),
+                "created_at": message.get("created_at"),
+                "has_tool_data": bool(message.get("tool_calls")),
+                "position": (run_index, message_index),
+            }
+            if entry["has_tool_data"]:
+                entry["tool_data"] = _tool_data(run, message)
+            messages.append(entry)
+    return messages
+
+
+def _history(session_id: str, team_id: str) -> Tuple[List[Position], List[Dict[str, Any]]]:
+    key = (session_id, team_id)
+    version = session_version(session_id)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == version:
+            _cache.move_to_end(key)
+            _counters["hits"] += 1
+            return cached[1], cached[2]
+        _counters["misses"] += 1
+
+    try:
+        row = get_connection().execute(
+            f"SELECT updated_at, length(CAST(runs AS TEXT)), runs FROM {SESSIONS_TABLE} WHERE session_id = ?", (session_id,)
+        ).fetchone()
+    except DatabaseError:
+        row = None
+    if row is None:
+        return [], []
+
+    messages = _build_index(_decode_runs(row[2]), team_id)
+    positions = [message["position"] for message in messages]
+    with _lock:
+        _cache[key] = (f"{row[0]}-{row[1] or 0}", positions, messages)
+        _cache.move_to_end(key)
+        while len(_cache) > SESSION_HISTORY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return positions, messages
+
+
+def clear_history_cache() -> None:
+    with _lock:
+        _cache.clear()
+
+
+def history_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_counters, "entries": len(_cache), "max_entries": SESSION_HISTORY_CACHE_SIZE}
+
+
+def session_messages(
+    session_id: str,
+    team_id: str,
+    limit: int,
+    before: Optional[Position] = None,
+    after: Optional[Position] = None,
+    include_tool_data: bool = True,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    One page of user/assistant messages, oldest first, and whether more exist beyond the page:
+    the `limit` messages right after `after` if given, otherwise the last `limit` before `before`
+    (or the end of the session). Messages carry their `position` and `has_tool_data`.
+    """
+    positions, messages = _history(session_id, team_id)
+    if after is not None:
+        start = bisect.bisect_right(positions, tuple(after))
+        page, more = messages[start:start + limit], start + limit < len(messages)
+    else:
+        end = bisect.bisect_left(positions, tuple(before)) if before is not None else len(messages)
+        page, more = messages[max(end - limit, 0):end], end > limit
+
+    if not include_tool_data:
+        page = [{k: v for k, v in message.items() if k != "tool_data"} for message in page]
+    return page, more
+
+
+def message_tool_data(session_id: str, team_id: str, message_id: str) -> Optional[Dict[str, Any]]:
+    """Tool calls made by one message with their results; None if the message doesn't exist"""
+    _, messages = _history(session_id, team_id)
+    for message in messages:
+        if message["id"] == message_id:
+            return message.get("tool_data", {"tool_calls": []})
+    return None
@@ -0,0 +1,139 @@
+"""
+Single-writer queue for the tools' writes to the app tables.
+
+SQLite allows one writer at a time per database file. With several threads, and in a
+multi-worker deployment several processes, writing at once, most of them wait in busy_timeout,
+and a transaction that reads before it writes (add_calendar_event's conflict check) can be
+beaten to the write lock and fail. Here every write of a process runs on one thread, in a
+BEGIN IMMEDIATE transaction that is retried while another process holds the lock, so writers
+in a process queue up instead of contending, and across processes each write is atomic.
+
+On PostgreSQL (DATABASE_URL) the same jobs run in a transaction holding an advisory lock, so
+add_calendar_event's check-then-insert stays atomic across nodes; there the queue only keeps a
+process from tying up more than one pooled connection with writes.
+
+    write_queue.write(lambda conn: conn.execute(...).lastrowid)   # waits, returns the result
+    write_queue.write_later(lambda conn: conn.execute(...))       # returns at once (cache writes)
+
+agno's own session writes go through its SQLAlchemy engine, not this queue.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from agno.utils.log import log_warning
+
+from .db import retry_busy, transaction
+
+# Writes waiting for the writer thread; write_later() drops new ones while it is full
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", "1024"))
+
+T = TypeVar("T")
+# Called with the transaction's connection: sqlite3 or postgres.Connection (same execute() API)
+Job = Callable[[Any], T]
+
+
+class WriteQueue:
+    """One writer thread per process, started on the first write (and again in a forked child)."""
+
+    def __init__(self, max_size: int = WRITE_QUEUE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._counters = {"writes": 0, "failed": 0, "dropped": 0, "wait_ms": 0.0, "write_ms": 0.0}
+
+    def _jobs(self) -> queue.Queue:
+        with self._lock:
+            if self._pid != os.getpid() or self._thread is None or not self._thread.is_alive():
+                self._queue = queue.Queue(maxsize=self.max_size)
+                self._thread = threading.Thread(target=self._work, args=(self._queue,), name="sqlite-writer", daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            return self._queue
+
+    def _work(self, jobs: queue.Queue) -> None:
+        while True:
+            fn, database_path, future, queued_at = jobs.get()
+            started = time.perf_counter()
+            try:
+                result = retry_busy(lambda: self._run(fn, database_path))
+            except BaseException as e:
+                self._count(failed=1, wait_ms=(started - queued_at) * 1000)
+                future.set_exception(e)
+            else:
+                finished = time.perf_counter()
+                self._count(writes=1, wait_ms=(started - queued_at) * 1000, write_ms=(finished - started) * 1000)
+                future.set_result(result)
+            finally:
+                jobs.task_done()
+
+    @staticmethod
+    def _run(fn: Job, database_path: Optional[str]):
+        with transaction(database_path, immediate=True) as conn:
+            return fn(conn)
+
+    def _count(self, **amounts) -> None:
+        with self._lock:
+            for counter, amount in amounts.items():
+                self._counters[counter] += amount
+
+    def submit(self, fn: Job, database_path: Optional[str] = None, block: bool = True) -> "Future[T]":
+        """Queues fn(conn) to run in its own transaction; raises queue.Full if not block and full"""
+        future: Future = Future()
+        if threading.current_thread() is self._thread:
+            # A job that writes again would wait on itself
+            try:
+                future.set_result(self._run(fn, database_path))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        self._jobs().put((fn, database_path, future, time.perf_counter()), block=block)
+        return future
+
+    def write(self, fn: Job, database_path: Optional[str] = None) -> T:
+        """Runs fn(conn) on the writer thread and returns its result (or raises its error)"""
+        return self.submit(fn, database_path).result()
+
+    def write_later(self, fn: Job, database_path: Optional[str] = None, label: str = "write") -> None:
+        """Fire and forget, for writes nothing waits on (caches); failures are logged"""
+        try:
+            future = self.submit(fn, database_path, block=False)
+        except queue.Full:
+            self._count(dropped=1)
+            log_warning(f"Write queue full, dropped {label}")
+            return
+
+        def report(done: Future) -> None:
+            if done.exception() is not None:
+                log_warning(f"{label} failed: {done.exception()}")
+
+        future.add_done_callback(report)
+
+    def flush(self) -> None:
+        """Waits for every queued write (called on shutdown)"""
+        with self._lock:
+            jobs = self._queue if self._pid == os.getpid() else None
+        if jobs is not None:
+            jobs.join()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            counters = dict(self._counters)
+            pending = self._queue.qsize() if self._queue is not None and self._pid == os.getpid() else 0
+        done = counters["writes"] + counters["failed"]
+        return {
+            "pending": pending,
+            "writes": counters["writes"],
+            "failed": counters["failed"],
+            "dropped": counters["dropped"],
+            "avg_wait_ms": round(counters["wait_ms"] / done, 2) if done else 0.0,
+            "avg_write_ms": round(counters["write_ms"] / counters["writes"], 2) if counters["writes"] else 0.0,
+        }
+
+
+write_queue = WriteQueue()
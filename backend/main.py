@@ -1,20 +1,41 @@
+import settings  # noqa: F401  (loads .env before anything reads its configuration)
+
 import os
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from agno.os import AgentOS
 
-from agents import InternAgent, EmailAgent, CalendarAgent, ExaAgent
+from agents import EmailAgent, CalendarAgent, ExaAgent
+from agents.email_index import email_index
+from agents.metrics import MetricsMiddleware
+from agents.tracing import TracingMiddleware, exporter
 from routers import health_router, chat_router
+from database import write_queue
+from database.migrations import apply_migrations
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from agents import team_pool
+
+    # Bring app tables/indexes up to date (e.g. emails_fts on older agno.db files)
+    apply_migrations()
+    # Build the RAGTeam pool before taking traffic
+    team_pool.warm_up()
+    # Embed emails added since the last run into the vector index, without delaying startup
+    email_index.start_sync()
+    yield
+    # Finish queued cache/summary writes, then write out spans still waiting for the exporter
+    write_queue.flush()
+    exporter.flush()
 
-# Load environment variables
-load_dotenv()
 
 # Create FastAPI app
 app = FastAPI(
     title="Agno Chat API",
     description="FastAPI application integrated with Agno AgentOS",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS - Updated
@@ -26,15 +47,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Spans per request, Server-Timing and X-Trace-Id headers (agents/tracing.py)
+app.add_middleware(TracingMiddleware)
+
+# Request count, latency and in-flight gauges per route for GET /health/metrics (agents/metrics.py)
+app.add_middleware(MetricsMiddleware)
+
 # ---------- Routers ----------
 app.include_router(health_router)
 app.include_router(chat_router)
 
-# Create AgentOS with individual agents (InternAgent is a Team used directly in routers)
+# Create AgentOS with individual agents (the RAGTeam pool is used directly in routers)
 agent_os = AgentOS(
     description="Chat API with Agno AgentOS",
     agents=[EmailAgent, CalendarAgent, ExaAgent],
     base_app=app,
+    # AgentOS ignores AGNO_TELEMETRY and would post its launch event synchronously on import
+    telemetry=os.getenv("AGNO_TELEMETRY", "true").lower() == "true",
 )
 
 # Get the combined app (includes AgentOS routes)
@@ -201,209 +201,537 @@
 #         traceback.print_exc()
 #         raise HTTPException(status_code=500, detail=str(e))
 
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Body
-from agents import RAGTeam
+import asyncio
+import os
+import time
+from fastapi import APIRouter, HTTPException, Body, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from agno.team.team import Team
+from agno.run.team import TeamRunOutput
+from agents import team_pool
+from agents.rag_team import TEAM_ID
+from agents.executor import agent_executor, ExecutorBusy
+from agents.chat_batch import (
+    CHAT_BATCH_CONCURRENCY,
+    stream_chat_batch,
+    summarize as summarize_batch,
+    validate_items as validate_batch_items,
+)
+from agents.context_budget import context_metrics
+from agents.intent_router import run_routed
+from agents.logs import get_logger
+from agents.metrics import CHAT_IN_FLIGHT, CHAT_LATENCY
+from agents.models import check_model
+from agents.tool_results import decode_cursor, encode_cursor
+from agents.tracing import span
+from agents.exa_search import SEARCH_MAX_BATCH, SEARCH_MAX_RESULTS, SEARCH_TYPES, direct_search as direct_exa_search
+from database import message_tool_data, session_messages, session_version
 from typing import Optional
 import json
 
 
 router = APIRouter(prefix="/api", tags=["chat"])
+log = get_logger("chat")
+
+# Messages per page of session history
+SESSION_MESSAGES_PAGE_SIZE = int(os.getenv("SESSION_MESSAGES_PAGE_SIZE", "50"))
+SESSION_MESSAGES_MAX_PAGE_SIZE = int(os.getenv("SESSION_MESSAGES_MAX_PAGE_SIZE", "500"))
+
+
+# Blocking agno calls, executed on agent_executor worker threads
+def _run_team(model: str, message: str, session_id: str):
+    with team_pool.borrow(model) as team:
+        return run_routed(team, message, session_id)
+
+
+def _stream_team(model: str, message: str, session_id: str):
+    # Generator: the team stays borrowed until the stream is exhausted or closed
+    with team_pool.borrow(model) as team:
+        yield from team.run(
+            input=message,
+            session_id=session_id,
+            stream=True,
+            stream_events=True,
+            yield_run_response=True,
+        )
+
+
+def _load_session_page(session_id, limit, before, after, include_tool_data):
+    with span("history.page", limit=limit):
+        return session_messages(
+            session_id, TEAM_ID, limit, before=before, after=after, include_tool_data=include_tool_data
+        )
+
+
+def _session_version(session_id):
+    with span("history.version"):
+        return session_version(session_id)
+
+
+def _load_message_tool_data(session_id, message_id):
+    return message_tool_data(session_id, TEAM_ID, message_id)
+
+
+def _message_position(cursor: Optional[str]):
+    # History cursors are {"r": run index, "m": message index}
+    position = decode_cursor(cursor)
+    if position is None:
+        return None
+    try:
+        return int(position["r"]), int(position["m"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid cursor '{cursor}'")
+
+
+def _position_cursor(position) -> str:
+    return encode_cursor({"r": position[0], "m": position[1]})
+
+
+# Exa tool names as they appear in tool executions and streamed member tool events
+EXA_STREAM_TOOLS = ['search_exa', 'get_contents']
+
+
+def _urls_from_tool_result(tool_result) -> list:
+    # Exa tools return a JSON encoded list of {"url": ..., "title": ...}
+    if isinstance(tool_result, str):
+        try:
+            tool_result = json.loads(tool_result)
+        except ValueError:
+            return []
+    if isinstance(tool_result, dict):
+        tool_result = tool_result.get('results', [])
+    if not isinstance(tool_result, list):
+        return []
+    return [r['url'] for r in tool_result if isinstance(r, dict) and 'url' in r]
+
+
+def _extract_search_results(run_response):
+    """Pulls Exa tool results and their URLs out of a finished team run and its member runs"""
+    search_results = []
+    sources = []
+
+    runs = [run_response]
+    while runs:
+        run = runs.pop(0)
+        for tool in getattr(run, 'tools', None) or []:
+            if tool.tool_name in EXA_STREAM_TOOLS and tool.result:
+                search_results.append({
+                    "tool": tool.tool_name,
+                    "arguments": tool.tool_args,
+                    "result": tool.result
+                })
+                sources.extend(_urls_from_tool_result(tool.result))
+        runs.extend(getattr(run, 'member_responses', None) or [])
+
+    return search_results, sources
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _busy(e: ExecutorBusy) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def _model(model: Optional[str]) -> str:
+    # Only models in CHAT_MODELS get a team pool entry
+    try:
+        return check_model(model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
 @router.get("/sessions/{session_id}/messages")
-async def get_session_messages(session_id: str, model: Optional[str] = 'gpt-4o'):
-    """Gets all messages for a session including Exa search results"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] GET /api/sessions/{session_id}/messages")
-    print("Model: ", model)
+async def get_session_messages(
+    session_id: str,
+    request: Request,
+    model: Optional[str] = None,
+    limit: int = SESSION_MESSAGES_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    include_tool_data: bool = True,
+):
+    """
+    Gets one page of a session's messages, oldest first
+
+    Query params:
+        - model: one of CHAT_MODELS (optional); every model's team keeps its history under the same id
+        - limit: messages per page (default SESSION_MESSAGES_PAGE_SIZE, max SESSION_MESSAGES_MAX_PAGE_SIZE)
+        - before: cursor; the page of messages just before it (default: the latest messages)
+        - after: cursor; messages after it, e.g. the `after` of the last response to poll for new ones
+        - include_tool_data: false to leave tool calls out; fetch them per message from
+          /api/sessions/{session_id}/messages/{message_id}/tool_data when `has_tool_data` is set
+
+    Returns:
+        - messages: list of {id, role, content, created_at, has_tool_data, tool_data}
+        - before: cursor for the previous (older) page, null at the start of the session
+        - after: cursor of the last message, to fetch what comes next
+
+    Sends an ETag; with a matching If-None-Match the response is 304 and no messages are read.
+    """
+    log.info(f"GET /api/sessions/{session_id}/messages - limit={limit} before={before} after={after}")
+
+    _model(model)
+    if not 1 <= limit <= SESSION_MESSAGES_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {SESSION_MESSAGES_MAX_PAGE_SIZE}")
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
+    try:
+        before_position = _message_position(before)
+        after_position = _message_position(after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     try:
-        messages = RAGTeam(model).get_messages_for_session(session_id=session_id)
+        version = await agent_executor.run(_session_version, session_id)
+        etag = f'W/"{version or "empty"}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        messages, more = await agent_executor.run(
+            _load_session_page, session_id, limit, before_position, after_position, include_tool_data
+        )
 
         formatted_messages = []
         for msg in messages:
-            role = msg.role if hasattr(msg, 'role') else 'assistant'
-            content = msg.content if hasattr(msg, 'content') else str(msg)
-            
-            # Extract tool calls/results if present
-            tool_data = None
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                tool_data = {"tool_calls": []}
-                for call in msg.tool_calls:
-                    # Handle both dict and object formats
-                    if isinstance(call, dict):
-                        tool_data["tool_calls"].append({
-                            "name": call.get("name"),
-                            "arguments": call.get("arguments"),
-                            "result": call.get("result")
-                        })
-                    else:
-                        tool_data["tool_calls"].append({
-                            "name": getattr(call, 'name', None),
-                            "arguments": getattr(call, 'arguments', None),
-                            "result": getattr(call, 'result', None)
-                        })
-
-            if role in ['user', 'assistant']:
-                message_obj = {
-                    "role": role,
-                    "content": content
-                }
-                if tool_data:
-                    message_obj["tool_data"] = tool_data
-                    
-                formatted_messages.append(message_obj)
-
-        print(f"[{timestamp}] Retrieved {len(formatted_messages)} messages")
-        return {"messages": formatted_messages}
+            message_obj = {
+                "id": msg["id"],
+                "role": msg["role"],
+                "content": msg["content"],
+                "created_at": msg["created_at"],
+                "has_tool_data": msg["has_tool_data"],
+            }
+            if "tool_data" in msg:
+                message_obj["tool_data"] = msg["tool_data"]
+            formatted_messages.append(message_obj)
+
+        # Paging forwards from a cursor always leaves older messages behind it
+        has_older = bool(messages) and (more if after_position is None else True)
+        last = messages[-1]["position"] if messages else after_position
+
+        log.info(f"Retrieved {len(formatted_messages)} messages")
+        return JSONResponse(
+            {
+                "messages": formatted_messages,
+                "before": _position_cursor(messages[0]["position"]) if has_older else None,
+                "after": _position_cursor(last) if last else None,
+            },
+            headers={"ETag": etag},
+        )
 
+    except ExecutorBusy as e:
+        raise _busy(e)
     except Exception as e:
-        print(f"[{timestamp}] Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/sessions/{session_id}/messages/{message_id}/tool_data")
+async def get_message_tool_data(session_id: str, message_id: str, model: Optional[str] = None):
+    """Tool calls of one message with their results, for pages loaded with include_tool_data=false"""
+    _model(model)
+    try:
+        tool_data = await agent_executor.run(_load_message_tool_data, session_id, message_id)
+    except ExecutorBusy as e:
+        raise _busy(e)
+    if tool_data is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return tool_data
+
+
 @router.post("/chat")
-async def chat(payload: dict = Body(...)):
+async def chat(request: Request, payload: dict = Body(...)):
     """
     Chat endpoint with MCP/Exa integration
     
     Payload:
         - message: str (required)
         - session_id: str (required, UUID v4)
+        - model: str (optional, one of CHAT_MODELS, default the first)
+        - stream: bool (optional, default False) respond with server-sent events, see /api/chat/stream
         
     Returns:
         - session_id: str
         - response: str (agent response)
         - search_results: list (if Exa search was used)
+        - context: estimated history tokens before/after compaction (history_tokens, sent_tokens, saved_tokens)
+        - route: how the request was answered (target "tool", "member" or "team"), see agents/intent_router.py
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    if payload.get("stream"):
+        return await chat_stream(request, payload)
 
     try:
         message = payload.get("message")
         session_id = payload.get("session_id")
-        model = payload.get("model", "gpt-4o")
-        print("Model", model)
+        model = _model(payload.get("model"))
 
         if not message:
             raise HTTPException(status_code=400, detail="message is required")
         if not session_id:
             raise HTTPException(status_code=400, detail="session_id is required")
 
-        print(f"[{timestamp}] POST /api/chat - Session: {session_id}, Message: '{message[:100]}...'")
+        log.info(f"POST /api/chat - Session: {session_id}, Message: '{message[:100]}...'")
 
         # Run the team agent
-        run_response = RAGTeam(model).run(input=message, session_id=session_id)
-
-        # Extract response text
-        text = (
-            getattr(run_response, "content", None) or 
-            getattr(run_response, "output_text", None) or 
-            str(run_response)
-        )
-
-        # Extract Exa search results and sources
-        search_results = []
-        sources = []
-        
-        if hasattr(run_response, 'messages'):
-            for msg in run_response.messages:
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    for tool_call in msg.tool_calls:
-                        # Handle both dict and object formats
-                        if isinstance(tool_call, dict):
-                            tool_name = tool_call.get('name', '')
-                            tool_args = tool_call.get('arguments', {})
-                            tool_result = tool_call.get('result')
-                        else:
-                            tool_name = getattr(tool_call, 'name', '')
-                            tool_args = getattr(tool_call, 'arguments', {})
-                            tool_result = getattr(tool_call, 'result', None)
-                        
-                        # Check if it's an Exa tool
-                        if tool_name in ['exa_search', 'exa_get_contents']:
-                            if tool_result:
-                                search_results.append({
-                                    "tool": tool_name,
-                                    "arguments": tool_args,
-                                    "result": tool_result
-                                })
-                                
-                                # Extract URLs/sources
-                                if isinstance(tool_result, dict):
-                                    if 'results' in tool_result:
-                                        for r in tool_result['results']:
-                                            if isinstance(r, dict) and 'url' in r:
-                                                sources.append(r['url'])
-                                elif isinstance(tool_result, list):
-                                    for r in tool_result:
-                                        if isinstance(r, dict) and 'url' in r:
-                                            sources.append(r['url'])
-
-        response_data = {
-            "session_id": run_response.session_id,
-            "response": text
-        }
-        
-        # Add search results if present
-        if search_results:
-            response_data["search_results"] = search_results
-        if sources:
-            response_data["sources"] = list(set(sources))  # Deduplicate
-
-        print(f"[{timestamp}] Response sent - Length: {len(text)}, Sources: {len(sources)}")
+        start = time.perf_counter()
+        CHAT_IN_FLIGHT.inc("chat")
+        try:
+            run_response = await agent_executor.run(_run_team, model, message, session_id)
+        finally:
+            CHAT_IN_FLIGHT.dec("chat")
+            CHAT_LATENCY.observe(time.perf_counter() - start, "chat", model)
+
+        with span("postprocess"):
+            # Extract response text
+            text = (
+                getattr(run_response, "content", None) or 
+                getattr(run_response, "output_text", None) or 
+                str(run_response)
+            )
+
+            # Extract Exa search results and sources
+            search_results, sources = _extract_search_results(run_response)
+
+            response_data = {
+                "session_id": run_response.session_id,
+                "response": text,
+                "context": context_metrics(run_response),
+                "route": (run_response.metadata or {}).get("route"),
+            }
+
+            # Add search results if present
+            if search_results:
+                response_data["search_results"] = search_results
+            if sources:
+                response_data["sources"] = list(set(sources))  # Deduplicate
+
+        log.info(f"Response sent - Length: {len(text)}, Sources: {len(sources)}")
         return response_data
 
     except HTTPException:
         raise
+    except ExecutorBusy as e:
+        raise _busy(e)
     except Exception as e:
-        print(f"[{timestamp}] Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: Request, payload: dict = Body(...)):
+    """
+    Streaming variant of /api/chat (also used by /api/chat with "stream": true)
+
+    Payload: same as /api/chat
+
+    Server-sent events:
+        - start: {run_id, session_id}
+        - delta: {content} token deltas of the team answer
+        - tool_call_started / tool_call_completed: {tool, arguments, agent}
+        - sources: {sources, search_results}
+        - done: {session_id, response, context}
+        - error: {detail}
+
+    Closing the connection cancels the upstream team run.
+    """
+
+    message = payload.get("message")
+    session_id = payload.get("session_id")
+    model = _model(payload.get("model"))
+
+    if not message:
+        raise HTTPException(status_code=400, detail="message is required")
+    if not session_id:
+        raise HTTPException(status_code=400, detail="session_id is required")
+
+    log.info(f"POST /api/chat/stream - Session: {session_id}, Message: '{message[:100]}...'")
+
+    try:
+        stream = agent_executor.stream(_stream_team, model, message, session_id)
+    except ExecutorBusy as e:
+        raise _busy(e)
+
+    async def events():
+        run_id = None
+        finished = False
+        streamed_sources = []
+        start = time.perf_counter()
+        CHAT_IN_FLIGHT.inc("stream")
+        try:
+            async for event in stream:
+                if isinstance(event, TeamRunOutput):
+                    search_results, sources = _extract_search_results(event)
+                    sources = list(dict.fromkeys(sources + streamed_sources))  # Deduplicate, keep order
+                    yield _sse("sources", {"sources": sources, "search_results": search_results})
+                    yield _sse("done", {"session_id": event.session_id, "response": event.content, "context": context_metrics(event)})
+                    continue
+
+                run_id = run_id or getattr(event, "run_id", None)
+                name = getattr(event, "event", "")
+
+                if name == "TeamRunStarted":
+                    yield _sse("start", {"run_id": run_id, "session_id": session_id})
+                elif name == "TeamRunContent" and isinstance(event.content, str):
+                    yield _sse("delta", {"content": event.content})
+                elif name in ("TeamToolCallStarted", "ToolCallStarted", "TeamToolCallCompleted", "ToolCallCompleted"):
+                    tool = event.tool
+                    data = {
+                        "tool": getattr(tool, "tool_name", None),
+                        "arguments": getattr(tool, "tool_args", None),
+                        "agent": getattr(event, "agent_name", None) or getattr(event, "team_name", None),
+                    }
+                    if name.endswith("Completed"):
+                        data["error"] = bool(getattr(tool, "tool_call_error", False))
+                        if data["tool"] in EXA_STREAM_TOOLS:
+                            streamed_sources.extend(_urls_from_tool_result(getattr(tool, "result", None)))
+                        yield _sse("tool_call_completed", data)
+                    else:
+                        yield _sse("tool_call_started", data)
+                elif name in ("TeamRunError", "RunError"):
+                    yield _sse("error", {"detail": getattr(event, "content", None)})
+            finished = True
+        except Exception as e:
+            finished = True
+            log.error(f"Error in /api/chat/stream: {str(e)}")
+            yield _sse("error", {"detail": str(e)})
+        finally:
+            if not finished:
+                # Client disconnected mid-run: stop paying for the rest of the generation
+                if run_id:
+                    Team.cancel_run(run_id)
+                log.info(f"Client disconnected, cancelled run {run_id}")
+            await stream.aclose()
+            CHAT_IN_FLIGHT.dec("stream")
+            CHAT_LATENCY.observe(time.perf_counter() - start, "stream", model)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/chat/batch")
+async def chat_batch(payload: dict = Body(...)):
+    """
+    Runs many prompts across sessions concurrently (e.g. nightly summary jobs)
+
+    Payload:
+        - items: list of {session_id, message, model (optional, one of CHAT_MODELS)}, up to CHAT_BATCH_MAX_ITEMS
+        - concurrency: int (optional, default CHAT_BATCH_CONCURRENCY, at most AGENT_MAX_WORKERS)
+
+    Returns NDJSON, one line per item as it completes:
+        - {index, session_id, model, status: ok|error, response | error, input_tokens, output_tokens,
+           queued_ms, rate_limited_ms, run_ms, elapsed_ms, finished_ms}
+        - last line: {done, count, ok, errors, elapsed_ms}
+    """
+
+    try:
+        items = validate_batch_items(payload.get("items"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    concurrency = payload.get("concurrency", CHAT_BATCH_CONCURRENCY)
+    if not isinstance(concurrency, int) or not 1 <= concurrency <= agent_executor.max_workers:
+        raise HTTPException(status_code=400, detail=f"concurrency must be between 1 and {agent_executor.max_workers}")
+
+    log.info(f"POST /api/chat/batch - Items: {len(items)}, Concurrency: {concurrency}")
+
+    async def lines():
+        start = time.perf_counter()
+        results = []
+        async for result in stream_chat_batch(items, concurrency):
+            results.append(result)
+            yield json.dumps(result, default=str) + "\n"
+        summary = summarize_batch(results, time.perf_counter() - start)
+        log.info(f"/api/chat/batch finished - {summary}")
+        yield json.dumps(summary) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+
 @router.post("/search")
 async def direct_search(payload: dict = Body(...)):
     """
-    Direct Exa search endpoint (bypasses agent)
-    
+    Direct Exa search endpoint (bypasses agent): calls the Exa search tool, no LLM in the loop
+
     Payload:
-        - query: str (required)
+        - query: str, or queries: list[str] (up to SEARCH_MAX_BATCH, searched concurrently)
         - num_results: int (optional, default 5)
-        - search_type: str (optional: auto/neural/keyword)
-        - include_content: bool (optional, default False)
+        - search_type: str (optional: auto/neural/keyword/fast)
+        - include_content: bool (optional, default False) - page text with each result
+        - stream: bool (optional) - server-sent events: one `result` per query as it finishes, then `done`
+
+    Returns:
+        - query, results (list of {url, title, highlights, ...}), took_ms for a single query
+        - results: list of {query, results | error, took_ms} for `queries`, in request order
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
+
+    batch = "queries" in payload
+    queries = payload.get("queries") if batch else [payload.get("query")]
+    num_results = payload.get("num_results", 5)
+    search_type = payload.get("search_type", "auto")
+    include_content = bool(payload.get("include_content", False))
+
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+        raise HTTPException(status_code=400, detail="query (or a non-empty list of queries) is required")
+    if len(queries) > SEARCH_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {SEARCH_MAX_BATCH} queries per request")
+    if not isinstance(num_results, int) or not 1 <= num_results <= SEARCH_MAX_RESULTS:
+        raise HTTPException(status_code=400, detail=f"num_results must be between 1 and {SEARCH_MAX_RESULTS}")
+    if search_type not in SEARCH_TYPES:
+        raise HTTPException(status_code=400, detail=f"search_type must be one of {', '.join(SEARCH_TYPES)}")
+
+    log.info(f"POST /api/search - Queries: {queries}, Results: {num_results}, Type: {search_type}")
+
+    # Fan out: every query is its own Exa call on a worker thread, started only if all of them fit
     try:
-        from agents.exa_agent import ExaAgent
-        
-        query = payload.get("query")
-        if not query:
-            raise HTTPException(status_code=400, detail="query is required")
-        
-        num_results = payload.get("num_results", 5)
-        search_type = payload.get("search_type", "auto")
-        include_content = payload.get("include_content", False)
-        
-        print(f"[{timestamp}] POST /api/search - Query: '{query}', Results: {num_results}")
-        
-        # Use the agent's tool directly
-        tool_call = f"Search for: {query}"
-        if include_content:
-            tool_call += " and get full content"
-            
-        response = ExaAgent.run(tool_call)
-        
-        return {
-            "query": query,
-            "results": response.content
-        }
-        
+        futures = agent_executor.submit_all(
+            direct_exa_search, [(query, num_results, search_type, include_content) for query in queries]
+        )
+    except ExecutorBusy as e:
+        raise _busy(e)
+
+    searches = [
+        asyncio.ensure_future(_indexed_search(index, query, future))
+        for index, (query, future) in enumerate(zip(queries, futures))
+    ]
+
+    if payload.get("stream"):
+        async def events():
+            try:
+                for next_done in asyncio.as_completed(searches):
+                    index, result = await next_done
+                    yield _sse("result", {"index": index, **result})
+                yield _sse("done", {"count": len(searches)})
+            finally:
+                # Client went away: drop searches that haven't started yet
+                for future in futures:
+                    future.cancel()
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    results = [result for _, result in await asyncio.gather(*searches)]
+
+    if batch:
+        return {"results": results}
+
+    result = results[0]
+    if "error" in result:
+        log.error(f"Error in /api/search: {result['error']}")
+        raise HTTPException(status_code=502, detail=f"Exa search failed: {result['error']}")
+    return result
+
+
+async def _indexed_search(index: int, query: str, future) -> tuple:
+    # (index, result) so streamed results can be matched to their query; failures become per-query errors
+    try:
+        return index, await future
     except Exception as e:
-        print(f"[{timestamp}] Error in /api/search: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        return index, {"query": query, "error": str(e)}
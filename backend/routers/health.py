@@ -1,5 +1,23 @@
+import os
 import uuid
+
+import httpx
 from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from agents.answer_cache import answer_cache
+from agents.context_budget import context_stats
+from agents.email_index import email_index
+from agents.exa_cache import exa_cache
+from agents.executor import agent_executor
+from agents.metrics import registry
+from agents.models import MODEL_BACKEND, backend_info
+from agents.tool_memo import memo_stats
+from agents.tool_results import tool_result_stats
+from agents.tracing import exporter
+from database import DATABASE_BACKEND, busy_stats, get_connection, history_cache_stats, pool_stats, write_queue
+from database.migrations import pending_migrations
 
 router = APIRouter(tags=["health"])
 
@@ -14,3 +32,193 @@ async def health_check():
         "id": INSTANCE_ID,
         "version": "1.0.0"
     }
+
+
+@router.get("/health/executor")
+async def executor_stats():
+    # In-flight agent runs and queue depth of the shared worker pool
+    return agent_executor.stats()
+
+
+@router.get("/health/tools")
+async def tool_result_sizes():
+    # Calls, rows and estimated prompt tokens returned by each tool
+    return tool_result_stats.snapshot()
+
+
+@router.get("/health/cache")
+async def cache_stats():
+    # Hit/miss/eviction counters of the Exa response cache, the chat answer cache and the tool memo
+    return {"exa": exa_cache.stats(), "answers": answer_cache.stats(), "tools": memo_stats.snapshot()}
+
+
+@router.get("/health/context")
+async def context_budget_stats():
+    # History tokens sent to the models, and how many the context budget saved
+    return context_stats.snapshot()
+
+
+@router.get("/health/router")
+async def router_stats():
+    # Requests answered by a tool, a member agent or the team, and fast-path fallbacks
+    from agents.intent_router import route_stats
+
+    return route_stats.snapshot()
+
+
+@router.get("/health/email_index")
+async def email_index_stats():
+    # Rows, IVF lists and search latency of the email vector index
+    return email_index.stats()
+
+
+@router.get("/health/model")
+async def model_backend():
+    # Which model backend (OpenAI or the local stub) the agents are talking to
+    return backend_info()
+
+
+@router.get("/health/database")
+async def database_stats():
+    # This worker's single-writer queue, busy retries and PostgreSQL pool (each worker process keeps its own)
+    return {
+        "pid": os.getpid(), "backend": DATABASE_BACKEND,
+        "write_queue": write_queue.stats(), "busy": busy_stats(), "pool": pool_stats(),
+    }
+
+
+@router.get("/health/tracing")
+async def tracing_stats():
+    # Spans exported, queued and dropped by the background span exporter
+    return exporter.stats()
+
+
+@registry.collector
+def _app_metrics():
+    # Read from the counters the caches, pool and executor already keep, once per scrape
+    # Imported on use (also in router_stats) so that the health router alone doesn't build the agents
+    from agents import team_pool
+
+    exa, history, pool, executor = exa_cache.stats(), history_cache_stats(), team_pool.stats(), agent_executor.stats()
+    answers, memo = answer_cache.stats(), memo_stats.snapshot()
+    lookups = {
+        "exa": (exa["hits"] + exa["stale_hits"], exa["misses"]),
+        "answers": (answers["hits"], answers["misses"]),
+        "tool_memo": (memo["hits"], memo["calls"] - memo["hits"]),
+        "session_history": (history["hits"], history["misses"]),
+        "team_pool": (pool["reused"], pool["created"]),
+    }
+    yield "cache_lookups_total", "counter", "Cache lookups by result (team_pool: reused vs newly built teams)", [
+        ("cache_lookups_total", {"cache": cache, "result": result}, value)
+        for cache, (hits, misses) in lookups.items()
+        for result, value in (("hit", hits), ("miss", misses))
+    ]
+    yield "cache_hit_ratio", "gauge", "Hits over lookups since startup", [
+        ("cache_hit_ratio", {"cache": cache}, hits / (hits + misses) if hits + misses else 0.0)
+        for cache, (hits, misses) in lookups.items()
+    ]
+    yield "cache_entries", "gauge", "Entries held in memory", [
+        ("cache_entries", {"cache": "exa"}, exa["entries"]),
+        ("cache_entries", {"cache": "answers"}, answers["entries"]),
+        ("cache_entries", {"cache": "session_history"}, history["entries"]),
+        ("cache_entries", {"cache": "team_pool"}, sum(pool["idle"].values())),
+    ]
+    yield "answer_cache_bytes", "gauge", "Size of the cached chat answers", [
+        ("answer_cache_bytes", {}, answers["bytes"]),
+    ]
+    yield "answer_cache_invalidations_total", "counter", "Cached answers dropped: tables written since (stale), older than the TTL (expired) or evicted for space", [
+        ("answer_cache_invalidations_total", {"reason": reason}, answers[reason]) for reason in ("stale", "expired")
+    ] + [("answer_cache_invalidations_total", {"reason": "evicted"}, answers["evictions"])]
+    yield "tool_memo_saved_calls_total", "counter", "Tool calls answered from the memo instead of SQLite, per tool", [
+        ("tool_memo_saved_calls_total", {"tool": tool}, stats["hits"]) for tool, stats in memo["tools"].items()
+    ]
+    yield "tool_memo_saved_seconds_total", "counter", "Time the memoized calls took when they were computed, per tool", [
+        ("tool_memo_saved_seconds_total", {"tool": tool}, stats["saved_ms"] / 1000) for tool, stats in memo["tools"].items()
+    ]
+    yield "tool_memo_stale_total", "counter", "Memoized results dropped because their tables were written since, per tool", [
+        ("tool_memo_stale_total", {"tool": tool}, stats["stale"]) for tool, stats in memo["tools"].items()
+    ]
+    yield "agent_executor_in_flight", "gauge", "Agent calls running on worker threads", [
+        ("agent_executor_in_flight", {}, executor["in_flight"]),
+    ]
+    yield "agent_executor_queue_depth", "gauge", "Agent calls waiting for a worker", [
+        ("agent_executor_queue_depth", {}, executor["queue_depth"]),
+    ]
+    yield "agent_executor_rejected_total", "counter", "Agent calls rejected with 503 because the queue was full", [
+        ("agent_executor_rejected_total", {}, executor["rejected"]),
+    ]
+    yield "email_index_rows", "gauge", "Emails in the vector index", [
+        ("email_index_rows", {}, email_index.stats()["rows"]),
+    ]
+    writes, busy = write_queue.stats(), busy_stats()
+    yield "sqlite_write_queue_pending", "gauge", "Tool writes waiting for this worker's writer thread", [
+        ("sqlite_write_queue_pending", {}, writes["pending"]),
+    ]
+    yield "sqlite_writes_total", "counter", "Tool writes run by the writer thread, failed, or dropped because the queue was full", [
+        ("sqlite_writes_total", {"result": "ok"}, writes["writes"]),
+        ("sqlite_writes_total", {"result": "failed"}, writes["failed"]),
+        ("sqlite_writes_total", {"result": "dropped"}, writes["dropped"]),
+    ]
+    yield "sqlite_busy_retries_total", "counter", "Transactions retried after SQLITE_BUSY, and given up on after the last retry", [
+        ("sqlite_busy_retries_total", {"result": "retried"}, busy["retries"]),
+        ("sqlite_busy_retries_total", {"result": "gave_up"}, busy["gave_up"]),
+    ]
+    pool_counters = pool_stats()
+    if pool_counters:
+        yield "postgres_pool_connections", "gauge", "Connections in this worker's tool pool, open and idle", [
+            ("postgres_pool_connections", {"state": "open"}, pool_counters["pool_size"]),
+            ("postgres_pool_connections", {"state": "idle"}, pool_counters["pool_available"]),
+        ]
+        yield "postgres_pool_waiting", "gauge", "Tool statements waiting for a pooled connection", [
+            ("postgres_pool_waiting", {}, pool_counters["requests_waiting"]),
+        ]
+    yield "trace_spans_dropped_total", "counter", "Spans dropped because the exporter queue was full", [
+        ("trace_spans_dropped_total", {}, exporter.stats()["dropped"]),
+    ]
+
+
+@router.get("/health/metrics")
+async def prometheus_metrics():
+    # Prometheus text exposition format (GET /metrics belongs to AgentOS, which overrides app routes)
+    return PlainTextResponse(registry.exposition(), media_type="text/plain; version=0.0.4")
+
+
+async def _model_ready() -> str:
+    if MODEL_BACKEND == "openai":
+        # No request to the paid API, only whether it could be made
+        return "ok" if os.getenv("OPENAI_API_KEY") else "OPENAI_API_KEY is not set"
+    base_url = backend_info()["base_url"].rstrip("/")
+    try:
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            (await client.get(f"{base_url}/models")).raise_for_status()
+        return "ok"
+    except httpx.HTTPError as e:
+        return f"stub model server unreachable at {base_url}: {str(e) or type(e).__name__}"
+
+
+def _database_ready() -> str:
+    # Blocking (sqlite3 or a psycopg pool checkout), so readiness runs it on a worker thread
+    try:
+        conn = get_connection()
+        conn.execute("SELECT 1").fetchone()
+        pending = pending_migrations(conn)
+        return f"pending migrations: {', '.join(pending)}" if pending else "ok"
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Whether this instance can take traffic: database reachable and migrated, model backend
+    configured (or the stub server answering), and the agent executor not saturated.
+    Returns 503 with the failing checks otherwise; GET /health stays a plain liveness check.
+    """
+    checks = {"database": await run_in_threadpool(_database_ready)}
+    checks["model"] = await _model_ready()
+    executor = agent_executor.stats()
+    queue_full = executor["queue_depth"] >= executor["max_queue"]
+    checks["executor"] = "queue full" if queue_full else "ok"
+
+    ready = all(result == "ok" for result in checks.values())
+    return JSONResponse({"ready": ready, "checks": checks, "executor": executor}, status_code=200 if ready else 503)
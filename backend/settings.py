@@ -0,0 +1,10 @@
+"""
+Loads .env into os.environ, once, before any module reads its configuration.
+
+Modules read their settings into constants at import time, so this must be imported before them:
+main.py, the database and agents packages and the command-line entry points import it first.
+Variables already set in the environment win over .env.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,53 @@
+"""
+Fixtures shared by the tests: the migrated test database for in-process tool calls, and the app
+under uvicorn against the stub model server, as the benchmarks run it (benchmarks/bench_workers.py,
+benchmarks/stub_openai.py).
+"""
+import os
+import tempfile
+
+import pytest
+
+# Tests that call the tools in-process use a throwaway SQLite database (or DATABASE_URL when set);
+# the database package reads these on import
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "test.db"))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("EXA_API_KEY", "stub")
+os.environ.setdefault("AGNO_TELEMETRY", "false")
+
+from benchmarks.bench_workers import free_port, start_app  # noqa: E402
+from benchmarks.stub_openai import start_server  # noqa: E402
+from database.migrations import apply_migrations  # noqa: E402
+
+# Seconds the app may take to answer /health/ready
+APP_START_TIMEOUT = 60.0
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    """The test database with the app schema"""
+    apply_migrations()
+
+
+@pytest.fixture
+def serve(tmp_path, monkeypatch):
+    """
+    serve(*stub_args, **env) starts the stub model server with `stub_args` (e.g. "--latency", "1")
+    and one uvicorn worker on a fresh SQLite database, or on DATABASE_URL if that is set, with
+    `env` added to its environment. Returns the app's base URL; both are stopped after the test.
+    """
+    processes = []
+
+    def start(*stub_args: str, **env) -> str:
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        stub_port = free_port()
+        processes.append(start_server(stub_port, *stub_args))
+        process, port = start_app(1, str(tmp_path / "app.db"), stub_port, APP_START_TIMEOUT)
+        processes.append(process)
+        return f"http://127.0.0.1:{port}"
+
+    yield start
+    for process in reversed(processes):
+        process.terminate()
+        process.wait(timeout=30)
@@ -0,0 +1,52 @@
+"""Answer cache: a repeated fast-path question is answered from memory until its tables are written."""
+import uuid
+
+import pytest
+
+from agents import intent_router
+from agents.answer_cache import AnswerCache, question_key
+from agents.calendar_agent import add_calendar_event
+from agents.intent_router import classify, run_routed
+from agents.rag_team import RAGTeam
+from benchmarks.stub_model import StubModel
+from database import write_queue
+
+
+@pytest.fixture
+def cache(migrated, monkeypatch):
+    cache = AnswerCache(enabled=True)
+    monkeypatch.setattr(intent_router, "answer_cache", cache)
+    return cache
+
+
+def test_calendar_write_retires_cached_answer(cache):
+    team = RAGTeam("stub", model=StubModel(id="leader", reply="Here you go."))
+    attendee = f"memo{uuid.uuid4().hex[:8]}"
+    question = f"show meetings with {attendee}"
+    assert classify(question).tool == "get_events_by_attendee"
+
+    try:
+        first = run_routed(team, question, str(uuid.uuid4()))
+        assert not first.metadata.get("cached")
+        # Another session asking the same thing gets the stored answer
+        second = run_routed(team, question, str(uuid.uuid4()))
+        assert second.metadata["cached"] and second.content == first.content
+
+        add_calendar_event("Answer cache check", "2034-04-01T09:00:00Z", "2034-04-01T10:00:00Z", attendee)
+        third = run_routed(team, question, str(uuid.uuid4()))
+        assert not third.metadata.get("cached")
+        assert "Answer cache check" in third.content
+        stats = cache.stats()
+        assert (stats["hits"], stats["stale"], stats["stores"]) == (1, 1, 2)
+    finally:
+        write_queue.write(lambda conn: conn.execute("DELETE FROM calendar WHERE attendees = ?", (attendee,)))
+
+
+def test_team_answers_are_not_cached(cache):
+    route = classify("what about the second one?")
+    assert route.target == "team"
+    assert cache.key("what about the second one?", route, "gpt-4o") is None
+
+
+def test_question_key_ignores_filler():
+    assert question_key("Please show me my upcoming meetings") == question_key("upcoming meeting")
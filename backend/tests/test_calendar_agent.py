@@ -0,0 +1,35 @@
+"""add_calendar_event: an overlapping booking is refused with the events it overlaps."""
+import pytest
+
+from agents.calendar_agent import add_calendar_event
+from database import write_queue
+
+TITLES = ("Design | review", "Roadmap sync")
+
+
+@pytest.fixture
+def clean_events(migrated):
+    yield
+    write_queue.write(lambda conn: conn.execute(f"DELETE FROM calendar WHERE title IN ({', '.join('?' * len(TITLES))})", TITLES))
+
+
+def test_overlapping_booking_reports_conflicts(clean_events):
+    first = add_calendar_event(TITLES[0], "2033-05-02T10:00:00Z", "2033-05-02T11:00:00Z", "Dana Green")
+    assert first.startswith(f"Event '{TITLES[0]}' added successfully with ID: ")
+    event_id = first.rsplit(" ", 1)[1]
+
+    refused = add_calendar_event(TITLES[1], "2033-05-02T10:30:00Z", "2033-05-02T11:30:00Z").splitlines()
+    assert refused[0] == (
+        f"Event '{TITLES[1]}' was not added, it overlaps 1 event(s). id | start | end | title | attendees"
+    )
+    # One escaped line per conflicting event, as the list tools render them
+    assert refused[1] == f"{event_id} | 2033-05-02T10:00:00Z | 2033-05-02T11:00:00Z | Design \\| review | Dana Green"
+    assert refused[2].startswith("Pick another time")
+
+    forced = add_calendar_event(TITLES[1], "2033-05-02T10:30:00Z", "2033-05-02T11:30:00Z", allow_conflicts=True)
+    assert forced.startswith(f"Event '{TITLES[1]}' added successfully")
+
+
+def test_adjacent_booking_is_not_a_conflict(clean_events):
+    add_calendar_event(TITLES[0], "2033-05-03T10:00:00Z", "2033-05-03T11:00:00Z")
+    assert "added successfully" in add_calendar_event(TITLES[1], "2033-05-03T11:00:00Z", "2033-05-03T12:00:00Z")
@@ -0,0 +1,46 @@
+"""
+Parallel POST /api/chat requests against a stub model that takes DELAY seconds per completion
+(benchmarks/bench_chat_concurrency.py times the same in-process). Team runs happen on the agent
+executor's workers, so REQUESTS calls at once take about one DELAY, not REQUESTS * DELAY.
+"""
+import asyncio
+import time
+import uuid
+
+import httpx
+
+REQUESTS = 4
+DELAY = 1.0
+
+
+async def _chat_all(url: str, n: int) -> int:
+    """Sends n chats at once and returns the most executor calls seen in flight meanwhile"""
+    peak = 0
+    async with httpx.AsyncClient(base_url=url, timeout=30.0) as client:
+        async def chat(i: int):
+            response = await client.post("/api/chat", json={"message": f"hello {i}", "session_id": str(uuid.uuid4())})
+            response.raise_for_status()
+
+        chats = asyncio.gather(*(chat(i) for i in range(n)))
+        while not chats.done():
+            peak = max(peak, (await client.get("/health/executor")).json()["in_flight"])
+            await asyncio.sleep(0.05)
+        await chats
+    return peak
+
+
+def test_parallel_chats_take_about_one_delay(serve):
+    url = serve("--latency", str(DELAY), AGENT_MAX_WORKERS=REQUESTS, TEAM_POOL_SIZE=REQUESTS)
+
+    # The first chat creates agno's tables; keep it out of the measurement
+    asyncio.run(_chat_all(url, 1))
+
+    start = time.perf_counter()
+    peak = asyncio.run(_chat_all(url, REQUESTS))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2 * DELAY, f"{REQUESTS} parallel chats took {elapsed:.2f}s, sequential would be {REQUESTS * DELAY:.0f}s"
+    executor = httpx.get(f"{url}/health/executor").json()
+    assert executor["max_workers"] == REQUESTS
+    assert peak == REQUESTS
+    assert executor["in_flight"] == 0 and executor["rejected"] == 0
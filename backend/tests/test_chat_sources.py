@@ -0,0 +1,32 @@
+"""Sources of /api/chat: Exa results are read from the tool executions of the team and its members."""
+import json
+
+from agno.models.response import ToolExecution
+from agno.run.agent import RunOutput
+from agno.run.team import TeamRunOutput
+
+from routers.chat import _extract_search_results
+
+RESULTS = [{"url": "https://example.com/a", "title": "A"}, {"url": "https://example.com/b", "title": "B"}]
+
+
+def test_sources_from_member_exa_calls():
+    search = ToolExecution(tool_name="search_exa", tool_args={"query": "agno"}, result=json.dumps(RESULTS))
+    contents = ToolExecution(tool_name="get_contents", tool_args={"urls": ["https://example.com/c"]},
+                             result=json.dumps([{"url": "https://example.com/c"}]))
+    other = ToolExecution(tool_name="get_recent_emails", tool_args={}, result="id | received | from")
+    member = RunOutput(tools=[search, other, contents])
+    run = TeamRunOutput(tools=[ToolExecution(tool_name="delegate_task_to_member", result="done")], member_responses=[member])
+
+    search_results, sources = _extract_search_results(run)
+
+    assert [r["tool"] for r in search_results] == ["search_exa", "get_contents"]
+    assert search_results[0]["arguments"] == {"query": "agno"}
+    assert sources == ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+
+
+def test_no_sources_without_exa_calls():
+    assert _extract_search_results(TeamRunOutput(content="hi")) == ([], [])
+    # A failed search returns an error string rather than JSON
+    failed = RunOutput(tools=[ToolExecution(tool_name="search_exa", result="Error: rate limited")])
+    assert _extract_search_results(TeamRunOutput(member_responses=[failed]))[1] == []
@@ -0,0 +1,71 @@
+"""database.ingest: an interrupted import resumes at the record after its last checkpoint."""
+import json
+import sqlite3
+
+import pytest
+
+from database import table_versions
+from database.ingest import ingest
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _append_emails(path, first: int, count: int) -> None:
+    with open(path, "a") as f:
+        for i in range(first, first + count):
+            f.write(json.dumps({
+                "message_id": f"<{i}@ingest.test>", "sender": "Dana <dana@example.com>",
+                "received_at": f"2030-01-01T09:{i:02d}:00Z", "subject": f"Message {i}", "content": f"Body {i}",
+            }) + "\n")
+
+
+def _subjects(database_path) -> list:
+    conn = sqlite3.connect(database_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT subject FROM emails ORDER BY received_at")]
+    finally:
+        conn.close()
+
+
+def test_interrupted_import_resumes_at_the_next_record(tmp_path):
+    source, database_path = tmp_path / "mail.jsonl", str(tmp_path / "ingest.db")
+    _append_emails(source, 0, 10)
+
+    def stop_after_first_batch(report):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        ingest(str(source), database_path=database_path, batch_rows=4, workers=0, progress=stop_after_first_batch)
+    assert _subjects(database_path) == [f"Message {i}" for i in range(4)]
+    versions = table_versions(["emails"], database_path)
+
+    # The checkpoint was written with the first batch: the rest is read once, nothing is duplicated
+    resumed = ingest(str(source), database_path=database_path, batch_rows=4, workers=0)
+    assert resumed.resumed_from is not None
+    assert (resumed.records, resumed.emails, resumed.duplicates) == (6, 6, 0)
+    assert _subjects(database_path) == [f"Message {i}" for i in range(10)]
+    # Cached answers and memoized tool results over the emails are retired by the import
+    assert table_versions(["emails"], database_path) != versions
+
+    # Records appended to the file since are the only ones read on the next run
+    _append_emails(source, 10, 3)
+    appended = ingest(str(source), database_path=database_path, batch_rows=4, workers=0)
+    assert (appended.records, appended.emails) == (3, 3)
+
+    # --restart reads the whole file again; Message-IDs keep it from inserting anything twice
+    restarted = ingest(str(source), database_path=database_path, batch_rows=4, workers=0, restart=True)
+    assert (restarted.records, restarted.emails, restarted.duplicates) == (13, 0, 13)
+    assert len(_subjects(database_path)) == 13
+
+
+def test_replaced_file_is_read_from_the_start(tmp_path):
+    source, database_path = tmp_path / "mail.jsonl", str(tmp_path / "ingest.db")
+    _append_emails(source, 0, 5)
+    ingest(str(source), database_path=database_path, workers=0)
+
+    source.unlink()
+    _append_emails(source, 20, 2)
+    replaced = ingest(str(source), database_path=database_path, workers=0)
+    assert (replaced.records, replaced.emails) == (2, 2)
@@ -0,0 +1,80 @@
+"""classify(): which requests skip the team leader, and which stay with it."""
+import uuid
+
+import pytest
+
+from agents.intent_router import ROUTER_KEYWORD_MIN_SCORE, ROUTER_MIN_MARGIN, classify, intent_classifier, normalize
+
+
+@pytest.mark.parametrize("message, domain", [
+    ("summarize the email thread about the product launch", "email"),
+    ("what's on my calendar this week?", "calendar"),
+    ("search the web for agno framework", "web"),
+])
+def test_confident_read_goes_to_member(message, domain):
+    route = classify(message)
+    assert (route.target, route.domain) == ("member", domain)
+
+
+def test_direct_tool_call():
+    route = classify("show my last 5 emails")
+    assert (route.target, route.tool, route.arguments) == ("tool", "get_recent_emails", {"limit": 5})
+
+
+@pytest.mark.parametrize("message", ["who emailed me yesterday", "move the standup to 9:30", "tell me a joke"])
+def test_ambiguous_goes_to_team(message):
+    assert classify(message).target == "team"
+
+
+def test_keyword_needs_score_and_margin():
+    # One keyword ("emailed") is not enough when the classifier is unsure
+    scores = sorted(intent_classifier.scores(normalize("who emailed me yesterday")).values(), reverse=True)
+    assert scores[0] < ROUTER_KEYWORD_MIN_SCORE or scores[0] - scores[1] < ROUTER_MIN_MARGIN
+    assert classify("who emailed me yesterday").reason == "low confidence"
+
+
+@pytest.mark.parametrize("message", [
+    "add a meeting tomorrow at 2pm",
+    "Please book lunch with Sam on Wednesday at noon",
+    "cancel my 3pm meeting",
+    "forward the last email to bob",
+    "can you reply to Dana saying yes",
+])
+def test_write_goes_to_team(message):
+    route = classify(message)
+    assert (route.target, route.reason) == ("team", "asks for a change")
+
+
+@pytest.mark.parametrize("message", [
+    "and tomorrow?",
+    "what about my meetings with Chris",
+    "show me the emails from Dana too",
+    "summarize it",
+    "yes, go ahead",
+])
+def test_follow_up_goes_to_team(message):
+    route = classify(message)
+    assert (route.target, route.reason) == ("team", "refers to the conversation")
+
+
+def test_read_wording_is_not_an_action():
+    # "reply" and "send" only mean a change at the start of the request
+    assert classify("which emails need a reply").reason != "asks for a change"
+    assert classify("did anyone send me the slides").reason != "asks for a change"
+
+
+def test_fast_path_runs_are_stored_in_the_team_session(migrated):
+    from agents.intent_router import run_routed
+    from agents.rag_team import RAGTeam
+    from benchmarks.stub_model import StubModel
+
+    team = RAGTeam("stub", model=StubModel(id="leader", reply="Here you go."))
+    session_id = str(uuid.uuid4())
+    first = run_routed(team, "show my last 5 emails", session_id)
+    second = run_routed(team, "what's next on my calendar", session_id)
+
+    # A new session is created on the first run and appended to on the next
+    session = RAGTeam("stub", model=StubModel(id="leader")).get_session(session_id)
+    assert [run.run_id for run in session.runs] == [first.run_id, second.run_id]
+    assert [run.metadata["route"]["tool"] for run in session.runs] == ["get_recent_emails", "get_next_events"]
+    assert session.team_id == team.id and session.team_data["name"] == team.name
@@ -0,0 +1,48 @@
+"""apply_migrations on SQLite files, including a database left behind at the old ./agno.db."""
+import sqlite3
+
+import pytest
+
+from database import DATABASE_BACKEND, migrations
+
+pytestmark = pytest.mark.skipif(DATABASE_BACKEND == "postgres", reason="the app database is DATABASE_URL")
+
+
+def _warnings(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(migrations, "log_warning", warnings.append)
+    return warnings
+
+
+def test_warns_when_old_database_is_left_behind(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DATABASE_PATH", "data/agno.db")
+    sqlite3.connect("agno.db").close()
+    (tmp_path / "data").mkdir()
+    warnings = _warnings(monkeypatch)
+
+    assert migrations.apply_migrations()
+    assert len(warnings) == 1 and str(tmp_path / "agno.db") in warnings[0]
+
+    # Once the new database exists it is the one in use, with nothing to warn about
+    assert migrations.apply_migrations() == []
+    assert len(warnings) == 1
+
+
+def test_no_warning_for_other_databases(tmp_path, monkeypatch):
+    # e.g. an import into another file (python -m database.ingest --db)
+    monkeypatch.chdir(tmp_path)
+    sqlite3.connect("agno.db").close()
+    warnings = _warnings(monkeypatch)
+    migrations.apply_migrations(str(tmp_path / "import.db"))
+    assert warnings == []
+
+
+def test_no_warning_for_the_old_path_itself(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    warnings = _warnings(monkeypatch)
+    monkeypatch.setenv("DATABASE_PATH", "agno.db")
+    migrations.apply_migrations()
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "agno.db"))
+    migrations.apply_migrations()
+    assert warnings == []
@@ -0,0 +1,98 @@
+"""
+The PostgreSQL backend (database/postgres.py). Runs only with DATABASE_URL set to a PostgreSQL
+database that may be migrated and written to, e.g.
+
+    DATABASE_URL=postgresql://postgres@localhost/agno_test pytest tests/test_postgres.py
+"""
+import os
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.skipif(
+    not os.getenv("DATABASE_URL", "").startswith(("postgres://", "postgresql://", "postgresql+")),
+    reason="DATABASE_URL is not set to a PostgreSQL database",
+)
+
+from agents.email_agent import _fts_query, search_emails  # noqa: E402
+from database import DATABASE_BACKEND, get_connection, get_database, get_engine  # noqa: E402
+from database.migrations import POSTGRES_MIGRATIONS_DIR, apply_migrations, pending_migrations  # noqa: E402
+
+
+def test_backend_follows_database_url():
+    assert DATABASE_BACKEND == "postgres"
+    assert get_connection().dialect == "postgres"
+    assert type(get_database()).__name__ == "PostgresDb"
+    assert get_engine().dialect.name == "postgresql"
+    with get_engine().connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_migrations_apply_twice():
+    apply_migrations()
+    assert apply_migrations() == []
+    assert pending_migrations(get_connection()) == []
+
+    # The files also run again on a migrated database, e.g. when a node died before recording one
+    from database.postgres import get_pool
+
+    with get_pool().connection() as conn, conn.transaction(force_rollback=True):
+        for path in sorted(POSTGRES_MIGRATIONS_DIR.glob("*.sql")):
+            conn.execute(path.read_text())
+
+
+def test_fts_query_dialects():
+    assert _fts_query("Dana meet", "postgres") == "'Dana':* & 'meet':*"
+    assert _fts_query("Dana meet") == '"Dana"* "meet"*'
+    # Quotes and operators in the text never reach the query
+    assert _fts_query("it's (Q3) & 'budget'", "postgres") == "'it':* & 's':* & 'Q3':* & 'budget':*"
+    assert _fts_query("?!", "postgres") == ""
+
+
+def test_search_emails_on_postgres():
+    apply_migrations()
+    marker = f"zq{uuid.uuid4().hex[:10]}"
+    conn = get_connection()
+    rows = [
+        ("Dana <dana@example.com>", "2031-01-02T09:00:00Z", "Notes", f"The {marker}report is attached."),
+        ("Riley <riley@example.com>", "2031-01-01T09:00:00Z", f"{marker} review", "Budget review on Friday."),
+    ]
+    conn.executemany(
+        "INSERT INTO emails(origin, sender, received_at, subject, content) VALUES ('test', ?, ?, ?, ?)", rows
+    )
+    try:
+        found = search_emails(marker).splitlines()
+        assert len(found) == 3
+        # Words are prefix-matched; subject matches rank above content matches, as with bm25 on SQLite
+        assert "Riley" in found[1] and "Dana" in found[2]
+        assert f"**{marker}report**" in found[2]
+        # Every word must match
+        both = search_emails(f"{marker} review").splitlines()
+        assert len(both) == 2 and "Riley" in both[1]
+        assert search_emails(f"{marker} nothingmatches") == f"No emails found containing '{marker} nothingmatches'."
+    finally:
+        conn.execute("DELETE FROM emails WHERE origin = 'test' AND received_at LIKE '2031-%'")
+
+
+def test_history_round_trip(serve):
+    url = serve()
+    session_id = str(uuid.uuid4())
+    with httpx.Client(base_url=url, timeout=30.0) as client:
+        assert client.get("/health/database").json()["backend"] == "postgres"
+
+        assert client.post("/api/chat", json={"message": "hello", "session_id": session_id}).status_code == 200
+        page = client.get(f"/api/sessions/{session_id}/messages").json()
+        assert [(m["role"], m["content"]) for m in page["messages"]][0] == ("user", "hello")
+        assert [m["role"] for m in page["messages"]] == ["user", "assistant"]
+
+        # A direct tool call is stored with its tool data; poll for it after the first page
+        assert client.post("/api/chat", json={"message": "show my recent emails", "session_id": session_id}).status_code == 200
+        newer = client.get(f"/api/sessions/{session_id}/messages", params={"after": page["after"]}).json()
+        assert [(m["role"], m["content"]) for m in newer["messages"]][0] == ("user", "show my recent emails")
+        call = next(m for m in newer["messages"] if m["has_tool_data"])
+        assert [c["name"] for c in call["tool_data"]["tool_calls"]] == ["get_recent_emails"]
+        tool_data = client.get(f"/api/sessions/{session_id}/messages/{call['id']}/tool_data").json()
+        assert tool_data == call["tool_data"]
+        assert newer["messages"][-1]["role"] == "assistant" and newer["messages"][-1]["content"]
@@ -0,0 +1,100 @@
+"""GET /api/sessions/{session_id}/messages: cursor paging, polling with `after`, and the ETag."""
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agents.intent_router import run_routed
+from agents.rag_team import RAGTeam
+from benchmarks.stub_model import StubModel
+from routers import chat_router
+
+QUESTIONS = ["show my last 5 emails", "what's next on my calendar", "show my last 2 emails"]
+
+
+@pytest.fixture
+def client(migrated):
+    app = FastAPI()
+    app.include_router(chat_router)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def team():
+    return RAGTeam("stub", model=StubModel(id="leader", reply="Here you go."))
+
+
+def _messages(client, session_id, **params):
+    response = client.get(f"/api/sessions/{session_id}/messages", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_before_cursor_pages_back_to_the_start(client, team):
+    session_id = str(uuid.uuid4())
+    for question in QUESTIONS:
+        run_routed(team, question, session_id)
+    everything = _messages(client, session_id, limit=100)["messages"]
+    assert [m["content"] for m in everything if m["role"] == "user"] == QUESTIONS
+
+    pages, page = [], _messages(client, session_id, limit=2)
+    while True:
+        pages.insert(0, page["messages"])
+        if page["before"] is None:
+            break
+        page = _messages(client, session_id, limit=2, before=page["before"])
+    assert [m["id"] for p in pages for m in p] == [m["id"] for m in everything]
+    assert all(len(p) == 2 for p in pages[1:])
+
+
+def test_after_cursor_resumes_at_the_next_message(client, team):
+    session_id = str(uuid.uuid4())
+    run_routed(team, QUESTIONS[0], session_id)
+    first = _messages(client, session_id)
+
+    # Nothing new yet: an empty page that keeps the cursor
+    idle = _messages(client, session_id, after=first["after"])
+    assert idle["messages"] == [] and idle["after"] == first["after"]
+
+    run_routed(team, QUESTIONS[1], session_id)
+    newer = _messages(client, session_id, after=first["after"])
+    assert newer["messages"][0]["role"] == "user" and newer["messages"][0]["content"] == QUESTIONS[1]
+    assert not {m["id"] for m in newer["messages"]} & {m["id"] for m in first["messages"]}
+    assert _messages(client, session_id, after=newer["after"])["messages"] == []
+
+    # A cursor from the middle resumes right after that message
+    middle = _messages(client, session_id, limit=100)["messages"]
+    resumed = _messages(client, session_id, after=first["after"], limit=1)
+    assert resumed["messages"][0]["id"] == middle[len(first["messages"])]["id"]
+
+
+def test_etag_changes_when_the_session_is_written(client, team):
+    session_id = str(uuid.uuid4())
+    run_routed(team, QUESTIONS[0], session_id)
+    url = f"/api/sessions/{session_id}/messages"
+    etag = client.get(url).headers["etag"]
+
+    unchanged = client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.content == b""
+
+    run_routed(team, QUESTIONS[1], session_id)
+    changed = client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["messages"][-1]["content"]
+
+
+def test_tool_data_left_out_on_request(client, team):
+    session_id = str(uuid.uuid4())
+    run_routed(team, QUESTIONS[0], session_id)
+    page = _messages(client, session_id, include_tool_data=False)
+    call = next(m for m in page["messages"] if m["has_tool_data"])
+    assert "tool_data" not in call
+    tool_data = client.get(f"/api/sessions/{session_id}/messages/{call['id']}/tool_data").json()
+    assert [c["name"] for c in tool_data["tool_calls"]] == ["get_recent_emails"]
+
+
+def test_invalid_cursor(client):
+    response = client.get(f"/api/sessions/{uuid.uuid4()}/messages", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,63 @@
+"""@memoized tools: repeated calls in a run are served from the memo until a write bumps their tables."""
+import uuid
+
+import pytest
+
+from agents import tool_memo
+from agents.calendar_agent import add_calendar_event, find_conflicts
+from agents.email_agent import search_emails
+from database import write_queue
+
+
+@pytest.fixture
+def run_memo(migrated, monkeypatch):
+    # The memo of one run, as MemoScopeMixin sets it around team.run()
+    monkeypatch.setattr(tool_memo, "TOOL_MEMO_SCOPE", "run")
+    memo = tool_memo.ToolMemo()
+    token = tool_memo._run_memo.set(memo)
+    yield memo
+    tool_memo._run_memo.reset(token)
+
+
+def _stats(tool: str) -> dict:
+    return tool_memo.memo_stats.snapshot()["tools"].get(tool, {"calls": 0, "hits": 0, "stale": 0})
+
+
+def test_calendar_write_invalidates_memoized_reads(run_memo):
+    title = f"Memo {uuid.uuid4().hex[:8]}"
+    window = ("2034-03-01T09:00:00Z", "2034-03-01T10:00:00Z")
+    before = _stats("find_conflicts")
+    try:
+        free = find_conflicts(*window)
+        assert free.startswith("No conflicts")
+        assert find_conflicts(*window) == free
+        assert _stats("find_conflicts")["hits"] == before["hits"] + 1
+
+        assert "added successfully" in add_calendar_event(title, *window)
+        busy = find_conflicts(*window)
+        assert title in busy
+        after = _stats("find_conflicts")
+        assert after["hits"] == before["hits"] + 1 and after["stale"] == before["stale"] + 1
+    finally:
+        write_queue.write(lambda conn: conn.execute("DELETE FROM calendar WHERE title = ?", (title,)))
+
+
+def test_email_write_invalidates_memoized_search(run_memo):
+    marker = f"zm{uuid.uuid4().hex[:10]}"
+    assert search_emails(marker) == f"No emails found containing '{marker}'."
+    write_queue.write(lambda conn: conn.execute(
+        "INSERT INTO emails(origin, sender, received_at, subject, content) VALUES ('test', ?, ?, ?, ?)",
+        ("Dana <dana@example.com>", "2034-03-01T09:00:00Z", f"{marker} notes", "See attached."),
+    ))
+    try:
+        assert f"{marker} notes" in search_emails(marker)
+    finally:
+        write_queue.write(lambda conn: conn.execute("DELETE FROM emails WHERE subject = ?", (f"{marker} notes",)))
+
+
+def test_no_memo_outside_a_run(migrated, monkeypatch):
+    monkeypatch.setattr(tool_memo, "TOOL_MEMO_SCOPE", "run")
+    before = _stats("find_conflicts")
+    find_conflicts("2034-03-02T09:00:00Z", "2034-03-02T10:00:00Z")
+    find_conflicts("2034-03-02T09:00:00Z", "2034-03-02T10:00:00Z")
+    assert _stats("find_conflicts")["hits"] == before["hits"]
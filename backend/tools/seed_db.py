@@ -1,7 +1,8 @@
+import os
 import sqlite3
 from datetime import datetime, timedelta
 
-cx = sqlite3.connect("agno.db")
+cx = sqlite3.connect(os.getenv("DATABASE_PATH", "agno.db"))
 
 # --- 15 emails ---
 rows = []